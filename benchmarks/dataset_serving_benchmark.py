@@ -0,0 +1,118 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import functools
+import threading
+import http.client
+import multiprocessing
+from http.server import SimpleHTTPRequestHandler
+
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrap_common.datasets import datasets, file_stat, write_compressed_variants  # noqa: E402
+
+def largest_dataset():
+    sizes = {name: (file_stat(dataset["csv"]) or (0, 0))[1] for name, dataset in datasets.items()}
+    return max(sizes, key=sizes.get)
+
+def write_scaled_copy(source, target, scale):
+    """The source CSV with its data rows repeated ``scale`` times, to stand in for a larger dataset."""
+    with open(source, 'rb') as file:
+        header = file.readline()
+        rows = file.read()
+    with open(target, 'wb') as file:
+        file.write(header)
+        for _ in range(scale):
+            file.write(rows)
+
+def serve(kind, port, directory, workers, ready):
+    import simple_page
+
+    class CopyingHandler(simple_page.PooledKeepAlive, SimpleHTTPRequestHandler):
+        """The stdlib static file handler over keep-alive: reads and copies the file through Python buffers."""
+
+        def log_message(self, format, *args):
+            pass
+
+    handler = functools.partial(CopyingHandler, directory=directory) if kind == "copy" else simple_page.KeepAliveHandler
+    if kind != "copy":
+        handler.log_message = lambda self, format, *args: None
+    server = simple_page.PooledHTTPServer(('127.0.0.1', port), handler, workers)
+    ready.set()
+    server.serve_forever()
+
+def client_loop(port, path, headers, deadline, counts):
+    """Download ``path`` until ``deadline``; only 200/206 responses count, anything else is a failure."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    requests = received = failures = 0
+    while time.perf_counter() < deadline:
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            failures += 1
+            conn.close()  # Reconnects on the next request
+            continue
+        if response.status in (200, 206):
+            received += len(body)
+            requests += 1
+        else:
+            failures += 1
+    conn.close()
+    counts.append((requests, received, failures))
+
+def run_level(port, path, headers, clients, duration):
+    """(requests/s, MB/s on the wire, failed requests) for ``clients`` clients downloading ``path`` back to back."""
+    counts = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=client_loop, args=(port, path, headers, deadline, counts)) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sum(c[0] for c in counts) / elapsed, sum(c[1] for c in counts) / elapsed / 1024 / 1024, sum(c[2] for c in counts)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare serving a dataset CSV by copying versus sendfile with precompressed copies.")
+    parser.add_argument("--dataset", help="Dataset to serve (default: the largest)")
+    parser.add_argument("--scale", type=int, default=20, help="Repeat the dataset's rows this many times")
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 16, 64])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per (mode, client count) level")
+    parser.add_argument("--workers", type=int, default=16, help="Server worker threads")
+    parser.add_argument("--port", type=int, default=8790)
+    args = parser.parse_args()
+
+    name = args.dataset or largest_dataset()
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "benchmark.csv")
+        write_scaled_copy(datasets[name]["csv"], filepath, args.scale)
+        datasets["benchmark"] = {"csv": filepath, "datapackage": None}
+        write_compressed_variants("benchmark")
+        sizes = {suffix or "identity": os.path.getsize(filepath + suffix)
+                 for suffix in ("", ".gz", ".zst") if os.path.exists(filepath + suffix)}
+        print(f"Serving {name} x{args.scale}: " + ", ".join(f"{label} {size / 1024 / 1024:.1f} MB" for label, size in sizes.items()))
+
+        modes = [("copy", "/benchmark.csv", {}), ("sendfile", "/data/benchmark.csv", {})]
+        modes.append(("sendfile gzip", "/data/benchmark.csv", {"Accept-Encoding": "gzip"}))
+        if ".zst" in sizes:
+            modes.append(("sendfile zstd", "/data/benchmark.csv", {"Accept-Encoding": "zstd"}))
+
+        print(f"{'mode':<14} {'clients':>7} {'req/s':>9} {'wire MB/s':>10} {'CSV MB/s':>9} {'failed':>7}")
+        for port, (mode, path, headers) in enumerate(modes, args.port):
+            ready = multiprocessing.Event()
+            server = multiprocessing.Process(target=serve, args=(mode.split()[0], port, directory, args.workers, ready), daemon=True)
+            server.start()
+            ready.wait()
+            try:
+                for clients in args.clients:
+                    rps, wire, failed = run_level(port, path, headers, clients, args.duration)
+                    print(f"{mode:<14} {clients:>7} {rps:>9.1f} {wire:>10.1f} {rps * sizes['identity'] / 1024 / 1024:>9.1f} {failed:>7}")
+            finally:
+                server.terminate()
+                server.join()
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrap_common.entity_resolution import match_names  # noqa: E402
+
+syllables = [consonant + vowel for consonant in "bcdfghjklmnprstvwz" for vowel in "aeiou"] + ["ex", "or", "um", "an"]
+words = ["ai", "labs", "data", "robotics", "health", "vision", "systems", "analytics", "cloud", "bio", "energy", "tech"]
+suffixes = ["", "", "", " GmbH", " Ltd", " Inc.", " B.V.", " SAS", " AB"]
+
+def random_name(rng):
+    base = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+    name = base.capitalize() + " " + rng.choice(words).capitalize()
+    if rng.random() < 0.3:
+        name += " " + rng.choice(words).capitalize()
+    return name + rng.choice(suffixes)
+
+def perturb(name, rng):
+    """A spelling of the same company as another source might write it."""
+    kind = rng.random()
+    chars = list(name)
+    position = rng.randrange(1, len(chars))
+    if kind < 0.25:
+        del chars[position]
+    elif kind < 0.5:
+        chars.insert(position, rng.choice("aeiou"))
+    elif kind < 0.65 and position < len(chars) - 1:
+        chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    elif kind < 0.8:
+        return name.upper() + rng.choice(suffixes)
+    return "".join(chars)
+
+def synthetic_datasets(size, overlap, seed):
+    """Two name lists of ``size`` rows; ``overlap`` of the right side are perturbed copies of distinct left rows."""
+    rng = random.Random(seed)
+    left = [random_name(rng) for _ in range(size)]
+    right = [random_name(rng) for _ in range(size)]
+    copied = rng.sample(range(size), int(size * overlap))
+    truth = dict(zip(copied, rng.sample(range(size), len(copied))))
+    for left_row, right_row in truth.items():
+        right[right_row] = perturb(left[left_row], rng)
+    return left, right, truth
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time entity resolution on synthetic company name lists.")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Rows on each side")
+    parser.add_argument("--overlap", type=float, default=0.3, help="Share of right rows copied from the left side")
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--max-block-pairs", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    left, right, truth = synthetic_datasets(args.size, args.overlap, args.seed)
+    print(f"Generated {args.size:,} x {args.size:,} names in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    matches, stats = match_names(left, right, args.threshold, args.max_block_pairs)
+    elapsed = time.perf_counter() - start
+
+    found = dict(zip(matches.left_row.tolist(), matches.right_row.tolist()))
+    correct = sum(1 for left_row, right_row in truth.items() if found.get(left_row) == right_row)
+    wrong = sum(1 for left_row, right_row in found.items() if left_row in truth and truth[left_row] != right_row)
+    print(f"prepare {stats['prepare_seconds']:.1f}s   block {stats['block_seconds']:.1f}s   "
+          f"score {stats['score_seconds']:.1f}s   total {elapsed:.1f}s")
+    print(f"{stats['candidate_pairs']:,} candidate pairs "
+          f"({stats['candidate_pairs'] / args.size ** 2:.2e} of the cross product), "
+          f"{stats['skipped_pairs']:,} skipped in oversized blocks")
+    print(f"{len(matches):,} matches, recall {correct / max(len(truth), 1):.3f} on {len(truth):,} planted duplicates, "
+          f"{wrong:,} of them matched to the wrong row")
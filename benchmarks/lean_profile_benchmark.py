@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrap_common.driver_pool import DriverPool, default_chrome_options  # noqa: E402
+from scrap_common.lean_profile import LeanProfile  # noqa: E402
+
+default_urls = [
+    "https://www.eu-startups.com/directory/?wpbdp_sort=field-1",
+    "https://www.eu-startups.com/directory/?wpbdp_view=search&kw=%23SRNT+Serenity",
+    "https://www.iana.org/domains/root/db",
+]
+
+# Sum of transferred bytes for the document and every sub-resource the page loaded
+transfer_size_js = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return [entries.reduce((total, e) => total + (e.transferSize || 0), 0), entries.length];
+"""
+
+def measure(driver, url):
+    """Load a URL once and return (seconds, bytes transferred, resource count)."""
+    driver.get("about:blank")
+    start = time.perf_counter()
+    driver.get(url)
+    elapsed = time.perf_counter() - start
+    transferred, resources = driver.execute_script(transfer_size_js)
+    return elapsed, transferred, resources
+
+def run_profile(label, urls, repeat, profile):
+    """Measure every URL ``repeat`` times on one long-lived driver and print a summary row."""
+    pool = DriverPool(size=1, options_factory=lambda: default_chrome_options(profile),
+                      on_start=profile.apply if profile else None)
+    timings, sizes, counts = [], [], []
+    with pool, pool.driver() as driver:
+        driver.get(urls[0])  # Warm up the browser process before timing
+        for _ in range(repeat):
+            for url in urls:
+                elapsed, transferred, resources = measure(driver, url)
+                timings.append(elapsed)
+                sizes.append(transferred)
+                counts.append(resources)
+
+    print(f"{label:<8} median load {statistics.median(timings) * 1000:8.1f} ms   "
+          f"mean bytes {statistics.mean(sizes) / 1024:9.1f} KiB   "
+          f"mean resources {statistics.mean(counts):6.1f}")
+    return statistics.median(timings), statistics.mean(sizes)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare page-load time and bytes with and without the lean profile.")
+    parser.add_argument("urls", nargs="*", default=default_urls)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--block-css", action="store_true", help="Also block stylesheets in the lean run")
+    args = parser.parse_args()
+
+    base_time, base_bytes = run_profile("default", args.urls, args.repeat, None)
+    lean_time, lean_bytes = run_profile("lean", args.urls, args.repeat, LeanProfile(block_css=args.block_css))
+    if base_time and base_bytes:
+        print(f"Lean profile: {lean_time / base_time:.2f}x load time, {lean_bytes / base_bytes:.2f}x bytes")
@@ -0,0 +1,66 @@
+import time
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def client_loop(host, port, path, deadline, keepalive, latencies, errors):
+    """Issue requests back to back until ``deadline``, recording each latency in seconds."""
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers={} if keepalive else {"Connection": "close"})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+            if not keepalive or response.will_close:
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(repr(e))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+def run_level(host, port, path, clients, duration, keepalive):
+    """Run ``clients`` concurrent clients against one path and return (rps, p50, p99, errors)."""
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=client_loop, args=(host, port, path, deadline, keepalive, latencies, errors))
+               for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, percentile(latencies, 0.50), percentile(latencies, 0.99), len(errors)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test simple_page: requests/second and p99 latency per client count.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running simple_page server")
+    parser.add_argument("--paths", nargs="+", default=["/", "/graph"])
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per (path, client count) level")
+    parser.add_argument("--no-keepalive", action="store_true", help="Open a new connection for every request")
+    args = parser.parse_args()
+
+    target = urlsplit(args.url)
+    print(f"{'path':<12} {'clients':>7} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for path in args.paths:
+        for clients in args.clients:
+            rps, p50, p99, errors = run_level(target.hostname, target.port or 80, path, clients,
+                                              args.duration, not args.no_keepalive)
+            print(f"{path:<12} {clients:>7} {rps:>10.1f} {p50 * 1000:>9.2f} {p99 * 1000:>9.2f} {errors:>7}")
@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import argparse
+
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrap_common.fixtures import FixtureStore, default_fixture_dir, start_replay_server  # noqa: E402
+
+# Each entry is (label, corpus, callable returning the number of rows parsed from one body)
+def bs4_parsers():
+    from scrap_domain.script import process
+    from scrap_domain_dynamic.script import dynamic_script
+    from scrap_eu_ai_company.script import scrap_eu_ai_v2, scrap_eu_ai_script
+
+    return [
+        ("process.parse_table", "iana", lambda body: len(process.parse_table(body) or [])),
+        ("dynamic_script.parse_table", "iana", lambda body: len(dynamic_script.parse_table(body)[1] or [])),
+        ("scrap_eu_ai_v2.parse_listings", "eu_startups", lambda body: len(scrap_eu_ai_v2.parse_listings(body))),
+        ("scrap_eu_ai_script.parse_listings", "eu_startups", lambda body: len(scrap_eu_ai_script.parse_listings(body))),
+    ]
+
+def run_benchmark(label, bodies, parse, min_time):
+    """Parse every body repeatedly for at least ``min_time`` seconds and print rows/second."""
+    rows = rounds = 0
+    start = time.perf_counter()
+    while True:
+        for body in bodies:
+            rows += parse(body)
+        rounds += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+
+    pages = rounds * len(bodies)
+    print(f"{label:<40} {rows / elapsed:12.0f} rows/s   {elapsed / pages * 1000:8.2f} ms/page   "
+          f"({pages} pages, {rows} rows)")
+
+def run_selenium_benchmark(fixture_store, min_time):
+    """Replay startupnation DOM snapshots into Chrome and time ResumableScraper.extract_company_data."""
+    from selenium.webdriver.common.by import By
+    from scrap_common.driver_pool import DriverPool
+    from scrap_ai_company.script.scrap_ai import ResumableScraper
+
+    keys = sorted(fixture_store.index("startupnation"))
+    if not keys:
+        print("No startupnation snapshots recorded; skipping extract_company_data.")
+        return
+
+    server, base_url = start_replay_server(fixture_store)
+    scraper = ResumableScraper()
+    rows, elapsed = 0, 0.0
+    try:
+        with DriverPool(size=1) as pool, pool.driver() as driver:
+            while elapsed < min_time:
+                for key in keys:
+                    driver.get(f"{base_url}/startupnation/{key}")
+                    companies = driver.find_elements(By.CSS_SELECTOR, "a[style='display:flex;']")
+                    start = time.perf_counter()
+                    for company in companies:
+                        scraper.extract_company_data(company)
+                    elapsed += time.perf_counter() - start
+                    rows += len(companies)
+                if not rows:
+                    break
+    finally:
+        server.shutdown()
+
+    if rows:
+        print(f"{'ResumableScraper.extract_company_data':<40} {rows / elapsed:12.0f} rows/s   ({rows} rows)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure parser throughput on recorded fixture corpora.")
+    parser.add_argument("--fixtures", default=default_fixture_dir, help="Fixture store recorded with SCRAP_FIXTURE_MODE=record")
+    parser.add_argument("--min-time", type=float, default=2.0, help="Seconds to spend on each parser")
+    parser.add_argument("--selenium", action="store_true", help="Also replay startupnation snapshots through Chrome")
+    args = parser.parse_args()
+
+    fixture_store = FixtureStore(args.fixtures)
+    for label, corpus, parse in bs4_parsers():
+        bodies = [body for _, body in fixture_store.bodies(corpus)]
+        if not bodies:
+            print(f"{label:<40} no '{corpus}' fixtures recorded, skipped")
+            continue
+        run_benchmark(label, bodies, parse, args.min_time)
+
+    if args.selenium:
+        run_selenium_benchmark(fixture_store, args.min_time)
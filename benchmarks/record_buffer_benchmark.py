@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrap_common.record_buffer import RecordBuffer  # noqa: E402
+
+# A startupnation-shaped crawl: free-text name/description/tags, a few values in the other columns
+header = ["Name", "Description", "Founded", "Business Model", "Employees", "Funding Stage", "Total Raised", "Tags"]
+categorical = ["Founded", "Business Model", "Employees", "Funding Stage"]
+business_models = ["B2B", "B2C", "B2B, B2C", "B2G", "N/A"]
+employees = ["1-10", "11-50", "51-200", "201-500", "500+", "N/A"]
+funding_stages = ["Pre-Seed", "Seed", "Round A", "Round B", "Round C+", "Revenue Financed", "N/A"]
+tags = ["artificial-intelligence", "machine-learning", "computer-vision", "nlp", "robotics", "healthtech", "fintech", "saas"]
+words = ["platform", "data", "automated", "insights", "secure", "real-time", "enterprise", "models", "scalable", "cloud"]
+
+def fresh(value):
+    """A new str object with the value's text, as each element's .text is in a real crawl."""
+    return (value + " ")[:-1]
+
+def synthetic_rows(count, seed):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield [
+            f"Company {i} {rng.choice(words).title()}",
+            " ".join(rng.choice(words) for _ in range(rng.randint(8, 20))),
+            fresh(str(rng.randint(1995, 2025))),
+            fresh(rng.choice(business_models)),
+            fresh(rng.choice(employees)),
+            fresh(rng.choice(funding_stages)),
+            f"${rng.randint(1, 500)}M" if rng.random() < 0.6 else fresh("N/A"),
+            ", ".join(rng.sample(tags, rng.randint(1, 4))),
+        ]
+
+def measure(label, build, rows, seed):
+    """Build one layout under tracemalloc and print the memory it keeps and the time it took."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    container = build(synthetic_rows(rows, seed))
+    elapsed = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{label:<22} {retained / 1024 / 1024:9.1f} MiB {retained / rows:9.1f} B/row {elapsed:8.1f}s")
+    return container, retained
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory of a 1M-record synthetic crawl: row lists and dicts against RecordBuffer.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--csv", help="Also time writing the buffer to this CSV file")
+    args = parser.parse_args()
+
+    print(f"{'layout':<22} {'retained':>13} {'per row':>13} {'build':>9}")
+    rows_list, list_bytes = measure("list of row lists", list, args.rows, args.seed)
+    del rows_list
+    rows_dicts, _ = measure("list of dicts", lambda rows: [dict(zip(header, row)) for row in rows], args.rows, args.seed)
+    del rows_dicts
+    buffer, buffer_bytes = measure("RecordBuffer", lambda rows: RecordBuffer(header, categorical, rows), args.rows, args.seed)
+    print(f"RecordBuffer keeps {list_bytes / buffer_bytes:.1f}x less than row lists")
+
+    start = time.perf_counter()
+    frame = buffer.to_dataframe()
+    print(f"to_dataframe {time.perf_counter() - start:8.1f}s   ({frame.memory_usage(deep=True).sum() / 1024 / 1024:.0f} MiB frame)")
+    del frame
+    start = time.perf_counter()
+    stream = buffer.copy_stream()
+    copied = 0
+    while True:
+        chunk = stream.read(8192)
+        if not chunk:
+            break
+        copied += len(chunk)
+    print(f"copy_stream  {time.perf_counter() - start:8.1f}s   ({copied / 1024 / 1024:.0f} MiB of COPY text)")
+    if args.csv:
+        start = time.perf_counter()
+        buffer.to_csv(args.csv)
+        print(f"to_csv       {time.perf_counter() - start:8.1f}s   ({os.path.getsize(args.csv) / 1024 / 1024:.0f} MiB)")
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Commands that must not pull in requests, selenium, pandas or matplotlib
+default_commands = [
+    ["--help"],
+    ["scrape-tld", "--help"],
+    ["load", "--help"],
+    ["serve", "--help"],
+    ["datasets"],
+]
+
+def time_command(command, runs):
+    """Median and worst wall-clock seconds of ``python -m scrap_common <command>``."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "scrap_common"] + command, cwd=repo_root,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), max(timings)
+
+def interpreter_baseline(runs):
+    """Median seconds for a bare ``python -c pass``, the floor for any command."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure CLI startup time for --help and lightweight commands.")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--target-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    print(f"{'interpreter baseline':<28} {interpreter_baseline(args.runs) * 1000:8.1f} ms")
+    failed = False
+    for command in default_commands:
+        median, worst = time_command(command, args.runs)
+        status = "ok" if median * 1000 <= args.target_ms else "SLOW"
+        failed = failed or status != "ok"
+        print(f"{' '.join(command):<28} {median * 1000:8.1f} ms median  {worst * 1000:8.1f} ms worst  {status}")
+    sys.exit(1 if failed else 0)
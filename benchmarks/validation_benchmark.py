@@ -0,0 +1,57 @@
+import os
+import sys
+import csv
+import time
+import argparse
+import tempfile
+
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrap_common.validation import validate_resource  # noqa: E402
+
+# The TLD schema with the constraints the loader relies on
+schema = {
+    "fields": [
+        {"name": "Domain", "type": "string", "constraints": {"required": True}},
+        {"name": "Type", "type": "string",
+         "constraints": {"enum": ["generic", "country-code", "sponsored", "infrastructure", "generic-restricted", "test"]}},
+        {"name": "Sponsoring Organization", "type": "string", "constraints": {"maxLength": 255}},
+        {"name": "Founded", "type": "year"},
+    ],
+    "primaryKey": "Domain",
+}
+
+def write_synthetic_csv(filepath, rows):
+    types = schema["fields"][1]["constraints"]["enum"]
+    with open(filepath, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow([field["name"] for field in schema["fields"]])
+        for i in range(rows):
+            writer.writerow([f".tld{i}", types[i % len(types)], f"Registry Operator {i % 5000}, Inc.", 1985 + i % 40])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure validator throughput on a synthetic TLD-shaped CSV.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--chunk-mb", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "synthetic.csv")
+        write_synthetic_csv(filepath, args.rows)
+        size = os.path.getsize(filepath)
+
+        start = time.perf_counter()
+        with open(filepath, 'rb') as file:
+            while file.read(args.chunk_mb * 1024 * 1024):
+                pass
+        read_seconds = time.perf_counter() - start
+        print(f"{'plain read':<12} {size / 1024 / 1024 / read_seconds:8.1f} MB/s   ({size / 1024 / 1024:.0f} MB, page cache)")
+
+        for workers in dict.fromkeys(args.workers):
+            start = time.perf_counter()
+            rows, errors = validate_resource(filepath, schema, workers=workers, chunk_size=args.chunk_mb * 1024 * 1024)
+            elapsed = time.perf_counter() - start
+            print(f"{f'{workers} worker(s)':<12} {size / 1024 / 1024 / elapsed:8.1f} MB/s   "
+                  f"{rows / elapsed:10.0f} rows/s   {len(errors)} error(s)")
@@ -1,51 +1,86 @@
 import pandas as pd
 import psycopg2
+from psycopg2.extras import execute_values
 import os
 from dotenv import load_dotenv
+import sys
 import csv
+import math
+import time
 import unicodedata
 
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrap_common.metrics import metrics, log, ERROR  # noqa: E402
+from scrap_common.datasets import missing_values  # noqa: E402
+from scrap_common.company_index import split_tags  # noqa: E402
+from scrap_common.profiling import profiled  # noqa: E402
+from scrap_common.validation import validate_csv, format_error  # noqa: E402
+
 load_dotenv()
 
-def clean_and_validate_data(df, numeric_cols=None, string_number_cols=None):
+def is_missing(item):
+    """True for None and NaN cells, and for the placeholders ("", "N/A", "None") that read_csv turns into NaN."""
+    if isinstance(item, str):
+        return item.strip() in missing_values
+    return item is None or (isinstance(item, float) and math.isnan(item))
+
+def clean_row(row, index, numeric_cols=(), string_number_cols=(), array_cols=()):
+    """Cleans and validates a single row (a mapping of column name to value).
+
+    Values may be typed, as read_csv gives them, or all strings, as the
+    scrapers yield them to the pipeline; both come out the same, so a table
+    created from either has the same column types. Columns in ``array_cols``
+    hold comma-joined lists such as Tags; they become a de-duplicated list of
+    normalized entries, stored whole as a TEXT[] column.
+    """
+    cleaned_row = {}
+    for col_name, item in row.items():
+        if col_name in array_cols:
+            cleaned_row[col_name] = split_tags(None if is_missing(item) else str(item))
+            continue
+        if is_missing(item):
+            cleaned_row[col_name] = None
+            continue
+
+        if col_name in numeric_cols:
+            try:
+                item = int(float(item.strip())) if isinstance(item, str) else int(item)
+            except (ValueError, TypeError):
+                print(f"Invalid '{col_name}' value (index {index}): {item}")
+                item = None
+        elif col_name in string_number_cols:
+            try:
+                item = str(item).strip().replace("$", "").replace("M", "000000").replace("K", "000")
+                item = int(float(item))
+            except (ValueError, TypeError):
+                print(f"Invalid '{col_name}' value (index {index}): {item}")
+                item = None
+        elif isinstance(item, str):
+            item = item.strip()
+            item = item.replace("'", "''")
+            item = item[:255]
+            item = "".join(ch for ch in item if unicodedata.category(ch)[0] != "C")
+            try:
+                item = item.encode('utf-8').decode('utf-8')
+            except UnicodeDecodeError:
+                item = ""
+        cleaned_row[col_name] = item
+    return cleaned_row
+
+def clean_and_validate_data(df, numeric_cols=None, string_number_cols=None, array_cols=None):
     """Cleans and validates data based on provided column types."""
     if numeric_cols is None:
         numeric_cols = []
     if string_number_cols is None:
         string_number_cols = []
+    if array_cols is None:
+        array_cols = []
 
     cleaned_data = []
     for index, row in df.iterrows():
-        cleaned_row = {}
-        for col_name, item in row.items():
-            if pd.isna(item):
-                cleaned_row[col_name] = None
-                continue
-
-            if isinstance(item, str):
-                item = item.strip()
-                item = item.replace("'", "''")
-                item = item[:255]
-                item = "".join(ch for ch in item if unicodedata.category(ch)[0] != "C")
-                try:
-                    item = item.encode('utf-8').decode('utf-8')
-                except UnicodeDecodeError:
-                    item = ""
-            elif col_name in numeric_cols:
-                try:
-                    item = int(item)
-                except (ValueError, TypeError):
-                    print(f"Invalid '{col_name}' value (index {index}): {item}")
-                    item = None
-            elif col_name in string_number_cols:
-                try:
-                    item = item.replace("$", "").replace("M", "000000").replace("K", "000")
-                    item = int(float(item))
-                except (ValueError, TypeError):
-                    print(f"Invalid '{col_name}' value (index {index}): {item}")
-                    item = None
-            cleaned_row[col_name] = item
-        cleaned_data.append(cleaned_row)
+        cleaned_data.append(clean_row(row, index, numeric_cols, string_number_cols, array_cols))
     return cleaned_data
 
 def create_table_if_not_exists(cursor, conn, table_name, columns):
@@ -62,6 +97,8 @@ def create_table_if_not_exists(cursor, conn, table_name, columns):
                     col_type = "NUMERIC"
                 elif isinstance(example_value, str):
                     col_type = "VARCHAR(255)"
+                elif isinstance(example_value, list):
+                    col_type = "TEXT[]"
                 else:
                     col_type = "TEXT" #Default is TEXT
 
@@ -73,15 +110,40 @@ def create_table_if_not_exists(cursor, conn, table_name, columns):
             )
             """
             cursor.execute(create_table_query)
-            conn.commit()
             print(f"Table {table_name} created.")
         else:
             print(f"Table {table_name} already exists.")
+        create_array_indexes(cursor, table_name, [col for col, value in columns.items() if isinstance(value, list)])
+        conn.commit()
     except psycopg2.Error as e:
         print(f"Error checking or creating table: {e}")
         conn.rollback()
         raise #Re-raise the exception to stop execution
 
+def create_array_indexes(cursor, table_name, array_columns):
+    """Adds a GIN index to each TEXT[] column so tag filters are index lookups.
+
+    With the index, ``"Tags" @> ARRAY['robotics']`` (has all) and ``"Tags" &&
+    ARRAY[...]`` (has any) no longer scan the table. Columns of an older table
+    that are still plain text are left alone.
+    """
+    for col in array_columns:
+        cursor.execute("SELECT data_type FROM information_schema.columns WHERE table_name = %s AND column_name = %s",
+                       (table_name.split(".")[-1], col))
+        column_type = cursor.fetchone()
+        if not column_type or column_type[0] != "ARRAY":
+            log(f"Column '{col}' of {table_name} is not an array column; reload into a new table to index its tags.", ERROR)
+            continue
+        index_name = "".join(ch if ch.isalnum() else "_" for ch in f"{table_name}_{col}_gin".lower())
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} USING GIN ("{col}")')
+
+def select_by_tags(cursor, table_name, tags, column="Tags", match_all=True):
+    """Rows whose array ``column`` contains all (or, with ``match_all=False``, any) of ``tags``."""
+    operator = "@>" if match_all else "&&"
+    cursor.execute(f'SELECT * FROM {table_name} WHERE "{column}" {operator} %s::text[]',
+                   ([tag for value in tags for tag in split_tags(value)],))
+    return cursor.fetchall()
+
 def upload_cleaned_data_to_postgres(cleaned_data, table_name, db_config):
     """Uploads pre-cleaned data to PostgreSQL."""
     conn = None
@@ -91,6 +153,8 @@ def upload_cleaned_data_to_postgres(cleaned_data, table_name, db_config):
         cursor = conn.cursor()
 
         if cleaned_data:
+            upload_start = time.perf_counter()
+            inserted = 0
             columns = ", ".join([f'"{col}"' for col in cleaned_data[0].keys()])
             placeholders = ", ".join(["%s"] * len(cleaned_data[0].values()))
             insert_query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders}) ON CONFLICT DO NOTHING"
@@ -98,21 +162,27 @@ def upload_cleaned_data_to_postgres(cleaned_data, table_name, db_config):
             for index, row_data in enumerate(cleaned_data):
                 row_tuple = tuple(row_data.values())
                 try:
-                    cursor.execute(insert_query, row_tuple)
-                    conn.commit()
+                    with metrics.timer("insert_row_seconds", table=table_name):
+                        cursor.execute(insert_query, row_tuple)
+                        conn.commit()
+                    inserted += 1
                 except psycopg2.Error as e:
-                    print(f"Error inserting row (index {index}): {e}")
+                    metrics.inc("insert_errors_total", table=table_name)
+                    log(f"Error inserting row (index {index}): {e}", ERROR)
                     conn.rollback()
                     with open("error_log.csv", "a", newline="", encoding="utf-8") as error_file:
                         writer = csv.writer(error_file)
                         writer.writerow([index, e, list(row_data.values())])
                     break
+            metrics.observe("insert_batch_seconds", time.perf_counter() - upload_start, table=table_name)
+            metrics.observe("insert_batch_rows", inserted, table=table_name)
+            metrics.inc("rows_inserted_total", inserted, table=table_name)
         else:
             print("No data to insert after cleaning.")
 
         print(f"Data uploaded to table '{table_name}' successfully on database {db_config['database']}.")
     except psycopg2.Error as err:
-        print(f"Database connection or other top-level error: {err}")
+        log(f"Database connection or other top-level error: {err}", ERROR)
         if conn:
             conn.rollback()
     finally:
@@ -120,25 +190,88 @@ def upload_cleaned_data_to_postgres(cleaned_data, table_name, db_config):
             cursor.close()
             conn.close()
 
-if __name__ == "__main__":
-    csv_file = "scrap_ai_company/data/ai_companies_startupnation.csv" #Change this to the path of your desired CSV file
-    table_name = "ai_companies" #Change this to your desired table name
-    numeric_columns = ['founded'] #Change this to the names of columns that should be numeric like date, age, etc.
-    string_number_columns = ['Employees', 'Total Raised'] #Change this to the names of columns that should be numeric but are stored as strings like 2M, $5K, etc.
+class PostgresBatchLoader:
+    """Inserts cleaned rows batch by batch, one transaction per batch.
+
+    Used by the streaming pipeline: the table is created from the first row it
+    sees, and a failing batch is rolled back and written to error_log.csv like
+    the row-by-row upload does.
+    """
+
+    def __init__(self, table_name, db_config=None):
+        self.table_name = table_name
+        self.db_config = db_config or db_config_from_env()
+        self.conn = None
+        self.cursor = None
+        self.insert_query = None
+
+    def __call__(self, batch):
+        if not batch:
+            return
+        if self.conn is None:
+            self.conn = psycopg2.connect(**self.db_config)
+            self.conn.autocommit = False
+            self.cursor = self.conn.cursor()
+            create_table_if_not_exists(self.cursor, self.conn, self.table_name, batch[0])
+            columns = ", ".join([f'"{col}"' for col in batch[0].keys()])
+            self.insert_query = f"INSERT INTO {self.table_name} ({columns}) VALUES %s ON CONFLICT DO NOTHING"
 
-    db_config = {
+        try:
+            with metrics.timer("insert_batch_seconds", table=self.table_name):
+                execute_values(self.cursor, self.insert_query, [tuple(row.values()) for row in batch], page_size=len(batch))
+                self.conn.commit()
+            metrics.observe("insert_batch_rows", len(batch), table=self.table_name)
+            metrics.inc("rows_inserted_total", len(batch), table=self.table_name)
+        except psycopg2.Error as e:
+            metrics.inc("insert_errors_total", table=self.table_name)
+            log(f"Error inserting batch of {len(batch)} rows: {e}", ERROR)
+            self.conn.rollback()
+            with open("error_log.csv", "a", newline="", encoding="utf-8") as error_file:
+                writer = csv.writer(error_file)
+                for row_data in batch:
+                    writer.writerow(["batch", e, list(row_data.values())])
+
+    def close(self):
+        if self.conn:
+            self.cursor.close()
+            self.conn.close()
+            self.conn = None
+
+def db_config_from_env():
+    """Connection settings from the POSTGRES_* environment variables."""
+    return {
         "user": os.getenv("POSTGRES_USER"),
         "password": os.getenv("POSTGRES_PASSWORD"),
         "host": os.getenv("POSTGRES_HOST"),
         "database": os.getenv("POSTGRES_DB"),
         "port": os.getenv("POSTGRES_PORT", "5432")
     }
+
+@profiled
+def load_csv(csv_file, table_name, numeric_columns=None, string_number_columns=None, db_config=None, array_columns=None,
+             validate=True):
+    """Read, clean and upload one CSV file into a PostgreSQL table, creating the table if needed.
+
+    When a datapackage.json next to the CSV describes it, the file is first
+    validated against that schema and nothing is loaded if it does not match.
+    Returns False when the file was rejected or could not be read or loaded.
+    """
+    if validate:
+        errors = validate_csv(csv_file)
+        if errors:
+            for error in errors:
+                log(f"Validation error in {csv_file}: {format_error(error)}", ERROR)
+            log(f"Not loading {csv_file} into {table_name}: it does not match its datapackage schema.", ERROR)
+            return False
+    db_config = db_config or db_config_from_env()
     conn_string = f"dbname={db_config['database']} user={db_config['user']} password={db_config['password']} host={db_config['host']} port={db_config['port']}"
     print(f"Connection String: {conn_string}")
 
     try:
-        df = pd.read_csv(csv_file, encoding='utf-8')
-        cleaned_data = clean_and_validate_data(df, numeric_columns, string_number_columns)
+        with metrics.timer("read_csv_seconds", table=table_name):
+            df = pd.read_csv(csv_file, encoding='utf-8')
+        with metrics.timer("clean_seconds", table=table_name):
+            cleaned_data = clean_and_validate_data(df, numeric_columns, string_number_columns, array_columns)
 
         if cleaned_data:
             example_row = cleaned_data[0]
@@ -153,5 +286,19 @@ if __name__ == "__main__":
 
     except (pd.errors.ParserError, FileNotFoundError) as e:
         print(f"Error reading CSV file: {e}")
+        return False
     except psycopg2.Error as e:
-        print(f"Database connection error: {e}")
\ No newline at end of file
+        print(f"Database connection error: {e}")
+        return False
+    return True
+
+if __name__ == "__main__":
+    csv_file = "scrap_ai_company/data/ai_companies_startupnation.csv" #Change this to the path of your desired CSV file
+    table_name = "ai_companies" #Change this to your desired table name
+    numeric_columns = ['founded'] #Change this to the names of columns that should be numeric like date, age, etc.
+    string_number_columns = ['Employees', 'Total Raised'] #Change this to the names of columns that should be numeric but are stored as strings like 2M, $5K, etc.
+    array_columns = ['Tags'] #Change this to the names of comma-joined list columns to store as TEXT[] with a GIN index
+
+    loaded = load_csv(csv_file, table_name, numeric_columns, string_number_columns, array_columns=array_columns)
+    metrics.flush()
+    sys.exit(0 if loaded else 1)
\ No newline at end of file
@@ -2,9 +2,17 @@ import pandas as pd
 import psycopg2
 import os
 from dotenv import load_dotenv
+import sys
 import csv
+import time
 import unicodedata
 
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from scrap_common.metrics import metrics, log, verbosity, ERROR, DEBUG  # noqa: E402
+from scrap_common.company_index import split_tags  # noqa: E402
+
 load_dotenv()  # Load environment variables from .env
 
 def clean_and_validate_data(df):
@@ -13,6 +21,9 @@ def clean_and_validate_data(df):
     for index, row in df.iterrows():
         cleaned_row = {}
         for col_name, item in row.items():
+            if col_name == 'Tags':  # Stored whole as TEXT[]; the comma-joined cell is full of empty entries
+                cleaned_row[col_name] = split_tags(None if pd.isna(item) else str(item))
+                continue
             if pd.isna(item):
                 cleaned_row[col_name] = None
                 continue
@@ -52,6 +63,8 @@ def upload_cleaned_data_to_postgres(cleaned_data, table_name, db_config):
         cursor = conn.cursor()
 
         if cleaned_data:
+            upload_start = time.perf_counter()
+            inserted = 0
             columns = ", ".join([f'"{col}"' for col in cleaned_data[0].keys()])
             placeholders = ", ".join(["%s"] * len(cleaned_data[0].values()))
             insert_query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders}) ON CONFLICT DO NOTHING"
@@ -59,23 +72,30 @@ def upload_cleaned_data_to_postgres(cleaned_data, table_name, db_config):
             for index, row_data in enumerate(cleaned_data):
                 row_tuple = tuple(row_data.values())
                 try:
-                    sql = cursor.mogrify(insert_query, row_tuple).decode('utf-8')
-                    print(f"Executing SQL: {sql}")
-                    cursor.execute(insert_query, row_tuple)
-                    conn.commit()
+                    if verbosity() >= DEBUG:  # mogrify is only worth its cost when the SQL is printed
+                        sql = cursor.mogrify(insert_query, row_tuple).decode('utf-8')
+                        log(f"Executing SQL: {sql}", DEBUG)
+                    with metrics.timer("insert_row_seconds", table=table_name):
+                        cursor.execute(insert_query, row_tuple)
+                        conn.commit()
+                    inserted += 1
                 except psycopg2.Error as e:
-                    print(f"Error inserting row (index {index}): {e}")
+                    metrics.inc("insert_errors_total", table=table_name)
+                    log(f"Error inserting row (index {index}): {e}", ERROR)
                     conn.rollback()
                     with open("error_log.csv", "a", newline="", encoding="utf-8") as error_file:
                         writer = csv.writer(error_file)
                         writer.writerow([index, e, list(row_data.values())])
                     break
+            metrics.observe("insert_batch_seconds", time.perf_counter() - upload_start, table=table_name)
+            metrics.observe("insert_batch_rows", inserted, table=table_name)
+            metrics.inc("rows_inserted_total", inserted, table=table_name)
         else:
             print("No data to insert after cleaning.")
 
         print(f"Data uploaded to table '{table_name}' successfully on database {db_config['database']}.")
     except psycopg2.Error as err:
-        print(f"Database connection or other top-level error: {err}")
+        log(f"Database connection or other top-level error: {err}", ERROR)
         if conn:
             conn.rollback()
     finally:
@@ -98,9 +118,11 @@ if __name__ == "__main__":
     print(f"Connection String: {conn_string}")
 
     try:
-        df = pd.read_csv(csv_file, encoding='utf-8')
+        with metrics.timer("read_csv_seconds", table=table_name):
+            df = pd.read_csv(csv_file, encoding='utf-8')
         df.insert(0, 'id', range(1, 1 + len(df)))
-        cleaned_data = clean_and_validate_data(df)
+        with metrics.timer("clean_seconds", table=table_name):
+            cleaned_data = clean_and_validate_data(df)
 
         conn = psycopg2.connect(**db_config)
         cursor = conn.cursor()
@@ -109,7 +131,8 @@ if __name__ == "__main__":
             table_exists = cursor.fetchone()[0]
             if not table_exists:
                 if cleaned_data:
-                    columns = ", ".join([f'"{col}" VARCHAR(255)' for col in cleaned_data[0].keys()])
+                    columns = ", ".join([f'"{col}" TEXT[]' if col == 'Tags' else f'"{col}" VARCHAR(255)'
+                                         for col in cleaned_data[0].keys()])
                     create_table_query = f"""
                     CREATE TABLE {table_name} (
                         {columns},
@@ -117,6 +140,7 @@ if __name__ == "__main__":
                     )
                     """
                     cursor.execute(create_table_query)
+                    cursor.execute(f'CREATE INDEX IF NOT EXISTS {table_name}_tags_gin ON {table_name} USING GIN ("Tags")')
                     conn.commit()
                     print(f"Table {table_name} created.")
                 else:
@@ -134,4 +158,5 @@ if __name__ == "__main__":
     except (pd.errors.ParserError, FileNotFoundError) as e:
         print(f"Error reading CSV file: {e}")
     except psycopg2.Error as e:
-        print(f"Database connection error: {e}")
\ No newline at end of file
+        print(f"Database connection error: {e}")
+    metrics.flush()
\ No newline at end of file
@@ -1,21 +1,38 @@
 import os
+import sys
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
 import time
 import json
+import csv
+
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from scrap_common.driver_pool import resolve_chromedriver  # noqa: E402
+from scrap_common.lean_profile import LeanProfile  # noqa: E402
+from scrap_common.metrics import metrics, log, ERROR, DEBUG  # noqa: E402
+from scrap_common.fixtures import store, fixture_key, fixture_mode  # noqa: E402
+from scrap_common.profiling import profiled  # noqa: E402
+from scrap_common.seen_index import SeenIndex, new_records, default_stop_after  # noqa: E402
+from scrap_common.record_buffer import RecordBuffer  # noqa: E402
 
 class ResumableScraper:
-    def __init__(self):
+    search_url = "https://finder.startupnationcentral.org/startups/search?&days=30&alltags=artificial-intelligence&status=Active"
+
+    def __init__(self, lean_profile=None):
+        # The manual login step needs a visible window, so the lean profile is never headless here
+        self.lean_profile = lean_profile or LeanProfile.from_env(headless=False)
         self.setup_chrome_options()
         self.setup_paths()
         self.header = ["Name", "Description", "Founded", "Business Model", "Employees", 
                       "Funding Stage", "Total Raised", "Tags"]
+        # Columns with a handful of distinct values, dictionary-encoded in the collected data
+        self.categorical = ["Founded", "Business Model", "Employees", "Funding Stage"]
         
     def setup_chrome_options(self):
         """Setup Chrome options to prevent sleep"""
@@ -25,6 +42,8 @@ class ResumableScraper:
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--power-save-mode=false")  # Prevent sleep mode
+        if self.lean_profile:
+            self.lean_profile.apply_options(chrome_options)  # Skip images, fonts, media and trackers
         self.chrome_options = chrome_options
         
     def setup_paths(self):
@@ -36,27 +55,39 @@ class ResumableScraper:
         self.progress_file = os.path.join(self.data_dir, 'scraping_progress.json')
         
     def initialize_driver(self):
-        """Initialize the Chrome driver"""
-        service = Service(ChromeDriverManager().install())
+        """Initialize the Chrome driver from the locally cached driver binary"""
+        driver_path = resolve_chromedriver()
+        service = Service(driver_path) if driver_path else Service()
         self.driver = webdriver.Chrome(service=service, options=self.chrome_options)
+        if self.lean_profile:
+            self.lean_profile.apply(self.driver)
         self.wait = WebDriverWait(self.driver, 120)
         
+    def new_buffer(self, rows=()):
+        """Compact columnar store for collected companies"""
+        return RecordBuffer(self.header, self.categorical, rows)
+
     def load_progress(self):
         """Load previous progress if exists"""
         if os.path.exists(self.progress_file):
             with open(self.progress_file, 'r') as f:
                 progress = json.load(f)
-            return progress.get('page_num', 1), progress.get('data', [])
-        return 1, []
+            return progress.get('page_num', 1), self.new_buffer(progress.get('data', []))
+        return 1, self.new_buffer()
         
     def save_progress(self, page_num, data):
         """Save current progress"""
+        save_start = time.perf_counter()
         with open(self.progress_file, 'w') as f:
-            json.dump({'page_num': page_num, 'data': data}, f)
+            # Written row by row so the buffer is never expanded into one big list
+            f.write(f'{{"page_num": {int(page_num)}, "data": [')
+            for i, row in enumerate(data):
+                f.write((", " if i else "") + json.dumps(row))
+            f.write(']}')
         # Also save to CSV as backup
-        df = pd.DataFrame(data, columns=self.header)
-        df.to_csv(self.data_file, index=False, quotechar='"')
-        print(f"Progress saved. Current page: {page_num}, Companies collected: {len(data)}")
+        data.to_csv(self.data_file, lineterminator='\n')
+        metrics.observe("save_progress_seconds", time.perf_counter() - save_start, scraper="startupnation")
+        log(f"Progress saved. Current page: {page_num}, Companies collected: {len(data)}", DEBUG)
             
     def extract_company_data(self, company):
         """Extract data from a single company element"""
@@ -77,7 +108,8 @@ class ResumableScraper:
             
             return [name, description, founded, business_model, employees, funding_stage, total_raised, ", ".join(tags)]
         except Exception as e:
-            print(f"Error extracting company data: {e}")
+            metrics.inc("parse_errors_total", scraper="startupnation")
+            log(f"Error extracting company data: {e}", ERROR)
             return ["N/A"] * 8
 
     def has_next_page(self):
@@ -89,75 +121,147 @@ class ResumableScraper:
                 return next_button
             return None
         except (NoSuchElementException, WebDriverException) as e:
-            print(f"Error checking for next page: {e}")
+            log(f"Error checking for next page: {e}", ERROR)
             return None
 
     def wait_for_companies(self):
         """Wait for companies to load on the page"""
         try:
-            self.wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[style='display:flex;']")))
+            with metrics.timer("fetch_seconds", scraper="startupnation"):
+                self.wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[style='display:flex;']")))
             time.sleep(3)
             return True
         except TimeoutException:
-            print("Timeout waiting for companies to load")
+            metrics.inc("fetch_errors_total", scraper="startupnation")
+            log("Timeout waiting for companies to load", ERROR)
             return False
 
-    def scrape(self):
-        """Main scraping function"""
-        url = "https://finder.startupnationcentral.org/startups/search?&days=30&alltags=artificial-intelligence&status=Active"
+    def open_search(self):
+        """Start the browser on the search page and wait for the manual login"""
+        self.initialize_driver()
+        self.driver.get(self.search_url)
         
-        try:
-            # Initialize driver and load page
-            self.initialize_driver()
-            self.driver.get(url)
+        # Wait for login
+        print("Please log in manually, and then press Enter to continue...")
+        input("Press Enter once you're logged in...")
+
+    def skip_to_page(self, page_num):
+        """Click through to the given page when resuming"""
+        for _ in range(1, page_num):
+            next_button = self.has_next_page()
+            if next_button:
+                self.driver.execute_script("arguments[0].click();", next_button)
+                time.sleep(3)
+
+    def iter_companies(self, page_num=1):
+        """Yield (page_num, idx, company_data) for every company from the current page onwards"""
+        self.page_num = page_num
+        while True:
+            log(f"\nProcessing page {page_num}...")
             
-            # Wait for login
-            print("Please log in manually, and then press Enter to continue...")
-            input("Press Enter once you're logged in...")
+            if not self.wait_for_companies():
+                return
+
+            if fixture_mode() == "record":
+                # Keep a DOM snapshot of the page for offline parser runs
+                store.save("startupnation", self.search_url, self.driver.page_source, key=fixture_key(self.search_url, page=page_num))
             
-            # Load previous progress if any
-            page_num, all_data = self.load_progress()
-            print(f"Resuming from page {page_num} with {len(all_data)} companies already collected")
+            companies = self.driver.find_elements(By.CSS_SELECTOR, "a[style='display:flex;']")
+            log(f"Found {len(companies)} companies on page {page_num}")
+            metrics.observe("rows_per_page", len(companies), scraper="startupnation")
             
-            # If resuming, navigate to the correct page
-            if page_num > 1:
-                for _ in range(1, page_num):
-                    next_button = self.has_next_page()
-                    if next_button:
-                        self.driver.execute_script("arguments[0].click();", next_button)
-                        time.sleep(3)
+            for idx, company in enumerate(companies, 1):
+                with metrics.timer("parse_seconds", scraper="startupnation"):
+                    company_data = self.extract_company_data(company)
+                metrics.inc("rows_total", scraper="startupnation")
+                log(f"Processed company {idx}/{len(companies)}: {company_data[0]}", DEBUG)
+                yield page_num, idx, company_data
             
-            while True:
-                print(f"\nProcessing page {page_num}...")
-                
-                if not self.wait_for_companies():
-                    break
+            next_button = self.has_next_page()
+            if next_button:
+                log(f"Navigating to page {page_num + 1}")
+                self.driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
+                time.sleep(1)
+                self.driver.execute_script("arguments[0].click();", next_button)
+                page_num += 1
+                self.page_num = page_num
+                time.sleep(3)
+            else:
+                print("Reached last page")
+                return
+
+    def iter_new_companies(self, index, stop_after=default_stop_after):
+        """Like iter_companies from page 1, but only companies missing from the seen index"""
+        return new_records(self.iter_companies(), index, lambda item: item[2][0], "startupnation", stop_after)
+
+    def load_existing(self):
+        """Rows of the current CSV, which an incremental run extends"""
+        buffer = self.new_buffer()
+        if not os.path.exists(self.data_file):
+            return buffer
+        with open(self.data_file, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            buffer.extend_csv_rows(reader)
+        return buffer
+
+    def iter_records(self, index=None, stop_after=default_stop_after):
+        """Log in and yield every company of the search as a dict, for the streaming pipeline
+
+        Given a seen ``index``, only companies missing from it are yielded; the
+        caller saves the index once the CSV holding them is written.
+        """
+        try:
+            self.open_search()
+            companies = self.iter_new_companies(index, stop_after) if index else self.iter_companies()
+            for _, _, company_data in companies:
+                yield dict(zip(self.header, company_data))
+        finally:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+
+    @profiled
+    def scrape(self, incremental=False, stop_after=default_stop_after):
+        """Main scraping function
+
+        With ``incremental`` the crawl starts from page 1, adds only companies
+        missing from the seen index to the current CSV and stops after
+        ``stop_after`` consecutive already-collected ones.
+        """
+        all_data = self.new_buffer()
+        self.page_num = 1
+        index = None
+        
+        try:
+            self.open_search()
+            
+            if incremental:
+                index = SeenIndex.for_csv(self.data_file, "Name")
+                start_page, all_data = 1, self.load_existing()
+                companies = self.iter_new_companies(index, stop_after)
+                print(f"Incremental run on top of {len(all_data)} companies already collected")
+            else:
+                # Load previous progress if any
+                start_page, all_data = self.load_progress()
+                print(f"Resuming from page {start_page} with {len(all_data)} companies already collected")
                 
-                companies = self.driver.find_elements(By.CSS_SELECTOR, "a[style='display:flex;']")
-                print(f"Found {len(companies)} companies on page {page_num}")
+                # If resuming, navigate to the correct page
+                if start_page > 1:
+                    self.skip_to_page(start_page)
+                companies = self.iter_companies(start_page)
+            
+            for page_num, idx, company_data in companies:
+                # Save progress after each page
+                if idx == 1 and page_num > start_page:
+                    self.save_progress(page_num, all_data)
                 
-                for idx, company in enumerate(companies, 1):
-                    company_data = self.extract_company_data(company)
-                    all_data.append(company_data)
-                    print(f"Processed company {idx}/{len(companies)}: {company_data[0]}")
-                    
-                    # Save progress every 5 companies
-                    if idx % 5 == 0:
-                        self.save_progress(page_num, all_data)
+                all_data.append(company_data)
                 
-                next_button = self.has_next_page()
-                if next_button:
-                    print(f"Navigating to page {page_num + 1}")
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-                    time.sleep(1)
-                    self.driver.execute_script("arguments[0].click();", next_button)
-                    page_num += 1
-                    time.sleep(3)
-                    # Save progress after each page
+                # Save progress every 5 companies
+                if idx % 5 == 0:
                     self.save_progress(page_num, all_data)
-                else:
-                    print("Reached last page")
-                    break
                     
         except Exception as e:
             print(f"An error occurred: {e}")
@@ -167,8 +271,10 @@ class ResumableScraper:
         finally:
             # Final save
             if all_data:
-                self.save_progress(page_num, all_data)
-                print(f"\nScraping completed or paused. Scraped {len(all_data)} companies across {page_num} pages.")
+                self.save_progress(self.page_num, all_data)
+                print(f"\nScraping completed or paused. Scraped {len(all_data)} companies across {self.page_num} pages.")
+            if index:
+                index.save(self.data_file)  # The CSV now holds every company the index learned
             
             try:
                 self.driver.quit()
@@ -177,4 +283,5 @@ class ResumableScraper:
 
 if __name__ == "__main__":
     scraper = ResumableScraper()
-    scraper.scrape()
\ No newline at end of file
+    scraper.scrape()
+    metrics.flush()
\ No newline at end of file
@@ -0,0 +1 @@
+"""Helpers shared by the scrapers, loaders and the simple_page server."""
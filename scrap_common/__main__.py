@@ -0,0 +1,5 @@
+import sys
+
+from scrap_common.cli import main
+
+sys.exit(main())
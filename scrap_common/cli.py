@@ -0,0 +1,268 @@
+"""Single entry point for the scrapers, the loader and the server.
+
+Run ``python -m scrap_common <command>``. Only argparse and os are imported up
+front; each command imports its own subsystem (requests/bs4, selenium, pandas
+and psycopg2, matplotlib) when it runs, so ``--help`` and the light commands
+start quickly.
+"""
+import os
+import argparse
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def publish_dataset(name):
+    """Precompress the freshly scraped dataset for serving and add it to its history (unless SCRAP_HISTORY=0).
+
+    Returns the exit status: 1 when the scrape left no CSV to publish.
+    """
+    from scrap_common.datasets import write_compressed_variants
+    write_compressed_variants(name)
+    from scrap_common.history import store, history_enabled
+    if history_enabled():
+        return record_snapshot(store, name)
+    return 0
+
+def record_snapshot(store, name, csv_path=None, taken=None):
+    try:
+        store.record(name, csv_path, taken)
+    except (FileNotFoundError, ValueError) as error:
+        print(f"{error}; no snapshot recorded")
+        return 1
+    return 0
+
+def scrape_tld(args):
+    if args.dynamic:
+        from scrap_domain_dynamic.script import dynamic_script
+        dynamic_script.update_dataset()
+        return publish_dataset("tld_dynamic")
+    else:
+        from scrap_domain.script import process
+        process.update_dataset()
+        process.update_byte_datapackage()
+        return publish_dataset("tld")
+
+def scrape_eu(args):
+    from scrap_eu_ai_company.script import scrap_eu_ai_v2
+    scrap_eu_ai_v2.update_dataset(max_pages=args.max_pages, incremental=args.incremental, stop_after=args.stop_after)
+    scrap_eu_ai_v2.update_byte_datapackage()
+    return publish_dataset("eu_ai_companies")
+
+def scrape_startupnation(args):
+    from scrap_ai_company.script.scrap_ai import ResumableScraper
+    ResumableScraper().scrape(incremental=args.incremental, stop_after=args.stop_after)
+    return publish_dataset("startupnation")
+
+def load(args):
+    from dotenv import load_dotenv
+    load_dotenv(args.env_file)
+    from db_push import push_to_postgre_general
+    loaded = push_to_postgre_general.load_csv(args.csv, args.table, args.numeric, args.string_number,
+                                              array_columns=args.array, validate=not args.no_validate)
+    return 0 if loaded else 1
+
+def pipeline(args):
+    from scrap_common.pipeline import Pipeline, build_source
+    records, side_output, default_table = build_source(args.source, args.max_pages, args.incremental, args.stop_after)
+    clean = load_batch = None
+    if not args.no_load:
+        from dotenv import load_dotenv
+        load_dotenv(args.env_file)
+        from db_push.push_to_postgre_general import PostgresBatchLoader, clean_row
+        clean = lambda record, index: clean_row(record, index, args.numeric, args.string_number, args.array)
+        load_batch = PostgresBatchLoader(args.table or default_table)
+    Pipeline(args.source, records, clean, load_batch, side_output,
+             queue_size=args.queue_size, batch_size=args.batch_size).run()
+    return publish_dataset({"tld": "tld", "eu": "eu_ai_companies", "startupnation": "startupnation"}[args.source])
+
+def match(args):
+    from scrap_common.entity_resolution import match_csv
+    mapping = match_csv(args.left, args.right, args.left_column, args.right_column, args.threshold, args.max_block_pairs)
+    mapping.to_csv(args.output, index=False)
+    print(f"Mapping table with {len(mapping)} rows written to {args.output}")
+    if args.table:
+        from dotenv import load_dotenv
+        load_dotenv(args.env_file)
+        from db_push import push_to_postgre_general
+        if not push_to_postgre_general.load_csv(args.output, args.table, ["left_row", "right_row"], []):
+            return 1
+
+def serve(args):
+    import simple_page
+    simple_page.run(port=args.port, workers=args.workers if args.threaded else None)
+
+def validate(args):
+    from scrap_common.datasets import datasets
+    from scrap_common.validation import validate_csv, format_error
+    unknown = [name for name in args.dataset if name not in datasets]
+    if unknown:
+        print(f"Unknown dataset(s) {', '.join(unknown)}; choose from {', '.join(datasets)}")
+        return 2
+    targets = args.csv or [datasets[name]["csv"] for name in args.dataset or datasets if datasets[name]["datapackage"]]
+    failed = 0
+    for csv_file in targets:
+        if not os.path.exists(os.path.join(os.path.dirname(os.path.abspath(csv_file)), "datapackage.json")):
+            print(f"{os.path.relpath(csv_file)}: no datapackage.json beside it, skipped")
+            continue
+        errors = validate_csv(csv_file, workers=args.workers, chunk_size=args.chunk_mb * 1024 * 1024, max_errors=args.max_errors)
+        for error in errors:
+            print(f"{os.path.relpath(csv_file)}: {format_error(error)}")
+        failed += bool(errors)
+    return 1 if failed else 0
+
+def history(args):
+    from scrap_common.history import store, write_csv
+    if args.action == "record":
+        return record_snapshot(store, args.dataset, args.csv, args.taken)
+    elif args.action == "list":
+        for entry in store.manifest(args.dataset):
+            counts = f"+{entry.get('added', entry['rows'])} -{entry.get('removed', 0)} ~{entry.get('changed', 0)}"
+            print(f"{entry['taken']}  {entry['kind']:<8} {entry['rows']:>7} rows  {counts:<18} {entry['bytes']:>9} bytes")
+    elif args.action == "as-of":
+        header, rows = store.as_of(args.dataset, args.when)
+        if header is None:
+            print(f"No snapshot of {args.dataset} as of {args.when}")
+            return 1
+        write_csv(args.output, header, rows)
+        print(f"{len(rows)} rows of {args.dataset} as of {args.when} written to {args.output}")
+    elif args.action == "diff":
+        changes = store.diff(args.dataset, args.start, args.end)
+        for key, row in changes["added"].items():
+            print(f"+ {key.replace(chr(31), ' | ')}: {row}")
+        for key, row in changes["removed"].items():
+            print(f"- {key.replace(chr(31), ' | ')}: {row}")
+        for key, (old, new) in changes["changed"].items():
+            print(f"~ {key.replace(chr(31), ' | ')}: {old} -> {new}")
+        print(f"{len(changes['added'])} added, {len(changes['removed'])} removed, {len(changes['changed'])} changed")
+
+def list_datasets(args):
+    from scrap_common.datasets import datasets, file_stat, write_compressed_variants
+    for name, dataset in datasets.items():
+        if args.compress:
+            for path in write_compressed_variants(name):
+                print(f"Wrote {os.path.relpath(path)}")
+        stats = file_stat(dataset["csv"])
+        size = f"{stats[1]:>10} bytes" if stats else "   missing"
+        print(f"{name:<16} {size}  {os.path.relpath(dataset['csv'])}")
+
+def add_incremental_arguments(command):
+    command.add_argument("--incremental", action="store_true",
+                         help="Only add companies missing from the dataset's seen index, stopping at a run of known ones")
+    command.add_argument("--stop-after", type=int, default=30, metavar="N",
+                         help="With --incremental, stop paginating after N consecutive already-seen companies")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m scrap_common", description=__doc__.splitlines()[0])
+    parser.add_argument("-v", "--verbosity", type=int, help="0 errors only, 1 progress (default), 2 per-row details")
+    parser.add_argument("--metrics-file", help="Write run metrics here (.prom for Prometheus textfile, else JSON lines)")
+    parser.add_argument("--profile", metavar="DIR", help="Profile the scrape/load entry points (cProfile, tracemalloc) into DIR")
+    parser.add_argument("--profile-sample", type=float, metavar="SECONDS",
+                        help="With --profile, also sample wall-clock stacks at this interval")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("scrape-tld", help="Scrape the IANA root zone database")
+    command.add_argument("--dynamic", action="store_true", help="Use the dynamic-header scraper and its dataset")
+    command.set_defaults(func=scrape_tld)
+
+    command = commands.add_parser("scrape-eu", help="Scrape the eu-startups.com directory")
+    command.add_argument("--max-pages", type=int, default=15)
+    add_incremental_arguments(command)
+    command.set_defaults(func=scrape_eu)
+
+    command = commands.add_parser("scrape-startupnation", help="Scrape Startup Nation Finder (needs a manual login)")
+    add_incremental_arguments(command)
+    command.set_defaults(func=scrape_startupnation)
+
+    command = commands.add_parser("load", help="Clean a CSV and upload it to PostgreSQL")
+    command.add_argument("--csv", default=os.path.join(repo_root, "scrap_ai_company", "data", "ai_companies_startupnation.csv"))
+    command.add_argument("--table", default="ai_companies")
+    command.add_argument("--numeric", nargs="*", default=["founded"], help="Columns to convert to integers")
+    command.add_argument("--string-number", nargs="*", default=["Employees", "Total Raised"],
+                         help="Columns holding numbers written like $5K or 2M")
+    command.add_argument("--array", nargs="*", default=["Tags"],
+                         help="Comma-joined list columns stored as a GIN-indexed TEXT[] column")
+    command.add_argument("--no-validate", action="store_true", help="Skip checking the CSV against its datapackage.json")
+    command.add_argument("--env-file", default=os.path.join(repo_root, "db_push", ".env"), help="File with POSTGRES_* settings")
+    command.set_defaults(func=load)
+
+    command = commands.add_parser("pipeline", help="Stream a scraper straight into PostgreSQL, writing the CSV on the way")
+    command.add_argument("source", choices=["tld", "eu", "startupnation"])
+    command.add_argument("--table", help="Target table (default depends on the source)")
+    command.add_argument("--max-pages", type=int, help="Page limit for the eu source")
+    command.add_argument("--batch-size", type=int, default=500, help="Rows per INSERT transaction")
+    command.add_argument("--queue-size", type=int, default=256, help="Records buffered between stages")
+    command.add_argument("--no-load", action="store_true", help="Only scrape and write the CSV side output")
+    add_incremental_arguments(command)
+    command.add_argument("--numeric", nargs="*", default=["founded"])
+    command.add_argument("--string-number", nargs="*", default=["Employees", "Total Raised"])
+    command.add_argument("--array", nargs="*", default=["Tags"])
+    command.add_argument("--env-file", default=os.path.join(repo_root, "db_push", ".env"))
+    command.set_defaults(func=pipeline)
+
+    command = commands.add_parser("match", help="Match company names between two CSVs and write a mapping table")
+    command.add_argument("--left", default=os.path.join(repo_root, "scrap_eu_ai_company", "data", "eu_ai_companies.csv"))
+    command.add_argument("--right", default=os.path.join(repo_root, "scrap_ai_company", "data", "ai_companies_startupnation.csv"))
+    command.add_argument("--left-column", default="Name")
+    command.add_argument("--right-column", default="Name")
+    command.add_argument("--threshold", type=float, default=0.6, help="Minimum trigram Jaccard similarity")
+    command.add_argument("--max-block-pairs", type=int, default=10_000, help="Skip blocking keys producing more pairs")
+    command.add_argument("--output", default="company_matches.csv")
+    command.add_argument("--table", help="Also load the mapping table into this PostgreSQL table")
+    command.add_argument("--env-file", default=os.path.join(repo_root, "db_push", ".env"))
+    command.set_defaults(func=match)
+
+    command = commands.add_parser("serve", help="Run the simple_page dashboard server")
+    command.add_argument("--port", type=int, default=8000)
+    command.add_argument("--threaded", action="store_true", help="Serve on a bounded worker pool with keep-alive")
+    command.add_argument("--workers", type=int, default=16)
+    command.set_defaults(func=serve)
+
+    command = commands.add_parser("validate", help="Check CSVs against their datapackage.json schemas")
+    command.add_argument("dataset", nargs="*", help="Datasets to check, as listed by 'datasets' (default: all with a datapackage)")
+    command.add_argument("--csv", nargs="*", help="Check these CSV files against the datapackage.json beside them instead")
+    command.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    command.add_argument("--chunk-mb", type=int, default=8, help="Size of the chunks handed to the workers")
+    command.add_argument("--max-errors", type=int, default=20, help="Stop after this many errors per file")
+    command.set_defaults(func=validate)
+
+    command = commands.add_parser("history", help="Record and query dataset snapshots")
+    actions = command.add_subparsers(dest="action", required=True)
+    action = actions.add_parser("record", help="Snapshot a dataset's current CSV")
+    action.add_argument("dataset")
+    action.add_argument("--csv", help="CSV to record (default: the dataset's file)")
+    action.add_argument("--taken", help="ISO timestamp to file the snapshot under (default: now); not before the last snapshot")
+    action = actions.add_parser("list", help="List the snapshots of a dataset")
+    action.add_argument("dataset")
+    action = actions.add_parser("as-of", help="Rebuild a dataset as it was at a date or time")
+    action.add_argument("dataset")
+    action.add_argument("when", help="ISO date (end of that day) or timestamp")
+    action.add_argument("--output", default="as_of.csv")
+    action = actions.add_parser("diff", help="Show what changed between two dates or times")
+    action.add_argument("dataset")
+    action.add_argument("start")
+    action.add_argument("end")
+    command.set_defaults(func=history)
+
+    command = commands.add_parser("datasets", help="List the scraped datasets and their sizes")
+    command.add_argument("--compress", action="store_true",
+                         help="Write the .gz (and, with zstandard installed, .zst) copies the server sends")
+    command.set_defaults(func=list_datasets)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Settings are read from the environment, so they also reach the subsystems
+    if args.verbosity is not None:
+        os.environ["SCRAP_VERBOSITY"] = str(args.verbosity)
+    if args.metrics_file:
+        os.environ["SCRAP_METRICS_FILE"] = args.metrics_file
+    if args.profile:
+        os.environ["SCRAP_PROFILE_DIR"] = args.profile
+    if args.profile_sample:
+        os.environ["SCRAP_PROFILE_SAMPLE"] = str(args.profile_sample)
+
+    status = args.func(args)
+
+    from scrap_common.metrics import metrics
+    metrics.flush()
+    return status
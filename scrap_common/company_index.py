@@ -0,0 +1,127 @@
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+
+from scrap_common.datasets import normalized_missing_values
+
+def normalize(value):
+    """Lower-cased, whitespace-collapsed form used for index keys and query terms."""
+    return " ".join((value or "").split()).lower()
+
+def split_tags(value):
+    """Normalized, de-duplicated tags of a comma-joined Tags cell (empty entries dropped)."""
+    tags = []
+    for tag in (value or "").split(","):
+        tag = normalize(tag)
+        if tag and tag not in normalized_missing_values and tag not in tags:
+            tags.append(tag)
+    return tags
+
+# Year stored for rows without a usable Founded value; below any real year
+no_year = -2 ** 63
+empty_posting = array("I")
+
+def contains(posting, row_id):
+    """Whether the sorted ``posting`` holds ``row_id``."""
+    position = bisect_left(posting, row_id)
+    return position < len(posting) and posting[position] == row_id
+
+def parse_year(value):
+    value = (value or "").strip()
+    return int(value) if value.isdigit() else None
+
+# Result lists kept per index, so paging through a query does not recompute it
+query_cache_size = 256
+
+class CompanyIndex:
+    """In-memory query index over a company CSV.
+
+    Holds an inverted index from normalized tag and "Based in" values to row ids,
+    each posting a sorted ``array`` of ids, and the ``Founded`` years as a
+    sorted array for range lookups with bisect. Each record is serialized to
+    JSON once at build time, so a result page is a join of pre-encoded
+    fragments.
+    """
+
+    def __init__(self, records):
+        self.rows = []
+        self.by_tag = {}
+        self.by_location = {}
+        self.years = array("q")
+        founded = []
+
+        for row_id, record in enumerate(records):
+            self.rows.append(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+            for tag in split_tags(record.get("Tags")):
+                self.by_tag.setdefault(tag, array("I")).append(row_id)
+            location = normalize(record.get("Based in"))
+            if location and location not in normalized_missing_values:
+                self.by_location.setdefault(location, array("I")).append(row_id)
+            year = parse_year(record.get("Founded"))
+            if year is not None and year >= 2 ** 63:
+                year = None  # Would overflow the 64-bit arrays
+            self.years.append(no_year if year is None else year)
+            if year is not None:
+                founded.append((year, row_id))
+
+        founded.sort()
+        self.founded_years = array("q", (year for year, _ in founded))
+        self.founded_ids = array("I", (row_id for _, row_id in founded))
+        self._results = {}
+
+    def founded_between(self, start=None, end=None):
+        """Row ids with start <= Founded <= end, from the sorted year array (ordered by year)."""
+        lo = bisect_left(self.founded_years, start) if start is not None else 0
+        hi = bisect_right(self.founded_years, end) if end is not None else len(self.founded_years)
+        return self.founded_ids[lo:hi]
+
+    def query(self, tags=(), based_in=None, founded_min=None, founded_max=None):
+        """Sorted row ids matching every given filter (all rows when no filter is given).
+
+        A single tag or location returns its posting array as is. Otherwise
+        the smallest posting is intersected with the others by binary search
+        and filtered on the year, and the result is cached, so the following
+        pages of the same query are a slice.
+        """
+        filters = (tuple(sorted({normalize(tag) for tag in tags})), normalize(based_in) if based_in else None,
+                   founded_min, founded_max)
+        if filters == ((), None, None, None):
+            return range(len(self.rows))
+        matches = self._results.get(filters)
+        if matches is None:
+            matches = self._match(*filters)
+            if len(self._results) >= query_cache_size:
+                self._results.clear()
+            self._results[filters] = matches
+        return matches
+
+    def _match(self, tags, based_in, founded_min, founded_max):
+        postings = [self.by_tag.get(tag, empty_posting) for tag in tags]
+        if based_in is not None:
+            postings.append(self.by_location.get(based_in, empty_posting))
+        by_year = founded_min is not None or founded_max is not None
+        if not postings:
+            return array("I", sorted(self.founded_between(founded_min, founded_max)))
+        if len(postings) == 1 and not by_year:
+            return postings[0]
+
+        postings.sort(key=len)
+        smallest, others = postings[0], postings[1:]
+        low = founded_min if founded_min is not None else no_year + 1
+        high = founded_max if founded_max is not None else 2 ** 63 - 1
+        years = self.years
+        matches = array("I")
+        for row_id in smallest:
+            if by_year and not low <= years[row_id] <= high:
+                continue
+            if all(contains(posting, row_id) for posting in others):
+                matches.append(row_id)
+        return matches
+
+    def page_json(self, ids, page, per_page, extra=None):
+        """JSON bytes for one page of results, built from the pre-encoded rows."""
+        start = (page - 1) * per_page
+        selected = ids[start:start + per_page]
+        header = dict(extra or {}, total=len(ids), page=page, per_page=per_page)
+        return (json.dumps(header)[:-1].encode('utf-8') + b', "results": ['
+                + b", ".join(self.rows[row_id] for row_id in selected) + b"]}")
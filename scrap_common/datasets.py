@@ -0,0 +1,186 @@
+import os
+import csv
+import gzip
+import shutil
+import hashlib
+import threading
+
+from scrap_common.metrics import log, ERROR
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The scraped datasets, each a CSV plus its datapackage.json when the scraper writes one
+datasets = {
+    "eu_ai_companies": {
+        "csv": os.path.join(repo_root, "scrap_eu_ai_company", "data", "eu_ai_companies.csv"),
+        "datapackage": os.path.join(repo_root, "scrap_eu_ai_company", "data", "datapackage.json"),
+    },
+    "startupnation": {
+        "csv": os.path.join(repo_root, "scrap_ai_company", "data", "ai_companies_startupnation.csv"),
+        "datapackage": None,
+    },
+    "tld": {
+        "csv": os.path.join(repo_root, "scrap_domain", "data", "top-level-domain-names.csv"),
+        "datapackage": os.path.join(repo_root, "scrap_domain", "data", "datapackage.json"),
+    },
+    "tld_dynamic": {
+        "csv": os.path.join(repo_root, "scrap_domain_dynamic", "data", "top-level-domain-names-dynamic.csv"),
+        "datapackage": os.path.join(repo_root, "scrap_domain_dynamic", "data", "datapackage.json"),
+    },
+}
+
+# Cell values the scrapers write when a field is absent
+missing_values = {"", "N/A", "None"}
+
+# The same placeholders, lower-cased to compare with normalized (lower-cased) values
+normalized_missing_values = {value.lower() for value in missing_values}
+
+def file_stat(path):
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    if not path:
+        return None
+    try:
+        stats = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stats.st_mtime_ns, stats.st_size
+
+def file_hash(path):
+    """SHA-1 of a file's contents, or None if it does not exist."""
+    if not path:
+        return None
+    try:
+        with open(path, 'rb') as file:
+            return hashlib.sha1(file.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+# Content-Encoding of each precompressed copy written beside a dataset file, and its suffix
+compressed_suffixes = {"zstd": ".zst", "gzip": ".gz"}
+
+def dataset_files(name):
+    """The files of a dataset that exist on disk: its CSV and, if any, its datapackage.json."""
+    dataset = datasets[name]
+    return [path for path in (dataset["csv"], dataset["datapackage"]) if path and os.path.exists(path)]
+
+def zstd_compressor():
+    """A zstandard compressor, or None when the optional zstandard package is not installed."""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard.ZstdCompressor(level=19)
+
+def compress_file(path, encoding):
+    """Write ``path`` + suffix compressed with ``encoding``, stamped with the source's mtime.
+
+    Returns False when the encoding is not available here. The copy is written
+    to a temporary file and renamed, so readers never see half of it.
+    """
+    compressor = zstd_compressor() if encoding == "zstd" else None
+    if encoding == "zstd" and compressor is None:
+        return False
+    target = path + compressed_suffixes[encoding]
+    with open(path, 'rb') as source, open(target + ".tmp", 'wb') as raw:
+        if compressor:
+            compressor.copy_stream(source, raw)
+        else:
+            with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=9, mtime=0) as compressed:
+                shutil.copyfileobj(source, compressed, 1024 * 1024)
+    stats = os.stat(path)
+    os.utime(target + ".tmp", ns=(stats.st_atime_ns, stats.st_mtime_ns))
+    os.replace(target + ".tmp", target)
+    return True
+
+def compressed_variant(path, encoding):
+    """Path of an up-to-date precompressed copy of ``path``, or None if there is none."""
+    target = path + compressed_suffixes[encoding]
+    source_stats, target_stats = file_stat(path), file_stat(target)
+    if source_stats and target_stats and target_stats[0] == source_stats[0]:
+        return target
+    return None
+
+def write_compressed_variants(name):
+    """Precompress a dataset's files for the server; copies already matching the source are kept."""
+    written = []
+    for path in dataset_files(name):
+        for encoding in compressed_suffixes:
+            if compressed_variant(path, encoding) is None and compress_file(path, encoding):
+                written.append(path + compressed_suffixes[encoding])
+    return written
+
+def read_records(name):
+    """Yield every row of a dataset's CSV as a dict."""
+    with open(datasets[name]["csv"], 'r', newline='', encoding='utf-8') as file:
+        yield from csv.DictReader(file)
+
+def group_counts(records, columns):
+    """Count the non-missing values of several columns in one pass: {column: {value: count}}."""
+    counts = {column: {} for column in columns}
+    for record in records:
+        for column, column_counts in counts.items():
+            value = (record.get(column) or "").strip()
+            if value not in missing_values:
+                column_counts[value] = column_counts.get(value, 0) + 1
+    return counts
+
+class DerivedCache:
+    """A value built from one dataset, rebuilt only when the dataset changes on disk.
+
+    Every ``get`` costs two ``os.stat`` calls. When the CSV's mtime/size changed,
+    or the datapackage's stat changed and its content hash differs, ``build`` is
+    called with the dataset's records on a background thread while ``get``
+    keeps returning the previous value; the (value, version) pair is then
+    swapped in as one reference, so readers never wait on a rebuild and always
+    see a complete value. Only the first ``get`` builds on the calling thread,
+    as there is nothing to serve yet.
+    """
+
+    def __init__(self, name, build):
+        self.name = name
+        self.build = build
+        self.current = (None, None)
+        self._stats = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._builder = None
+
+    def _current_stats(self):
+        dataset = datasets[self.name]
+        return file_stat(dataset["csv"]), file_stat(dataset["datapackage"])
+
+    def get(self):
+        """Return (value, version); version is a short hash identifying the data it was built from."""
+        stats = self._current_stats()
+        if stats != self._stats:
+            if self._signature is None:
+                with self._lock:
+                    if self._signature is None:
+                        self.refresh(stats)
+            else:
+                self._refresh_in_background(stats)
+        return self.current
+
+    def _refresh_in_background(self, stats):
+        with self._lock:
+            if self._builder is not None and self._builder.is_alive():
+                return
+            self._builder = threading.Thread(target=self._rebuild, args=(stats,), name=f"rebuild-{self.name}", daemon=True)
+            self._builder.start()
+
+    def _rebuild(self, stats):
+        try:
+            self.refresh(stats)
+        except Exception as error:
+            log(f"Rebuilding the {self.name} cache failed, still serving the previous version: {error!r}", ERROR)
+            self._stats = stats  # Retried once the files change again
+
+    def refresh(self, stats=None):
+        """Rebuild now, on the calling thread, if the dataset changed since the last build."""
+        stats = stats or self._current_stats()
+        signature = (stats[0], file_hash(datasets[self.name]["datapackage"]))
+        if signature != self._signature:
+            value = self.build(read_records(self.name)) if stats[0] else self.build(iter(()))
+            self.current = (value, hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()[:16])
+            self._signature = signature
+        self._stats = stats
@@ -0,0 +1,178 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+
+# Where downloaded driver binaries and the resolved-path manifest are kept
+driver_cache_dir = os.getenv("SCRAP_DRIVER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "scrap_drivers"))
+
+user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
+
+def resolve_chromedriver(cache_dir=driver_cache_dir):
+    """Return a local chromedriver path, downloading it only if nothing is cached yet.
+
+    Resolution order: the CHROMEDRIVER_PATH environment variable, the path recorded
+    in the cache manifest, then (unless SCRAP_DRIVER_OFFLINE is set) a one-time
+    download through webdriver_manager into the cache directory. Returns None when
+    offline with nothing cached, letting Selenium look for a driver on PATH.
+    """
+    env_path = os.getenv("CHROMEDRIVER_PATH")
+    if env_path and os.path.exists(env_path):
+        return env_path
+
+    manifest = os.path.join(cache_dir, "chromedriver.json")
+    if os.path.exists(manifest):
+        try:
+            with open(manifest, 'r', encoding='utf-8') as file:
+                cached_path = json.load(file).get("path")
+            if cached_path and os.path.exists(cached_path):
+                return cached_path
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable driver manifest '{manifest}': {e}")
+
+    if os.getenv("SCRAP_DRIVER_OFFLINE"):
+        print("No cached chromedriver found and SCRAP_DRIVER_OFFLINE is set; falling back to PATH.")
+        return None
+
+    # Only reached on the first run on a machine, so the import stays local
+    from webdriver_manager.chrome import ChromeDriverManager
+    from webdriver_manager.core.driver_cache import DriverCacheManager
+
+    os.makedirs(cache_dir, exist_ok=True)
+    driver_path = ChromeDriverManager(cache_manager=DriverCacheManager(root_dir=cache_dir)).install()
+    with open(manifest, 'w', encoding='utf-8') as file:
+        json.dump({"path": driver_path}, file, indent=2)
+    return driver_path
+
+def default_chrome_options(profile=None):
+    """Headless Chrome options used by the batch checkers, optionally with a LeanProfile."""
+    options = webdriver.ChromeOptions()
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument(f"user-agent={user_agent}")
+    if profile is not None:
+        profile.apply_options(options)
+    else:
+        options.add_argument('--headless=new')
+    return options
+
+class DriverPool:
+    """A small pool of long-lived Chrome drivers shared between worker threads.
+
+    Drivers are started lazily, up to ``size`` of them, and handed out one at a
+    time, so browser startup is paid once per driver instead of once per URL.
+    ``on_start`` is called with each new driver, e.g. to enable request blocking.
+    Callers waiting for a driver are woken both when one is returned and when
+    a broken one is discarded, in which case they start its replacement.
+    """
+
+    def __init__(self, size=2, options_factory=None, driver_path=None, on_start=None):
+        self.size = max(1, size)
+        self.options_factory = options_factory or default_chrome_options
+        self.on_start = on_start
+        self.driver_path = driver_path if driver_path is not None else resolve_chromedriver()
+        self._idle = []
+        self._drivers = []
+        self._started = 0
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+
+    def _start_driver(self):
+        """Start a new Chrome instance with the pool's options."""
+        service = Service(self.driver_path) if self.driver_path else Service()
+        driver = webdriver.Chrome(service=service, options=self.options_factory())
+        if self.on_start:
+            self.on_start(driver)
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def _acquire(self):
+        """Take an idle driver, start a new one if below size, or wait for either to become possible."""
+        with self._available:
+            while not self._idle and self._started >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return self._start_driver()
+        except Exception:
+            with self._available:
+                self._started -= 1
+                self._available.notify()
+            raise
+
+    def _release(self, driver):
+        """Hand a driver back for the next caller."""
+        with self._available:
+            self._idle.append(driver)
+            self._available.notify()
+
+    def _discard(self, driver):
+        """Drop a broken driver and wake a waiting caller to start a fresh one in its place."""
+        with self._available:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self._started -= 1
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver for the duration of a ``with`` block."""
+        driver = self._acquire()
+        try:
+            yield driver
+        except WebDriverException:
+            self._discard(driver)
+            raise
+        except BaseException:
+            self._release(driver)
+            raise
+        else:
+            self._release(driver)
+
+    def map(self, func, items, return_exceptions=False):
+        """Call ``func(driver, item)`` for every item on the pool, keeping input order.
+
+        With ``return_exceptions`` a failing item yields its exception instead of
+        aborting the whole batch. A driver that raised a WebDriverException is
+        replaced either way.
+        """
+        def run(item):
+            try:
+                with self.driver() as driver:
+                    return func(driver, item)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(run, items))
+
+    def close(self):
+        """Quit every driver the pool started."""
+        with self._available:
+            drivers, self._drivers = self._drivers, []
+            self._idle = []
+            self._started = 0
+            self._available.notify_all()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,196 @@
+import os
+import re
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from scrap_common.datasets import normalized_missing_values
+from scrap_common.metrics import metrics, log
+
+# Trailing tokens that only name the legal form ("Acme GmbH" is "Acme")
+legal_forms = {
+    "ab", "ag", "as", "aps", "bv", "co", "corp", "corporation", "gmbh", "inc", "kft", "kg", "limited",
+    "llc", "ltd", "nv", "oy", "oue", "plc", "sa", "sarl", "sas", "se", "spa", "srl", "sro", "ug", "zoo",
+}
+
+_non_alnum = re.compile(r"[^a-z0-9]+")
+_soundex_codes = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556")
+
+# Names are compared on their first ``signature_width`` characters
+signature_width = 32
+_popcount_table = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+def normalize_name(name):
+    """ASCII, lower-case, punctuation-free company name without a trailing legal form."""
+    name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii").lower()
+    tokens = _non_alnum.sub(" ", name).split()
+    while len(tokens) > 1 and tokens[-1] in legal_forms:
+        tokens.pop()
+    return " ".join(tokens)
+
+def soundex(token):
+    """American Soundex code of one token ("" for an empty token)."""
+    if not token:
+        return ""
+    codes = token.translate(_soundex_codes)
+    key, last = token[0], codes[0]
+    for code in codes[1:]:
+        if code != last and code.isdigit():
+            key += code
+        if code not in "hw":
+            last = code
+    return (key + "000")[:4]
+
+def blocking_keys(name):
+    """(prefix, suffix, phonetic) blocking keys of a normalized name.
+
+    Two names only become a candidate pair when they share one of the keys: the
+    first or last five letters of the first word (usually the distinctive one;
+    later words tend to be generic like "labs" or "ai"), or the Soundex codes of
+    the first and last word. A single typo leaves at least one of them intact.
+    """
+    tokens = name.split()
+    if not tokens:
+        return "", "", ""
+    phonetic = soundex(tokens[0]) + (soundex(tokens[-1]) if len(tokens) > 1 else "")
+    return tokens[0][:5], tokens[0][-5:], phonetic
+
+def signatures(names, chunk_size=100_000):
+    """128-bit character-trigram sets of normalized names, as an (n, 2) uint64 array.
+
+    Each name is padded with spaces and copied into a fixed-width byte matrix, so
+    the trigrams of every name are hashed to a bit position and OR-ed together
+    with array operations instead of a Python loop per trigram.
+    """
+    result = np.zeros((len(names), 2), dtype=np.uint64)
+    for start in range(0, len(names), chunk_size):
+        chunk = [f" {name} "[:signature_width] for name in names[start:start + chunk_size]]
+        lengths = np.fromiter((len(name) for name in chunk), dtype=np.int64, count=len(chunk))
+        chars = np.frombuffer("".join(name.ljust(signature_width) for name in chunk).encode("ascii"), dtype=np.uint8)
+        chars = chars.reshape(len(chunk), signature_width).astype(np.uint32)
+
+        trigrams = (chars[:, :-2] << 16) | (chars[:, 1:-1] << 8) | chars[:, 2:]
+        bits = ((trigrams * np.uint32(2654435761)) >> np.uint32(25)).astype(np.uint64)
+        valid = np.arange(signature_width - 2) < (lengths - 2)[:, None]
+        for word in range(2):
+            in_word = valid & (bits >> np.uint64(6) == word)
+            masks = np.where(in_word, np.uint64(1) << (bits & np.uint64(63)), np.uint64(0))
+            result[start:start + len(chunk), word] = np.bitwise_or.reduce(masks, axis=1)
+    return result
+
+def popcount(values):
+    """Set bits per row of a 2-d uint64 array."""
+    return _popcount_table[values.view(np.uint8)].reshape(len(values), -1).sum(axis=1, dtype=np.int64)
+
+def similarity(left_signatures, right_signatures, left_ids, right_ids, chunk_size=1_000_000):
+    """Jaccard similarity of the trigram sets of each (left_ids[i], right_ids[i]) pair."""
+    scores = np.empty(len(left_ids), dtype=np.float32)
+    for start in range(0, len(left_ids), chunk_size):
+        a = left_signatures[left_ids[start:start + chunk_size]]
+        b = right_signatures[right_ids[start:start + chunk_size]]
+        union = popcount(a | b)
+        scores[start:start + chunk_size] = popcount(a & b) / np.maximum(union, 1)
+    return scores
+
+def candidate_pairs(left_keys, right_keys, max_block_pairs=10_000):
+    """Row-id pairs sharing a blocking key, as two int64 arrays without duplicates.
+
+    ``left_keys``/``right_keys`` are DataFrames with one column per key type.
+    Keys are factorized to integer block ids and the pairs of every block are
+    expanded with array arithmetic over the right side sorted by block. A block
+    whose pair count exceeds ``max_block_pairs`` (a very common prefix or sound)
+    is skipped rather than compared in full; the number of skipped pairs is
+    returned as the third value.
+    """
+    left_parts, right_parts, skipped = [], [], 0
+    for column in left_keys.columns:
+        codes, uniques = pd.factorize(pd.concat([left_keys[column], right_keys[column]], ignore_index=True))
+        left_codes, right_codes = codes[:len(left_keys)], codes[len(left_keys):]
+        left_counts = np.bincount(left_codes, minlength=len(uniques)).astype(np.int64)
+        right_counts = np.bincount(right_codes, minlength=len(uniques)).astype(np.int64)
+
+        block_pairs = left_counts * right_counts
+        allowed = block_pairs <= max_block_pairs
+        allowed[uniques == ""] = False
+        skipped += int(block_pairs[~allowed & (uniques != "")].sum())
+
+        right_order = np.argsort(right_codes, kind="stable")
+        block_starts = np.cumsum(right_counts) - right_counts
+        left_ids = np.flatnonzero(allowed[left_codes])
+        repeats = right_counts[left_codes[left_ids]]
+        offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        left_parts.append(np.repeat(left_ids, repeats))
+        right_parts.append(right_order[np.repeat(block_starts[left_codes[left_ids]], repeats) + offsets])
+
+    # A pair found through several key types is kept once (sort, then drop repeats)
+    combined = np.concatenate(left_parts) * len(right_keys) + np.concatenate(right_parts)
+    combined.sort()
+    combined = combined[np.concatenate(([True], combined[1:] != combined[:-1]))] if len(combined) else combined
+    return combined // len(right_keys), combined % len(right_keys), skipped
+
+def prepare(names):
+    """Normalized names, blocking keys and signatures of one side.
+
+    Placeholders ("N/A", "None", blanks) normalize to "", which has no blocking
+    keys, so those rows never become candidates.
+    """
+    normalized = ["" if (name or "").strip().lower() in normalized_missing_values else normalize_name(name)
+                  for name in names]
+    keys = pd.DataFrame([blocking_keys(name) for name in normalized], columns=["prefix", "suffix", "phonetic"])
+    return normalized, keys, signatures(normalized)
+
+def match_names(left_names, right_names, threshold=0.6, max_block_pairs=10_000):
+    """Best right-hand match of every left-hand name scoring at least ``threshold``.
+
+    Returns a DataFrame with ``left_row``, ``right_row`` and ``score`` columns
+    (row positions in the two inputs) and a dict of per-phase timings and counts.
+    """
+    stats = {}
+    start = time.perf_counter()
+    _, left_keys, left_signatures = prepare(left_names)
+    _, right_keys, right_signatures = prepare(right_names)
+    stats["prepare_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    left_ids, right_ids, stats["skipped_pairs"] = candidate_pairs(left_keys, right_keys, max_block_pairs)
+    stats["candidate_pairs"] = len(left_ids)
+    stats["block_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = similarity(left_signatures, right_signatures, left_ids, right_ids)
+    keep = scores >= threshold
+    matches = pd.DataFrame({"left_row": left_ids[keep], "right_row": right_ids[keep], "score": scores[keep]})
+    matches = (matches.sort_values(["left_row", "score"], ascending=[True, False])
+               .drop_duplicates("left_row").reset_index(drop=True))
+    stats["score_seconds"] = time.perf_counter() - start
+    stats["matches"] = len(matches)
+
+    for phase in ("prepare", "block", "score"):
+        metrics.observe("entity_resolution_seconds", stats[f"{phase}_seconds"], phase=phase)
+    metrics.inc("entity_resolution_candidate_pairs_total", stats["candidate_pairs"])
+    metrics.inc("entity_resolution_matches_total", stats["matches"])
+    return matches, stats
+
+def match_csv(left_csv, right_csv, left_column="Name", right_column="Name", threshold=0.6, max_block_pairs=10_000):
+    """Mapping table between the companies of two CSV files, ready for ``db_push``.
+
+    One row per matched left-hand company: the source file names, the row
+    positions and names on both sides, and the similarity score.
+    """
+    left = pd.read_csv(left_csv, usecols=[left_column], dtype=str, keep_default_na=False)[left_column]
+    right = pd.read_csv(right_csv, usecols=[right_column], dtype=str, keep_default_na=False)[right_column]
+    matches, stats = match_names(left.tolist(), right.tolist(), threshold, max_block_pairs)
+    log(f"Matched {stats['matches']} of {len(left)} names against {len(right)} "
+        f"({stats['candidate_pairs']} candidate pairs, {stats['skipped_pairs']} skipped in oversized blocks)")
+
+    return pd.DataFrame({
+        "left_source": os.path.basename(left_csv),
+        "left_row": matches.left_row,
+        "left_name": left.to_numpy()[matches.left_row],
+        "right_source": os.path.basename(right_csv),
+        "right_row": matches.right_row,
+        "right_name": right.to_numpy()[matches.right_row],
+        "score": matches.score.round(3),
+    })
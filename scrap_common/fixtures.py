@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Where recorded responses and DOM snapshots are stored, one sub-directory per corpus
+default_fixture_dir = os.getenv("SCRAP_FIXTURE_DIR", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures"))
+default_replay_url = "http://127.0.0.1:8765"
+
+def fixture_mode():
+    """Current fixture mode from SCRAP_FIXTURE_MODE: 'record', 'replay' or '' (live)."""
+    return os.getenv("SCRAP_FIXTURE_MODE", "").lower()
+
+def fixture_key(url, page=None):
+    """Scheme-less key for a URL: host, path and query string.
+
+    ``page`` distinguishes DOM snapshots of client-side paginated pages that
+    share one URL; it is appended as a query parameter so it survives replay.
+    """
+    parts = urlsplit(url)
+    key = parts.netloc + (parts.path or "/")
+    query = parts.query
+    if page is not None:
+        query = f"{query}&_page={page}" if query else f"_page={page}"
+    if query:
+        key += "?" + query
+    return key
+
+class FixtureStore:
+    """Raw responses and DOM snapshots on disk, grouped in named corpora.
+
+    Each corpus directory holds one body file per URL key plus an ``index.json``
+    with the URL, content type, status and recording time of every entry.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or default_fixture_dir
+        self._lock = threading.Lock()
+
+    def corpus_dir(self, corpus):
+        return os.path.join(self.root, corpus)
+
+    def _index_path(self, corpus):
+        return os.path.join(self.corpus_dir(corpus), "index.json")
+
+    def index(self, corpus):
+        """Return {key: metadata} for a corpus (empty if it was never recorded)."""
+        try:
+            with open(self._index_path(corpus), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def corpora(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.exists(self._index_path(name)))
+
+    def save(self, corpus, url, body, content_type="text/html; charset=utf-8", status=200, key=None):
+        """Store one response body (bytes or str) under ``key`` (default: the URL's key)."""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        key = key or fixture_key(url)
+        filename = hashlib.sha1(key.encode('utf-8')).hexdigest() + ".body"
+        directory = self.corpus_dir(corpus)
+        with self._lock:
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, filename), 'wb') as file:
+                file.write(body)
+            entries = self.index(corpus)
+            entries[key] = {"url": url, "file": filename, "content_type": content_type,
+                            "status": status, "bytes": len(body), "recorded_at": time.time()}
+            tmp_path = self._index_path(corpus) + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(entries, file, indent=2)
+            os.replace(tmp_path, self._index_path(corpus))
+        return key
+
+    def load(self, corpus, key):
+        """Return (body bytes, metadata) for a key, or (None, None) if it is not recorded."""
+        meta = self.index(corpus).get(key)
+        if meta is None:
+            return None, None
+        with open(os.path.join(self.corpus_dir(corpus), meta["file"]), 'rb') as file:
+            return file.read(), meta
+
+    def bodies(self, corpus):
+        """Yield (key, body bytes) for every entry of a corpus, in key order."""
+        for key in sorted(self.index(corpus)):
+            body, _ = self.load(corpus, key)
+            yield key, body
+
+store = FixtureStore()
+
+def replay_url(url, corpus, key=None):
+    """URL of a recorded entry on the replay server (SCRAP_REPLAY_URL)."""
+    base = os.getenv("SCRAP_REPLAY_URL", default_replay_url).rstrip("/")
+    return f"{base}/{corpus}/{key or fixture_key(url)}"
+
+def fetch(url, corpus, timeout=10, **kwargs):
+    """``requests.get`` that records responses or replays them from the local server.
+
+    SCRAP_FIXTURE_MODE=record saves every successful response into the corpus;
+    SCRAP_FIXTURE_MODE=replay fetches the recorded copy from the replay server
+    instead of the live site. Any other value leaves the request untouched.
+    """
+    import requests
+
+    mode = fixture_mode()
+    target = replay_url(url, corpus) if mode == "replay" else url
+    response = requests.get(target, timeout=timeout, **kwargs)
+    if mode == "record" and response.ok:
+        store.save(corpus, url, response.content, response.headers.get("Content-Type", "text/html"), response.status_code)
+    return response
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Serves ``/<corpus>/<key>`` from the fixture store; 404 for anything unrecorded."""
+
+    fixture_store = store
+
+    def do_GET(self):
+        corpus, _, key = self.path.lstrip("/").partition("/")
+        body, meta = self.fixture_store.load(corpus, key)
+        if body is None:
+            self.send_error(404, f"No fixture recorded for {key} in corpus {corpus}")
+            return
+        self.send_response(meta.get("status", 200))
+        self.send_header('Content-type', meta.get("content_type", "text/html"))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_replay_server(fixture_store=None, port=0):
+    """Start the replay server on a background thread; returns (server, base URL)."""
+    handler = type("BoundReplayHandler", (ReplayHandler,), {"fixture_store": fixture_store or store})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded fixtures for SCRAP_FIXTURE_MODE=replay runs.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--root", default=default_fixture_dir)
+    args = parser.parse_args()
+
+    server, base_url = start_replay_server(FixtureStore(args.root), args.port)
+    print(f"Replaying fixtures from '{args.root}' on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,244 @@
+import os
+import csv
+import gzip
+import json
+import threading
+from datetime import datetime, time as day_time, timezone
+
+from scrap_common.datasets import datasets, file_hash, repo_root
+from scrap_common.metrics import metrics, log
+
+# Where dataset snapshots are kept, one sub-directory per dataset
+default_history_dir = os.getenv("SCRAP_HISTORY_DIR", os.path.join(repo_root, "history"))
+
+# Columns identifying a row across refreshes
+key_columns = {
+    "eu_ai_companies": ["Name"],
+    "startupnation": ["Name"],
+    "tld": ["Domain"],
+    "tld_dynamic": ["Domain"],
+}
+
+def history_enabled():
+    """False when SCRAP_HISTORY=0 turns off snapshots after scrape runs."""
+    return os.getenv("SCRAP_HISTORY", "1") != "0"
+
+def parse_time(value):
+    """Aware UTC datetime from an ISO date or timestamp; a bare date means the end of that day."""
+    if isinstance(value, datetime):
+        moment = value
+    elif len(value) == 10:
+        moment = datetime.combine(datetime.fromisoformat(value).date(), day_time.max)
+    else:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+def keyed_rows(header, rows, columns):
+    """{key: row} in file order; a repeated key gets an occurrence suffix so no row is lost."""
+    indexes = [header.index(column) for column in columns if column in header] or [0]
+    keyed = {}
+    for row in rows:
+        key = "\x1f".join(row[index] if index < len(row) else "" for index in indexes)
+        if key in keyed:
+            occurrence = 2
+            while f"{key}\x1e{occurrence}" in keyed:
+                occurrence += 1
+            key = f"{key}\x1e{occurrence}"
+        keyed[key] = row
+    return keyed
+
+def read_csv(filepath):
+    with open(filepath, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        return header, list(reader)
+
+def compute_delta(old_rows, new_rows):
+    """Rows to upsert and keys to delete to turn ``old_rows`` into ``new_rows``."""
+    upsert = {key: row for key, row in new_rows.items() if old_rows.get(key) != row}
+    delete = [key for key in old_rows if key not in new_rows]
+    return upsert, delete
+
+def delta_order(old_rows, new_rows, delete):
+    """What a delta must carry, besides its rows, for ``apply_delta`` to rebuild the file order of ``new_rows``.
+
+    Nothing when the added rows are all at the end; the positions of the added
+    rows when the kept rows stay in their old order; otherwise the whole key
+    order (a re-sorted file).
+    """
+    removed = set(delete)
+    kept = [key for key in old_rows if key not in removed]
+    if kept != [key for key in new_rows if key in old_rows]:
+        return {"order": list(new_rows)}
+    inserted = [[position, key] for position, key in enumerate(new_rows) if key not in old_rows]
+    if inserted and inserted[0][0] < len(kept):
+        return {"insert_at": inserted}
+    return {}
+
+def apply_delta(rows, delta):
+    """{key: row} after applying a delta to ``rows``, in the file order of the snapshot it was taken from."""
+    for key in delta["delete"]:
+        rows.pop(key, None)
+    rows.update(delta["upsert"])
+    if "order" in delta:
+        return {key: rows[key] for key in delta["order"]}
+    if "insert_at" in delta:
+        inserted = {key for _, key in delta["insert_at"]}
+        keys = [key for key in rows if key not in inserted]
+        for position, key in delta["insert_at"]:
+            keys.insert(position, key)
+        return {key: rows[key] for key in keys}
+    return rows
+
+class SnapshotStore:
+    """Dataset history as keyframes plus compressed keyed deltas.
+
+    Each dataset directory holds a ``manifest.json`` listing the snapshots in
+    time order and one gzipped JSON file per snapshot. A keyframe holds every
+    row; a delta holds only the rows added or changed since the previous
+    snapshot, the keys removed and, when rows were not simply appended, where
+    they go (see ``delta_order``). A new keyframe is written every
+    ``keyframe_interval`` snapshots, when the header changes or when a delta
+    would be larger than half the dataset, so rebuilding any snapshot reads one
+    keyframe and at most ``keyframe_interval - 1`` small deltas.
+    """
+
+    def __init__(self, root=None, keyframe_interval=12):
+        self.root = root or default_history_dir
+        self.keyframe_interval = keyframe_interval
+        self._lock = threading.Lock()
+
+    def dataset_dir(self, name):
+        return os.path.join(self.root, name)
+
+    def _manifest_path(self, name):
+        return os.path.join(self.dataset_dir(name), "manifest.json")
+
+    def manifest(self, name):
+        """Snapshot entries of a dataset, oldest first (empty if none was recorded)."""
+        try:
+            with open(self._manifest_path(name), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return []
+
+    def _read(self, name, entry):
+        with gzip.open(os.path.join(self.dataset_dir(name), entry["file"]), 'rt', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _write(self, name, filename, content):
+        tmp_path = os.path.join(self.dataset_dir(name), filename + ".tmp")
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=9) as file:
+            json.dump(content, file, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, os.path.join(self.dataset_dir(name), filename))
+        return os.path.getsize(os.path.join(self.dataset_dir(name), filename))
+
+    def _state(self, name, entries, position):
+        """(header, {key: row}) after the snapshot at ``position`` of ``entries``."""
+        start = position
+        while entries[start]["kind"] != "keyframe":
+            start -= 1
+        keyframe = self._read(name, entries[start])
+        header, rows = keyframe["header"], keyframe["rows"]
+        for entry in entries[start + 1:position + 1]:
+            rows = apply_delta(rows, self._read(name, entry))
+        return header, rows
+
+    def record(self, name, csv_path=None, taken=None):
+        """Add the dataset's current CSV as a snapshot; returns its manifest entry.
+
+        Nothing is written (and None is returned) when the CSV has not changed
+        since the last snapshot. Raises FileNotFoundError when there is no CSV,
+        e.g. after a failed scrape, and ValueError when ``taken`` is earlier
+        than the last snapshot: each delta is relative to the one before it, so
+        snapshots can only be added in time order.
+        """
+        csv_path = csv_path or datasets[name]["csv"]
+        digest = file_hash(csv_path)
+        if digest is None:
+            raise FileNotFoundError(f"{name}: no CSV at '{csv_path}' to record")
+        taken = parse_time(taken) if taken else datetime.now(timezone.utc)
+        with self._lock:
+            entries = self.manifest(name)
+            if entries and taken < parse_time(entries[-1]["taken"]):
+                raise ValueError(f"{name}: cannot record a snapshot taken {taken.isoformat()}, "
+                                 f"before the last one ({entries[-1]['taken']})")
+            if entries and entries[-1]["sha1"] == digest:
+                log(f"{name}: unchanged since the snapshot of {entries[-1]['taken']}, nothing recorded")
+                return None
+
+            header, rows = read_csv(csv_path)
+            rows = keyed_rows(header, rows, key_columns.get(name, [header[0]] if header else []))
+            entry = {"taken": taken.isoformat(), "sha1": digest, "rows": len(rows)}
+
+            kind = "keyframe"
+            if entries:
+                since_keyframe = len(entries) - max(i for i, e in enumerate(entries) if e["kind"] == "keyframe")
+                old_header, old_rows = self._state(name, entries, len(entries) - 1)
+                upsert, delete = compute_delta(old_rows, rows)
+                order = delta_order(old_rows, rows, delete)
+                entry.update(added=sum(1 for key in upsert if key not in old_rows),
+                             changed=sum(1 for key in upsert if key in old_rows), removed=len(delete))
+                if (old_header == header and since_keyframe < self.keyframe_interval
+                        and len(upsert) + len(delete) <= len(rows) / 2):
+                    kind = "delta"
+
+            os.makedirs(self.dataset_dir(name), exist_ok=True)
+            entry["kind"] = kind
+            entry["file"] = f"{len(entries) + 1:06d}.{kind}.json.gz"
+            content = {"header": header, "rows": rows} if kind == "keyframe" else {"upsert": upsert, "delete": delete, **order}
+            entry["bytes"] = self._write(name, entry["file"], content)
+
+            entries.append(entry)
+            tmp_path = self._manifest_path(name) + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(entries, file, indent=2)
+            os.replace(tmp_path, self._manifest_path(name))
+
+        metrics.inc("history_snapshots_total", dataset=name, kind=kind)
+        metrics.observe("history_snapshot_bytes", entry["bytes"], dataset=name, kind=kind)
+        log(f"{name}: recorded {kind} {entry['file']} ({entry['bytes']} bytes, {entry['rows']} rows)")
+        return entry
+
+    def _position(self, entries, when):
+        """Index of the last snapshot taken at or before ``when``, or None."""
+        when = parse_time(when)
+        position = None
+        for i, entry in enumerate(entries):
+            if parse_time(entry["taken"]) <= when:
+                position = i
+        return position
+
+    def as_of(self, name, when):
+        """(header, rows) of the dataset as it was at ``when``, or (None, None) before the first snapshot."""
+        entries = self.manifest(name)
+        position = self._position(entries, when)
+        if position is None:
+            return None, None
+        header, rows = self._state(name, entries, position)
+        return header, list(rows.values())
+
+    def diff(self, name, start, end):
+        """What changed between the snapshots in effect at ``start`` and at ``end``.
+
+        Returns {"added": {key: row}, "removed": {key: row}, "changed": {key: (old, new)}},
+        keyed by the dataset's key columns joined with a unit separator.
+        """
+        entries = self.manifest(name)
+        start_position, end_position = self._position(entries, start), self._position(entries, end)
+        old_rows = self._state(name, entries, start_position)[1] if start_position is not None else {}
+        new_rows = self._state(name, entries, end_position)[1] if end_position is not None else {}
+        upsert, delete = compute_delta(old_rows, new_rows)
+        return {
+            "added": {key: row for key, row in upsert.items() if key not in old_rows},
+            "removed": {key: old_rows[key] for key in delete},
+            "changed": {key: (old_rows[key], row) for key, row in upsert.items() if key in old_rows},
+        }
+
+store = SnapshotStore()
+
+def write_csv(filepath, header, rows):
+    with open(filepath, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
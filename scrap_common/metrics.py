@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Print verbosity levels; a message is printed when its level <= SCRAP_VERBOSITY
+ERROR, INFO, DEBUG = 0, 1, 2
+
+# Upper bounds for histogram buckets: durations (``*_seconds``) and sizes (everything else)
+time_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+size_buckets = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+
+def verbosity():
+    """Current print verbosity from SCRAP_VERBOSITY (default INFO)."""
+    try:
+        return int(os.getenv("SCRAP_VERBOSITY", INFO))
+    except ValueError:
+        return INFO
+
+def log(message, level=INFO):
+    """Print ``message`` only if the configured verbosity allows it."""
+    if level <= verbosity():
+        print(message)
+
+class Histogram:
+    """Cumulative-bucket histogram with count, sum, min and max."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def cumulative(self):
+        """Bucket counts as Prometheus expects them: observations <= each bound."""
+        total, result = 0, []
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+class Metrics:
+    """In-process registry of counters and histograms, keyed by name and labels.
+
+    Updating a metric is a dict lookup under a lock, cheap enough for per-row
+    hot loops. Nothing is written until ``flush`` is called, which emits either
+    JSON lines or a Prometheus textfile depending on the target file extension.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        """Increase a counter."""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """Record one observation in a histogram."""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(time_buckets if name.endswith("_seconds") else size_buckets)
+                self.histograms[key] = histogram
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the wall-clock duration of a ``with`` block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        """Return every series as a list of plain dicts."""
+        timestamp = time.time()
+        series = []
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                series.append({"ts": timestamp, "type": "counter", "name": name, "labels": dict(labels), "value": value})
+            for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                series.append({"ts": timestamp, "type": "histogram", "name": name, "labels": dict(labels),
+                               "count": histogram.count, "sum": histogram.sum, "min": histogram.min, "max": histogram.max,
+                               "buckets": {str(bound): total for bound, total in histogram.cumulative()}})
+        return series
+
+    def write_jsonl(self, filepath):
+        """Append the current snapshot to a JSON lines file."""
+        with open(filepath, 'a', encoding='utf-8') as file:
+            for entry in self.snapshot():
+                file.write(json.dumps(entry) + "\n")
+
+    def write_prometheus(self, filepath):
+        """Atomically replace a node_exporter textfile with the current snapshot."""
+        def label_text(labels, **extra):
+            merged = dict(labels, **extra)
+            if not merged:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(merged.items())) + "}"
+
+        lines, typed = [], set()
+        for entry in self.snapshot():
+            name = f"scrap_{entry['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} {entry['type']}")
+                typed.add(name)
+            if entry["type"] == "counter":
+                lines.append(f"{name}{label_text(entry['labels'])} {entry['value']}")
+                continue
+            for bound, total in entry["buckets"].items():
+                lines.append(f"{name}_bucket{label_text(entry['labels'], le=bound)} {total}")
+            lines.append(f"{name}_bucket{label_text(entry['labels'], le='+Inf')} {entry['count']}")
+            lines.append(f"{name}_sum{label_text(entry['labels'])} {entry['sum']}")
+            lines.append(f"{name}_count{label_text(entry['labels'])} {entry['count']}")
+
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, filepath)
+
+    def flush(self, filepath=None):
+        """Write metrics to ``filepath`` or SCRAP_METRICS_FILE (``.prom`` selects Prometheus format).
+
+        Does nothing when no target is configured.
+        """
+        filepath = filepath or os.getenv("SCRAP_METRICS_FILE")
+        if not filepath:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(filepath))
+            os.makedirs(directory, exist_ok=True)
+            if filepath.endswith(".prom"):
+                self.write_prometheus(filepath)
+            else:
+                self.write_jsonl(filepath)
+            log(f"Metrics written to '{filepath}'.", DEBUG)
+        except OSError as e:
+            log(f"Error writing metrics to '{filepath}': {e}", ERROR)
+
+# Process-wide registry used by every scraper and loader
+metrics = Metrics()
@@ -0,0 +1,254 @@
+import os
+import csv
+import time
+import shutil
+import queue
+import threading
+
+from scrap_common.metrics import metrics, log, ERROR
+
+# End-of-stream marker passed down the queues
+_end = object()
+
+class PipelineAborted(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+class CsvSideOutput:
+    """Writes raw records to a CSV file as they stream past, then runs ``on_close``.
+
+    Records go to ``<file>.tmp``, which only replaces the dataset when the
+    pipeline finished without error and wrote at least one record; otherwise
+    the dataset is left as it was and ``on_close`` is skipped. ``on_close`` is
+    where a scraper's datapackage update goes, so the CSV and datapackage.json
+    end up exactly as a normal scraper run would leave them. With ``append``
+    the records are added after the rows of the existing file.
+    """
+
+    def __init__(self, filepath, header, on_close=None, append=False):
+        self.filepath = filepath
+        self.tmp_path = filepath + ".tmp"
+        has_rows = append and os.path.exists(filepath) and os.path.getsize(filepath) > 0
+        if has_rows:
+            shutil.copyfile(filepath, self.tmp_path)
+        self.file = open(self.tmp_path, 'a' if has_rows else 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=header, extrasaction='ignore')
+        if not has_rows:
+            self.writer.writeheader()
+        self.on_close = on_close
+        self.records = 0
+
+    def write(self, record):
+        self.writer.writerow(record)
+        self.records += 1
+
+    def close(self, succeeded=True):
+        """Swap the new file in if ``succeeded`` and records were written, else discard it."""
+        if self.file.closed:
+            return
+        self.file.close()
+        if not succeeded or not self.records:
+            os.remove(self.tmp_path)
+            log(f"CSV file '{self.filepath}' left unchanged ({'run failed' if not succeeded else 'no records'}).")
+            return
+        os.replace(self.tmp_path, self.filepath)
+        log(f"CSV file '{self.filepath}' updated successfully.")
+        if self.on_close:
+            self.on_close()
+
+class Pipeline:
+    """Streams records scrape -> clean -> load over bounded queues, one thread per stage.
+
+    The loader starts inserting while the scraper is still fetching pages. Queues
+    hold at most ``queue_size`` items, so a slow loader makes the scraper wait
+    (backpressure) instead of buffering the whole crawl. Every stage counts its
+    records, busy time and time spent blocked on a full or empty queue under the
+    ``pipeline_*`` metrics, and ``run`` returns the same figures as a dict.
+    """
+
+    def __init__(self, name, records, clean=None, load=None, side_output=None, queue_size=256, batch_size=500):
+        self.name = name
+        self.records = records
+        self.clean = clean
+        self.load = load
+        self.side_output = side_output
+        self.batch_size = batch_size
+        self.raw_queue = queue.Queue(maxsize=queue_size)
+        self.clean_queue = queue.Queue(maxsize=queue_size)
+        self.failed = threading.Event()
+        self.errors = []
+        self.stats = {stage: {"records": 0, "busy_seconds": 0.0, "blocked_seconds": 0.0}
+                      for stage in ("scrape", "clean", "load")}
+
+    def _put(self, target, item, stage):
+        start = time.perf_counter()
+        while True:
+            if self.failed.is_set():
+                raise PipelineAborted()
+            try:
+                target.put(item, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        self.stats[stage]["blocked_seconds"] += time.perf_counter() - start
+
+    def _get(self, source, stage):
+        start = time.perf_counter()
+        while True:
+            if self.failed.is_set():
+                raise PipelineAborted()
+            try:
+                item = source.get(timeout=0.5)
+                break
+            except queue.Empty:
+                continue
+        self.stats[stage]["blocked_seconds"] += time.perf_counter() - start
+        return item
+
+    def _run_stage(self, stage, work):
+        try:
+            work()
+        except PipelineAborted:
+            pass
+        except Exception as e:
+            self.errors.append((stage, e))
+            log(f"Pipeline '{self.name}' stage '{stage}' failed: {e}", ERROR)
+            self.failed.set()
+
+    def _scrape(self):
+        iterator = iter(self.records)
+        try:
+            while True:
+                start = time.perf_counter()
+                record = next(iterator, _end)
+                self.stats["scrape"]["busy_seconds"] += time.perf_counter() - start
+                if record is _end:
+                    break
+                self.stats["scrape"]["records"] += 1
+                self._put(self.raw_queue, record, "scrape")
+        finally:
+            # Lets generator sources release browsers or connections when aborted early
+            if hasattr(iterator, "close"):
+                iterator.close()
+        self._put(self.raw_queue, _end, "scrape")
+
+    def _clean(self):
+        index = 0
+        while True:
+            record = self._get(self.raw_queue, "clean")
+            if record is _end:
+                break
+            start = time.perf_counter()
+            if self.side_output:
+                self.side_output.write(record)
+            cleaned = self.clean(record, index) if self.clean else record
+            index += 1
+            self.stats["clean"]["busy_seconds"] += time.perf_counter() - start
+            if cleaned is not None:
+                self.stats["clean"]["records"] += 1
+                self._put(self.clean_queue, cleaned, "clean")
+        self._put(self.clean_queue, _end, "clean")
+
+    def _load(self):
+        batch = []
+        try:
+            while True:
+                record = self._get(self.clean_queue, "load")
+                if record is not _end:
+                    batch.append(record)
+                if batch and (record is _end or len(batch) >= self.batch_size):
+                    start = time.perf_counter()
+                    if self.load:
+                        self.load(batch)
+                    self.stats["load"]["busy_seconds"] += time.perf_counter() - start
+                    self.stats["load"]["records"] += len(batch)
+                    batch = []
+                if record is _end:
+                    break
+        finally:
+            if hasattr(self.load, "close"):
+                self.load.close()
+
+    def run(self):
+        """Run all stages to completion; returns per-stage stats (raises if a stage failed).
+
+        The side output only replaces its file once every stage has finished
+        cleanly, so a failed fetch, a loader error or Ctrl-C leaves the
+        dataset as it was.
+        """
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self._run_stage, args=(stage, work), name=f"{self.name}-{stage}")
+                   for stage, work in (("scrape", self._scrape), ("clean", self._clean), ("load", self._load))]
+        completed = False
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            completed = True
+        finally:
+            if not completed:
+                # Interrupted: stop the stages before discarding the side output they write to
+                self.failed.set()
+                for thread in threads:
+                    if thread.is_alive():
+                        thread.join()
+            if self.side_output:
+                self.side_output.close(succeeded=completed and not self.errors)
+        elapsed = time.perf_counter() - start
+
+        for stage, stats in self.stats.items():
+            stats["records_per_second"] = stats["records"] / elapsed if elapsed else 0.0
+            metrics.inc("pipeline_records_total", stats["records"], pipeline=self.name, stage=stage)
+            metrics.observe("pipeline_busy_seconds", stats["busy_seconds"], pipeline=self.name, stage=stage)
+            metrics.observe("pipeline_blocked_seconds", stats["blocked_seconds"], pipeline=self.name, stage=stage)
+            log(f"[{self.name}] {stage:<6} {stats['records']:>7} records  {stats['records_per_second']:9.1f}/s  "
+                f"busy {stats['busy_seconds']:7.2f}s  blocked {stats['blocked_seconds']:7.2f}s")
+
+        if self.errors:
+            stage, error = self.errors[0]
+            raise RuntimeError(f"Pipeline '{self.name}' failed in stage '{stage}'") from error
+        return self.stats
+
+def saving_index(index, csv_path, then=None):
+    """An ``on_close`` that saves a seen index once its CSV has been replaced, then runs ``then``."""
+    def on_close():
+        index.save(csv_path)
+        if then:
+            then()
+    return on_close
+
+def build_source(name, max_pages=None, incremental=False, stop_after=None):
+    """Return (records, side_output, default_table) for one of the scrapers.
+
+    With ``incremental`` the eu and startupnation sources only yield companies
+    missing from their seen index and the CSV side output is appended to.
+    The scraper module is only imported here, when its pipeline actually runs.
+    """
+    if name == "tld":
+        from scrap_domain.script import process
+        process.ensure_directory_exists(process.data)
+        side_output = CsvSideOutput(process.data, process.header, on_close=process.update_byte_datapackage)
+        return process.iter_records(), side_output, "top_level_domains"
+    from scrap_common.seen_index import SeenIndex, default_stop_after
+    stop_after = stop_after or default_stop_after
+    if name == "eu":
+        from scrap_eu_ai_company.script import scrap_eu_ai_v2
+        scrap_eu_ai_v2.ensure_directory_exists(scrap_eu_ai_v2.data_file)
+        max_pages = max_pages or scrap_eu_ai_v2.max_page_number
+        on_close = scrap_eu_ai_v2.update_byte_datapackage
+        if incremental:
+            index = SeenIndex.for_csv(scrap_eu_ai_v2.data_file, "Name")
+            records = scrap_eu_ai_v2.iter_new_companies(index, max_pages, stop_after)
+            on_close = saving_index(index, scrap_eu_ai_v2.data_file, on_close)
+        else:
+            records = scrap_eu_ai_v2.iter_companies(max_pages)
+        side_output = CsvSideOutput(scrap_eu_ai_v2.data_file, scrap_eu_ai_v2.header, on_close=on_close, append=incremental)
+        return records, side_output, "eu_ai_companies"
+    if name == "startupnation":
+        from scrap_ai_company.script.scrap_ai import ResumableScraper
+        scraper = ResumableScraper()
+        index = SeenIndex.for_csv(scraper.data_file, "Name") if incremental else None
+        side_output = CsvSideOutput(scraper.data_file, scraper.header, append=incremental,
+                                    on_close=saving_index(index, scraper.data_file) if index else None)
+        return scraper.iter_records(index, stop_after), side_output, "ai_companies"
+    raise ValueError(f"Unknown pipeline source '{name}'")
@@ -0,0 +1,221 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import functools
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+from scrap_common.metrics import log
+
+# Only one profile runs at a time; nested entry points run unprofiled inside it
+_active = threading.Lock()
+
+def profile_dir():
+    """Directory to write profiles to (SCRAP_PROFILE_DIR), or None when profiling is off."""
+    return os.getenv("SCRAP_PROFILE_DIR") or None
+
+def sample_interval():
+    """Seconds between wall-clock stack samples (SCRAP_PROFILE_SAMPLE), or None to not sample."""
+    try:
+        interval = float(os.getenv("SCRAP_PROFILE_SAMPLE", 0))
+    except ValueError:
+        return None
+    return interval if interval > 0 else None
+
+def top_n():
+    try:
+        return int(os.getenv("SCRAP_PROFILE_TOP", 25))
+    except ValueError:
+        return 25
+
+def frame_label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+class StackSampler:
+    """Background thread that records the stacks of all other threads every ``interval`` seconds.
+
+    Unlike cProfile this sees time spent waiting on the network, a browser or
+    the database, which is where most scraper time goes.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.counts = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+class PeakSnapshots:
+    """Background thread keeping a tracemalloc snapshot from near the memory peak.
+
+    A snapshot taken when the run returns only shows what is still alive, not
+    the lists and pages that were freed on the way out. This one re-snapshots
+    whenever traced memory grows 10% past the last snapshot, so the number of
+    snapshots grows with the logarithm of the peak.
+    """
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.snapshot = None
+        self.size = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="peak-snapshots", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            current = tracemalloc.get_traced_memory()[0]
+            if current > self.size * 1.1:
+                self.snapshot, self.size = tracemalloc.take_snapshot(), current
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+def collapsed_from_pstats(stats, max_depth=64):
+    """Collapsed stacks ("a;b;c microseconds") rebuilt from cProfile's caller graph.
+
+    cProfile only keeps caller -> callee edges, so a function's time is split
+    between its callers in proportion to the time each call edge accounts for.
+    """
+    entries = stats.stats
+    callees = {}
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((function, edge[3]))
+
+    lines = {}
+
+    def walk(function, share, stack):
+        total_time, cumulative_time = entries[function][2], entries[function][3]
+        if cumulative_time <= 0 or share <= 0:
+            return
+        label = f"{os.path.basename(function[0])}:{function[2]}" if function[0] != "~" else function[2]
+        stack = stack + [label]
+        key = ";".join(stack)
+        lines[key] = lines.get(key, 0) + share * total_time / cumulative_time
+        if len(stack) >= max_depth:
+            return
+        for callee, edge_time in callees.get(function, ()):
+            if callee in entries and callee != function:
+                walk(callee, share * edge_time / cumulative_time, stack)
+
+    for function, (_, _, _, cumulative_time, callers) in entries.items():
+        if not callers:
+            walk(function, cumulative_time, [])
+    return {key: int(seconds * 1_000_000) for key, seconds in lines.items() if seconds * 1_000_000 >= 1}
+
+def write_collapsed(filepath, counts):
+    with open(filepath, 'w', encoding='utf-8') as file:
+        for stack, count in sorted(counts.items()):
+            file.write(f"{stack} {count}\n")
+
+def write_allocations(filepath, peak, snapshots, limit):
+    """Peak traced memory, then the top ``limit`` allocation sites of each (title, snapshot) pair."""
+    with open(filepath, 'w', encoding='utf-8') as file:
+        file.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n")
+        for title, snapshot in snapshots:
+            if snapshot is None:
+                continue
+            statistics = snapshot.statistics("lineno")
+            file.write(f"\nTop {limit} allocation sites {title} "
+                       f"({sum(stat.size for stat in statistics) / 1024 / 1024:.1f} MiB traced):\n")
+            for stat in statistics[:limit]:
+                frame = stat.traceback[0]
+                file.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8} blocks  {frame.filename}:{frame.lineno}\n")
+
+@contextmanager
+def profile(name):
+    """Profile the enclosed block into SCRAP_PROFILE_DIR.
+
+    Writes ``<name>-<time>.pstats`` (cProfile), ``.collapsed`` (flamegraph.pl /
+    speedscope input: sampled wall-clock stacks when SCRAP_PROFILE_SAMPLE is set,
+    otherwise rebuilt from the cProfile data) and ``.alloc.txt`` (tracemalloc
+    peak and the top SCRAP_PROFILE_TOP allocation sites near the peak and at
+    the end). Does nothing when profiling is off or another profile is already
+    running.
+    """
+    directory = profile_dir()
+    if not directory or not _active.acquire(blocking=False):
+        yield
+        return
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        interval = sample_interval()
+        sampler = StackSampler(interval) if interval else None
+        peak_snapshots = PeakSnapshots()
+        profiler = cProfile.Profile()
+
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start()
+        peak_snapshots.start()
+        if sampler:
+            sampler.start()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            if sampler:
+                sampler.stop()
+            peak_snapshots.stop()
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+            profiler.dump_stats(f"{base}.pstats")
+            stats = pstats.Stats(profiler)
+            write_collapsed(f"{base}.collapsed", sampler.counts if sampler else collapsed_from_pstats(stats))
+            write_allocations(f"{base}.alloc.txt", peak,
+                              [("near the peak", peak_snapshots.snapshot), ("still alive at the end", snapshot)], top_n())
+            log(f"Profile of {name} written to {base}.pstats/.collapsed/.alloc.txt")
+    finally:
+        _active.release()
+
+def profiled(func):
+    """Decorator profiling each call of an entry point when SCRAP_PROFILE_DIR is set.
+
+    The setting is read when the function is defined: with profiling off the
+    function is returned unchanged, so the decorator costs nothing at call time.
+    """
+    if not profile_dir():
+        return func
+    name = f"{os.path.splitext(os.path.basename(func.__code__.co_filename))[0]}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with profile(name):
+            return func(*args, **kwargs)
+    return wrapper
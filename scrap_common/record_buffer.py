@@ -0,0 +1,224 @@
+import io
+import csv
+from array import array
+
+from scrap_common.metrics import log
+
+# Largest dictionary each code width can index, narrowest first
+code_widths = [("B", 0xFF), ("H", 0xFFFF), ("I", 0xFFFFFFFF)]
+
+class CategoricalColumn:
+    """Dictionary-encoded column: each distinct value is stored once, rows hold a 1-4 byte code.
+
+    Codes start one byte wide and the array is widened when the dictionary
+    outgrows it, so a column with a few dozen values costs one byte per row.
+    """
+
+    __slots__ = ("values", "lookup", "codes", "_limit")
+
+    def __init__(self):
+        self.values = []
+        self.lookup = {}
+        self.codes = array(code_widths[0][0])
+        self._limit = code_widths[0][1]
+
+    def append(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+            if code > self._limit:
+                typecode, self._limit = next((t, limit) for t, limit in code_widths if code <= limit)
+                self.codes = array(typecode, self.codes)
+        self.codes.append(code)
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def nbytes(self):
+        return self.codes.itemsize * len(self.codes) + sum(len(value) + 49 for value in self.values)
+
+class TextColumn:
+    """Free-text column kept as one UTF-8 buffer plus the end offset of each value.
+
+    Costs the encoded length plus 8 bytes per row, instead of a str object
+    (49 bytes of header or more) per value.
+    """
+
+    __slots__ = ("data", "ends")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array("Q")
+
+    def append(self, value):
+        self.data += value.encode("utf-8")
+        self.ends.append(len(self.data))
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.ends)
+        start = self.ends[index - 1] if index > 0 else 0
+        return self.data[start:self.ends[index]].decode("utf-8")
+
+    def __iter__(self):
+        data, start = self.data, 0
+        for end in self.ends:
+            yield data[start:end].decode("utf-8")
+            start = end
+
+    def nbytes(self):
+        return len(self.data) + self.ends.itemsize * len(self.ends)
+
+class RecordBuffer:
+    """Append-only rows of a fixed header, stored column by column.
+
+    The scrapers collect every company before writing the CSV. Kept as a list
+    of row lists, each cell is its own str object even when the column only
+    ever holds a handful of values ("Seed", "B2B", "11-50"). Here the columns
+    named in ``categorical`` are dictionary-encoded and the others are packed
+    into one UTF-8 buffer each, which takes several times less memory (see
+    benchmarks/record_buffer_benchmark.py).
+
+    Rows go in as lists in header order or as dicts, and come back out as
+    lists (indexing, iteration), dicts (``records``), a CSV file (``to_csv``),
+    a pandas DataFrame with categorical dtypes (``to_dataframe``) or a
+    PostgreSQL ``COPY ... FROM STDIN`` stream (``copy_stream``/``copy_to``).
+    """
+
+    __slots__ = ("header", "columns", "_length")
+
+    def __init__(self, header, categorical=(), rows=()):
+        self.header = list(header)
+        self.columns = [CategoricalColumn() if name in categorical else TextColumn() for name in self.header]
+        self._length = 0
+        self.extend(rows)
+
+    def append(self, row):
+        """Add one row, given as a sequence in header order or as a dict keyed by column name."""
+        if isinstance(row, dict):
+            row = [row.get(name) for name in self.header]
+        elif len(row) != len(self.header):
+            raise ValueError(f"Expected {len(self.header)} values, got {len(row)}")
+        for column, value in zip(self.columns, row):
+            column.append("" if value is None else str(value))
+        self._length += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def extend_csv_rows(self, rows):
+        """Add rows read back from an existing CSV, which may have been edited by hand.
+
+        Blank rows are skipped, and list rows with too few or too many cells
+        are padded with "" or truncated to the header, where ``append`` would
+        raise. Returns the number of rows added.
+        """
+        width = len(self.header)
+        added = skipped = ragged = 0
+        for row in rows:
+            values = row.values() if isinstance(row, dict) else row
+            if not any(value not in (None, "") for value in values):
+                skipped += 1
+                continue
+            if not isinstance(row, dict) and len(row) != width:
+                row = (list(row) + [""] * width)[:width]
+                ragged += 1
+            self.append(row)
+            added += 1
+        if skipped or ragged:
+            log(f"Existing CSV: skipped {skipped} blank rows, fitted {ragged} rows to the {width} columns")
+        return added
+
+    def __len__(self):
+        return self._length
+
+    def __bool__(self):
+        return self._length > 0
+
+    def __getitem__(self, index):
+        if not -self._length <= index < self._length:
+            raise IndexError("record index out of range")
+        return [column[index] for column in self.columns]
+
+    def __iter__(self):
+        return (list(row) for row in zip(*self.columns))
+
+    def records(self):
+        """Yield each row as a dict keyed by the header."""
+        header = self.header
+        return (dict(zip(header, row)) for row in zip(*self.columns))
+
+    def column(self, name):
+        return list(self.columns[self.header.index(name)])
+
+    def nbytes(self):
+        """Approximate memory held by the column data, for comparing with other layouts."""
+        return sum(column.nbytes() for column in self.columns)
+
+    def to_csv(self, file, header=True, **fmtparams):
+        """Write the rows to a path or an open text file; ``fmtparams`` go to csv.writer."""
+        if isinstance(file, str):
+            with open(file, 'w', newline='', encoding='utf-8') as handle:
+                return self.to_csv(handle, header, **fmtparams)
+        writer = csv.writer(file, **fmtparams)
+        if header:
+            writer.writerow(self.header)
+        writer.writerows(zip(*self.columns))
+
+    def to_dataframe(self):
+        """pandas DataFrame of the rows; dictionary-encoded columns become pandas categoricals without re-encoding."""
+        import pandas as pd
+        data = {}
+        for name, column in zip(self.header, self.columns):
+            if isinstance(column, CategoricalColumn):
+                data[name] = pd.Categorical.from_codes(column.codes, categories=column.values)
+            else:
+                data[name] = list(column)
+        return pd.DataFrame(data, columns=self.header)
+
+    def copy_stream(self, chunk_rows=1000):
+        """Readable text stream of the rows as CSV without a header, for ``COPY ... FROM STDIN WITH (FORMAT csv)``."""
+        return CsvStream(zip(*self.columns), chunk_rows)
+
+    def copy_to(self, cursor, table_name, columns=None):
+        """COPY the rows into an existing table through a psycopg2 cursor (the caller commits)."""
+        columns = ", ".join(f'"{name}"' for name in (columns or self.header))
+        cursor.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)", self.copy_stream())
+
+class CsvStream:
+    """Readable text stream producing CSV from rows on demand, ``chunk_rows`` rows at a time."""
+
+    def __init__(self, rows, chunk_rows=1000):
+        self.rows = iter(rows)
+        self.chunk_rows = chunk_rows
+        self.pending = ""
+        self.position = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+
+    def _fill(self):
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        for _, row in zip(range(self.chunk_rows), self.rows):
+            self._writer.writerow(row)
+        return self._buffer.getvalue()
+
+    def read(self, size=-1):
+        chunks = []
+        wanted = size if size is not None and size >= 0 else float("inf")
+        while wanted > 0:
+            if self.position >= len(self.pending):
+                self.pending, self.position = self._fill(), 0
+                if not self.pending:
+                    break
+            end = min(len(self.pending), self.position + wanted)
+            chunks.append(self.pending[self.position:end])
+            wanted -= end - self.position
+            self.position = end
+        return "".join(chunks)
@@ -0,0 +1,131 @@
+import os
+import sys
+import csv
+import bisect
+import hashlib
+from array import array
+
+from scrap_common.datasets import missing_values, file_hash
+from scrap_common.metrics import metrics, log
+
+# Consecutive already-known records after which an incremental crawl stops paginating
+default_stop_after = 30
+
+def key_hash(value):
+    """64-bit hash of a record key, insensitive to case and repeated whitespace."""
+    normalized = " ".join(value.split()).casefold()
+    return int.from_bytes(hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest(), "little")
+
+def index_path(csv_path):
+    """Where the seen index of a dataset lives: beside its CSV, with a ``.seen`` extension."""
+    return os.path.splitext(csv_path)[0] + ".seen"
+
+class SeenIndex:
+    """Persistent set of the record keys (company names) a scraper has already collected.
+
+    The file holds the SHA-1 of the CSV it was built from (40 hex characters),
+    then a sorted array of little-endian 64-bit key hashes, 8 bytes per
+    record, searched with bisect after one read. Unlike a Bloom filter it has
+    no false positives to tune: at 64 bits a collision is unlikely before
+    billions of keys, whereas a Bloom false positive would silently drop a new
+    company. Keys added during a run are kept in a set and only written by
+    ``save``, after the CSV holding them has been written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.source_hash = None
+        self.hashes = array("Q")
+        self.added = set()
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                self.source_hash = file.read(40).decode("ascii", "replace")
+                self.hashes.frombytes(file.read())
+            if sys.byteorder != "little":
+                self.hashes.byteswap()
+
+    @classmethod
+    def for_csv(cls, csv_path, column):
+        """The index beside ``csv_path``, rebuilt from its ``column`` whenever the CSV changed since.
+
+        Full scrapes, pipeline runs and hand edits rewrite the CSV without
+        touching the index, so it is only trusted while the CSV's hash matches
+        the one it was saved with.
+        """
+        index = cls(index_path(csv_path))
+        current = file_hash(csv_path)
+        if current != index.source_hash:
+            index.hashes, index.added = array("Q"), set()
+            if current:
+                with open(csv_path, 'r', newline='', encoding='utf-8') as file:
+                    for row in csv.DictReader(file):
+                        index.add(row.get(column) or "")
+                log(f"Rebuilt seen index '{index.path}' with {len(index.added)} keys from '{csv_path}'")
+                index.save(csv_path)
+        return index
+
+    def __len__(self):
+        return len(self.hashes) + len(self.added)
+
+    def __contains__(self, value):
+        digest = key_hash(value)
+        if digest in self.added:
+            return True
+        position = bisect.bisect_left(self.hashes, digest)
+        return position < len(self.hashes) and self.hashes[position] == digest
+
+    def add(self, value):
+        if value.strip() not in missing_values:
+            self.added.add(key_hash(value))
+
+    def save(self, csv_path):
+        """Merge the keys added since loading and record the hash of ``csv_path``, which now holds them."""
+        self.hashes = array("Q", sorted(self.added.union(self.hashes)))
+        self.added = set()
+        self.source_hash = file_hash(csv_path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        stored = array("Q", self.hashes)
+        if sys.byteorder != "little":
+            stored.byteswap()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write((self.source_hash or "0" * 40).encode("ascii"))
+            stored.tofile(file)
+        os.replace(tmp_path, self.path)
+
+def new_records(records, index, key, scraper, stop_after=default_stop_after):
+    """Yield only the records whose key is not in ``index``, adding each one as it goes.
+
+    ``key`` maps a record to its key string and ``scraper`` labels the
+    metrics. After ``stop_after`` consecutive known records the iteration
+    stops, and closing ``records`` stops the scraper from fetching further
+    pages; this is only valid for listings sorted newest first, so sources
+    sorted otherwise pass ``stop_after=None`` and are read to the end. Records
+    without a key are passed through without touching the run. The caller
+    saves the index once the new records are safely in the CSV.
+    """
+    known = new = run = 0
+    try:
+        for record in records:
+            value = key(record) or ""
+            if value.strip() in missing_values:
+                yield record
+                continue
+            if value in index:
+                known += 1
+                run += 1
+                if stop_after and run >= stop_after:
+                    log(f"Stopping after {run} consecutive already-seen records")
+                    break
+                continue
+            run = 0
+            new += 1
+            index.add(value)
+            yield record
+    finally:
+        close = getattr(records, "close", None)
+        if close:
+            close()
+        metrics.inc("incremental_known_total", known, scraper=scraper)
+        metrics.inc("incremental_new_total", new, scraper=scraper)
+        log(f"Incremental crawl: {new} new and {known} already-seen records, index holds {len(index)} keys")
@@ -0,0 +1,332 @@
+import gc
+import io
+import os
+import re
+import csv
+import json
+import time
+from collections import deque
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from scrap_common.metrics import metrics, log
+
+default_chunk_size = 8 * 1024 * 1024
+
+_integer = re.compile(r"[+-]?\d+")
+_year = re.compile(r"\d{4}")
+_true_values = {"true", "True", "TRUE", "1"}
+_false_values = {"false", "False", "FALSE", "0"}
+
+def _is_integer(value):
+    return _integer.fullmatch(value) is not None
+
+def _is_number(value):
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+def _is_date(value):
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+def _is_datetime(value):
+    try:
+        datetime.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+# Table Schema field types and the check a non-missing cell must pass; other types accept anything
+type_checks = {
+    "integer": _is_integer,
+    "number": _is_number,
+    "year": lambda value: _year.fullmatch(value) is not None,
+    "boolean": lambda value: value in _true_values or value in _false_values,
+    "date": _is_date,
+    "datetime": _is_datetime,
+}
+
+# Multi-line patterns matching a line that is NOT plainly valid. One search over
+# a column's distinct values joined by newlines clears the whole column; only
+# when it matches are the values checked one by one with ``type_checks``.
+type_prefilters = {
+    "integer": re.compile(r"^(?![+-]?\d+$)", re.M),
+    "number": re.compile(r"^(?![+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?$)", re.M),
+    "year": re.compile(r"^(?!\d{4}$)", re.M),
+}
+
+def load_datapackage(filepath):
+    with open(filepath, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def find_resource(datapackage, csv_path):
+    """The resource describing ``csv_path``: matched by file name, else the package's only resource."""
+    resources = datapackage.get("resources", [])
+    name = os.path.basename(csv_path)
+    for resource in resources:
+        if os.path.basename(resource.get("path", "")) == name or resource.get("name") == name:
+            return resource
+    return resources[0] if len(resources) == 1 else None
+
+def key_groups(schema):
+    """Column-index tuples whose values must be unique: the primary key and each ``unique`` field."""
+    names = [field["name"] for field in schema.get("fields", [])]
+    groups = []
+    primary_key = schema.get("primaryKey")
+    if primary_key:
+        primary_key = [primary_key] if isinstance(primary_key, str) else primary_key
+        groups.append(tuple(names.index(name) for name in primary_key if name in names))
+    for index, field in enumerate(schema.get("fields", [])):
+        if field.get("constraints", {}).get("unique") and (index,) not in groups:
+            groups.append((index,))
+    return groups
+
+def field_specs(schema):
+    """Per-column (name, type, required, enum, maxLength) tuples a worker process can unpickle."""
+    primary_key = schema.get("primaryKey") or []
+    primary_key = [primary_key] if isinstance(primary_key, str) else primary_key
+    specs = []
+    for field in schema.get("fields", []):
+        constraints = field.get("constraints", {})
+        enum = constraints.get("enum")
+        specs.append((field["name"], field.get("type", "string"),
+                      bool(constraints.get("required")) or field["name"] in primary_key,
+                      frozenset(enum) if enum is not None else None, constraints.get("maxLength")))
+    return specs
+
+def split_point(data):
+    """Offset just past the last newline of ``data`` that ends a CSV row, or None.
+
+    ``data`` starts at a row boundary, so a newline ends a row when an even
+    number of quote characters precede it (escaped quotes come in pairs).
+    """
+    total_quotes = data.count(b'"')
+    position = len(data)
+    while True:
+        position = data.rfind(b"\n", 0, position)
+        if position < 0:
+            return None
+        if (total_quotes - data.count(b'"', position)) % 2 == 0:
+            return position + 1
+
+def iter_chunks(file, chunk_size):
+    """Yield byte chunks of roughly ``chunk_size`` that each end on a row boundary."""
+    carry = b""
+    while True:
+        block = file.read(chunk_size)
+        if not block:
+            if carry:
+                yield carry
+            return
+        data = carry + block
+        cut = split_point(data)
+        if cut is None:
+            carry = data
+            continue
+        yield data[:cut]
+        carry = data[cut:]
+
+def invalid_values(values, field_type):
+    """The values (a set of non-missing cells) that are not valid for ``field_type``."""
+    check = type_checks.get(field_type)
+    if check is None:
+        return set()
+    prefilter = type_prefilters.get(field_type)
+    if prefilter is not None and not prefilter.search("\n".join(values)):
+        return set()
+    return {value for value in values if not check(value)}
+
+def validate_chunk(chunk, specs, groups, missing_values, max_errors):
+    """Check the rows of one chunk; returns (row count, [(chunk row, message)], {group: (keys, chunk rows)}).
+
+    Runs in a worker process, so everything it needs comes in as arguments.
+    The cyclic garbage collector is paused meanwhile: parsing allocates one
+    list per row, none of them part of a cycle, and the collector would keep
+    rescanning them all.
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _validate_chunk(chunk, specs, groups, missing_values, max_errors)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+def _validate_chunk(chunk, specs, groups, missing_values, max_errors):
+    """Body of ``validate_chunk``.
+
+    Cells are checked column by column on the set of distinct values, so a
+    column of repeated or well-formed values costs a few C-level set and regex
+    operations; the per-row loop only runs to report the rows of a bad value.
+    """
+    try:
+        text = chunk.decode('utf-8')
+    except UnicodeDecodeError as e:
+        return 0, [(None, f"not valid UTF-8 near byte {e.start} of a chunk")], {}
+
+    width = len(specs)
+    rows = list(csv.reader(io.StringIO(text, newline='')))
+    errors = []
+    row_numbers = None  # chunk row of each well-formed row, when some rows were dropped
+    if set(map(len, rows)) != {width}:
+        row_numbers = [number for number, row in enumerate(rows, 1) if len(row) == width]
+        errors.extend((number, "blank row" if not row else f"has {len(row)} cells, the schema has {width} fields")
+                      for number, row in enumerate(rows, 1) if len(row) != width)
+        good_rows = [rows[number - 1] for number in row_numbers]
+    else:
+        good_rows = rows
+    columns = list(zip(*good_rows)) if good_rows else [()] * width
+
+    def report(column, bad, message):
+        for position, value in enumerate(column):
+            if value in bad and len(errors) < max_errors:
+                errors.append((row_numbers[position] if row_numbers else position + 1, message(value)))
+
+    for column, (name, field_type, required, enum, max_length) in zip(columns, specs):
+        if len(errors) >= max_errors:
+            break
+        distinct = set(column)
+        if required and not missing_values.isdisjoint(distinct):
+            report(column, missing_values, lambda value: f"'{name}' is required but missing")
+        distinct -= missing_values
+        bad = invalid_values(distinct, field_type)
+        if bad:
+            report(column, bad, lambda value: f"'{name}' value {value!r} is not a valid {field_type}")
+        if enum is not None and not distinct <= enum:
+            report(column, distinct - enum, lambda value: f"'{name}' value {value!r} is not one of the allowed values")
+        if max_length is not None and distinct and max(map(len, distinct)) > max_length:
+            too_long = {value for value in distinct if len(value) > max_length}
+            report(column, too_long, lambda value: f"'{name}' is {len(value)} characters, longer than {max_length}")
+
+    keys = {}
+    for group in groups:
+        values = columns[group[0]] if len(group) == 1 else ["\x1f".join(row[index] for index in group) for row in good_rows]
+        keys[group] = (values, row_numbers)
+    return len(rows), errors, keys
+
+def read_header(file):
+    """(header cells, data start offset) of an open binary CSV file."""
+    block = b""
+    while True:
+        more = file.read(64 * 1024)
+        block += more
+        position = block.find(b"\n")
+        while position >= 0 and block.count(b'"', 0, position) % 2:
+            position = block.find(b"\n", position + 1)
+        if position >= 0 or not more:
+            cut = position + 1 if position >= 0 else len(block)
+            return next(csv.reader(io.StringIO(block[:cut].decode('utf-8-sig'), newline='')), []), cut
+
+def check_header(header, schema):
+    """Messages for every difference between the CSV header and the schema's field names."""
+    names = [field["name"] for field in schema.get("fields", [])]
+    errors = []
+    for position, (column, name) in enumerate(zip(header, names), 1):
+        if column != name:
+            errors.append(f"header column {position} is '{column}' but the schema field is '{name}'")
+    for column in header[len(names):]:
+        errors.append(f"header column '{column}' is not in the schema")
+    for name in names[len(header):]:
+        errors.append(f"schema field '{name}' has no column in the header")
+    return errors
+
+def validate_resource(csv_path, schema, workers=None, chunk_size=default_chunk_size, max_errors=20):
+    """Validate a CSV against a Table Schema; returns (data rows checked, [(row number, message)]).
+
+    Row numbers count the header as row 1. The header is checked first and a
+    mismatch stops validation before any row is read. Rows are then streamed
+    in chunks split on row boundaries and checked in a process pool, with at
+    most two chunks per worker in flight, so memory stays flat however large
+    the file is. Uniqueness of the primary key and ``unique`` fields is checked
+    across chunks in this process. Validation stops once ``max_errors`` errors
+    are found.
+    """
+    start = time.perf_counter()
+    if not os.path.exists(csv_path):
+        return 0, [(None, f"resource file '{csv_path}' does not exist")]
+
+    specs, groups = field_specs(schema), key_groups(schema)
+    missing_values = frozenset(schema.get("missingValues", [""]))
+    workers = workers or os.cpu_count() or 1
+    errors, seen = [], {group: {} for group in groups}
+    rows = 0
+
+    def merge(result):
+        nonlocal rows
+        chunk_rows, chunk_errors, keys = result
+        for row, message in chunk_errors:
+            errors.append((row + rows + 1 if row is not None else None, message))
+        for group, (values, row_numbers) in keys.items():
+            group_seen = seen[group]
+            row_numbers = [rows + 1 + row for row in row_numbers] if row_numbers else range(rows + 2, rows + 2 + len(values))
+            if len(set(values)) == len(values) and group_seen.keys().isdisjoint(values):
+                group_seen.update(zip(values, row_numbers))
+                continue
+            names = ", ".join(specs[index][0] for index in group)
+            for value, row_number in zip(values, row_numbers):
+                first = group_seen.setdefault(value, row_number)
+                if first != row_number:
+                    errors.append((row_number, f"duplicate value of unique '{names}' (first in row {first})"))
+        rows += chunk_rows
+
+    with open(csv_path, 'rb') as file:
+        header, offset = read_header(file)
+        errors.extend((1, message) for message in check_header(header, schema))
+        if errors:
+            return 0, errors
+        file.seek(offset)
+
+        chunks = iter_chunks(file, chunk_size)
+        if workers == 1 or os.path.getsize(csv_path) <= chunk_size:
+            for chunk in chunks:
+                merge(validate_chunk(chunk, specs, groups, missing_values, max_errors))
+                if len(errors) >= max_errors:
+                    break
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(validate_chunk, chunk, specs, groups, missing_values, max_errors))
+                    while pending and (len(pending) >= workers * 2 or pending[0].done()):
+                        merge(pending.popleft().result())
+                        if len(errors) >= max_errors:
+                            break
+                    if len(errors) >= max_errors:
+                        break
+                while pending and len(errors) < max_errors:
+                    merge(pending.popleft().result())
+                for future in pending:
+                    future.cancel()
+
+    elapsed = time.perf_counter() - start
+    metrics.observe("validate_seconds", elapsed, resource=os.path.basename(csv_path))
+    metrics.inc("validate_rows_total", rows, resource=os.path.basename(csv_path))
+    metrics.inc("validate_errors_total", len(errors), resource=os.path.basename(csv_path))
+    log(f"Validated {rows} rows of {os.path.basename(csv_path)} in {elapsed:.2f}s "
+        f"({os.path.getsize(csv_path) / 1024 / 1024 / max(elapsed, 1e-9):.1f} MB/s): {len(errors)} error(s)")
+    errors.sort(key=lambda error: error[0] or 0)
+    return rows, errors[:max_errors]
+
+def validate_csv(csv_path, datapackage_path=None, **kwargs):
+    """Validate a CSV against the resource schema in its datapackage.json.
+
+    The datapackage defaults to the one next to the CSV. Returns the error
+    list, empty when the file is valid or no datapackage describes it.
+    """
+    datapackage_path = datapackage_path or os.path.join(os.path.dirname(os.path.abspath(csv_path)), "datapackage.json")
+    if not os.path.exists(datapackage_path):
+        return []
+    resource = find_resource(load_datapackage(datapackage_path), csv_path)
+    if resource is None:
+        return [(None, f"{datapackage_path} has no resource for {os.path.basename(csv_path)}")]
+    return validate_resource(csv_path, resource.get("schema", {}), **kwargs)[1]
+
+def format_error(error):
+    row, message = error
+    return f"row {row}: {message}" if row is not None else message
@@ -1,9 +1,17 @@
 import os
+import sys
 import csv
 import json
 import requests
 from bs4 import BeautifulSoup
 
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from scrap_common.metrics import metrics, log, ERROR  # noqa: E402
+from scrap_common.fixtures import fetch  # noqa: E402
+from scrap_common.profiling import profiled  # noqa: E402
+
 # Define the URL from which to scrape the data
 url = 'https://www.iana.org/domains/root/db'
 
@@ -65,7 +73,7 @@ def create_default_datapackage(filepath):
                             "type": "string"
                         },
                         {
-                            "name": "Sponsoring Organisation",
+                            "name": "Sponsoring Organization",
                             "type": "string"
                         }
                     ]
@@ -77,29 +85,58 @@ def create_default_datapackage(filepath):
     with open(filepath, 'w') as file:
         json.dump(default_structure, file, indent=2)
 
-# Scrape data and update the CSV file
-def update_dataset():
-    """Scrape data from IANA and write it to a CSV file."""
-    ensure_directory_exists(data)  # Ensure the 'data' directory exists
-
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Raise an error for HTTP issues
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data from {url}: {e}")
-        return
-
-    soup = BeautifulSoup(response.text, 'html.parser')
+# Parse the IANA root zone table
+def parse_table(html):
+    """Return the non-empty data rows of the IANA table, or None if the table is missing."""
+    soup = BeautifulSoup(html, 'html.parser')
     table = soup.find("table", {"class": "iana-table"})
     if not table:
-        print("Error: Unable to find the table in the HTML response.")
-        return
+        return None
 
-    rows = [header]
+    rows = []
     for row in table.find_all('tr'):
         row_data = [cell.text.strip() for cell in row.find_all('td') if cell.text.strip()]
         if row_data:  # Only add non-empty rows
             rows.append(row_data)
+    return rows
+
+# Scrape the IANA table
+def scrape_rows():
+    """Fetch and parse the IANA table; returns its data rows, or None on failure."""
+    try:
+        with metrics.timer("fetch_seconds", scraper="tld"):
+            response = fetch(url, "iana", timeout=10)
+            response.raise_for_status()  # Raise an error for HTTP issues
+    except requests.exceptions.RequestException as e:
+        metrics.inc("fetch_errors_total", scraper="tld")
+        log(f"Error fetching data from {url}: {e}", ERROR)
+        return None
+
+    with metrics.timer("parse_seconds", scraper="tld"):
+        table_rows = parse_table(response.text)
+    if table_rows is None:
+        log("Error: Unable to find the table in the HTML response.", ERROR)
+        return None
+
+    metrics.observe("rows_per_page", len(table_rows), scraper="tld")
+    metrics.inc("rows_total", len(table_rows), scraper="tld")
+    return table_rows
+
+def iter_records():
+    """Yield each TLD as a dict keyed by the CSV header."""
+    for row in scrape_rows() or []:
+        yield dict(zip(header, row))
+
+# Scrape data and update the CSV file
+@profiled
+def update_dataset():
+    """Scrape data from IANA and write it to a CSV file."""
+    ensure_directory_exists(data)  # Ensure the 'data' directory exists
+
+    table_rows = scrape_rows()
+    if table_rows is None:
+        return
+    rows = [header] + table_rows
 
     try:
         with open(data, 'w', newline='', encoding='utf-8') as file:
@@ -107,7 +144,7 @@ def update_dataset():
             writer.writerows(rows)
         print(f"CSV file '{data}' updated successfully.")
     except Exception as e:
-        print(f"Error writing to CSV file '{data}': {e}")
+        log(f"Error writing to CSV file '{data}': {e}", ERROR)
 
 # Update the datapackage with the file size
 def update_byte_datapackage():
@@ -136,9 +173,10 @@ def update_byte_datapackage():
 
         print(f"Datapackage '{datapackage}' updated successfully.")
     except Exception as e:
-        print(f"Error updating datapackage '{datapackage}': {e}")
+        log(f"Error updating datapackage '{datapackage}': {e}", ERROR)
 
 # Main entry point
 if __name__ == '__main__':
     update_dataset()
     update_byte_datapackage()
+    metrics.flush()
@@ -1,9 +1,17 @@
 import os
+import sys
 import csv
 import json
 import requests
 from bs4 import BeautifulSoup
 
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from scrap_common.metrics import metrics, log, ERROR  # noqa: E402
+from scrap_common.fixtures import fetch  # noqa: E402
+from scrap_common.profiling import profiled  # noqa: E402
+
 # Define the base directory where the 'data' folder should be located (outside the script folder)
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Get the parent directory of the script
 data_dir = os.path.join(base_dir, 'data')  # Create 'data' folder directly in the project root directory
@@ -64,20 +72,12 @@ def create_default_datapackage(filepath, header, url, title="Top Level Domain Na
     with open(filepath, 'w') as file:
         json.dump(default_structure, file, indent=2)
 
-# Scrape data and return the header and rows
-def scrape_data(url):
-    """Scrape data from the given URL and return the HTML table rows and header."""
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Raise an error for HTTP issues
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data from {url}: {e}")
-        return None, None
-
-    soup = BeautifulSoup(response.text, 'html.parser')
+# Parse the header and rows out of the IANA table
+def parse_table(html):
+    """Return (header, rows) from the IANA table HTML, or (None, None) if the table is missing."""
+    soup = BeautifulSoup(html, 'html.parser')
     table = soup.find("table", {"class": "iana-table"})
     if not table:
-        print("Error: Unable to find the table in the HTML response.")
         return None, None
 
     # Extract headers dynamically by looking for the table's header row (<th>)
@@ -93,6 +93,28 @@ def scrape_data(url):
 
     return header, rows
 
+# Scrape data and return the header and rows
+def scrape_data(url):
+    """Scrape data from the given URL and return the HTML table rows and header."""
+    try:
+        with metrics.timer("fetch_seconds", scraper="tld_dynamic"):
+            response = fetch(url, "iana", timeout=10)
+            response.raise_for_status()  # Raise an error for HTTP issues
+    except requests.exceptions.RequestException as e:
+        metrics.inc("fetch_errors_total", scraper="tld_dynamic")
+        log(f"Error fetching data from {url}: {e}", ERROR)
+        return None, None
+
+    with metrics.timer("parse_seconds", scraper="tld_dynamic"):
+        header, rows = parse_table(response.text)
+    if header is None:
+        log("Error: Unable to find the table in the HTML response.", ERROR)
+        return None, None
+    metrics.observe("rows_per_page", len(rows), scraper="tld_dynamic")
+    metrics.inc("rows_total", len(rows), scraper="tld_dynamic")
+
+    return header, rows
+
 def save_to_csv(data, header, filepath):
     """Save the scraped data to a CSV file."""
     try:
@@ -102,7 +124,7 @@ def save_to_csv(data, header, filepath):
             writer.writerows(data)
         print(f"CSV file '{filepath}' updated successfully.")
     except Exception as e:
-        print(f"Error writing to CSV file '{filepath}': {e}")
+        log(f"Error writing to CSV file '{filepath}': {e}", ERROR)
 
 def update_datapackage(filepath, csv_filepath, header, url, title="Top Level Domain Names", contributor_name="Brian Nickson"):
     """Update the 'bytes' field in datapackage.json with the size of the CSV file."""
@@ -131,9 +153,10 @@ def update_datapackage(filepath, csv_filepath, header, url, title="Top Level Dom
 
         print(f"Datapackage '{filepath}' updated successfully.")
     except Exception as e:
-        print(f"Error updating datapackage '{filepath}': {e}")
+        log(f"Error updating datapackage '{filepath}': {e}", ERROR)
 
 # Main function to update dataset
+@profiled
 def update_dataset():
     """Main function to scrape data, save to CSV, and update the datapackage."""
     # Ensure the directory exists
@@ -153,3 +176,4 @@ def update_dataset():
 # Run the script
 if __name__ == '__main__':
     update_dataset()
+    metrics.flush()
@@ -1,47 +1,97 @@
-from selenium import webdriver
+import os
+import sys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
-def find_based_in_element_info(url):
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from scrap_common.driver_pool import DriverPool, default_chrome_options  # noqa: E402
+from scrap_common.lean_profile import LeanProfile  # noqa: E402
+
+def extract_based_in(driver, url):
+    """Look up the 'Based in' field of a listing using an already running driver."""
+    result = {"url": url, "found": False, "element_tag": None, "element_class": None,
+              "value_tag": None, "value_class": None, "value": None, "error": None}
     try:
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless=new')
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36")
-
-        with webdriver.Chrome(options=options) as driver:
-            driver.get(url)
-            try:
-                WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "listing-details")))
-
-                detail_elements = driver.find_elements(By.CLASS_NAME, "wpbdp-field-display")
-
-                for element in detail_elements:
-                    class_attribute = element.get_attribute("class").replace(u'\xa0', u' ') #Replace non-breaking spaces in class attribute
-                    if "wpbdp-field-based_in" in class_attribute:
-                        print("Found 'Based in' element!")
-                        print("Element tag:", element.tag_name)
-                        print("Element class:", class_attribute)
-                        try:
-                            value_element = element.find_element(By.CLASS_NAME, "value")
-                            print("Value element tag:", value_element.tag_name)
-                            print("Value element class:", value_element.get_attribute("class"))
-                        except NoSuchElementException:
-                            print("No value element found within 'Based in' element.")
-                        return
-
-                print("'Based in' element not found.")
-                return None
-
-            except TimeoutException:
-                print("Timeout waiting for listing details to load.")
-                return None
+        driver.get(url)
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "listing-details")))
+
+        detail_elements = driver.find_elements(By.CLASS_NAME, "wpbdp-field-display")
+
+        for element in detail_elements:
+            class_attribute = element.get_attribute("class").replace(u'\xa0', u' ') #Replace non-breaking spaces in class attribute
+            if "wpbdp-field-based_in" in class_attribute:
+                result["found"] = True
+                result["element_tag"] = element.tag_name
+                result["element_class"] = class_attribute
+                try:
+                    value_element = element.find_element(By.CLASS_NAME, "value")
+                    result["value_tag"] = value_element.tag_name
+                    result["value_class"] = value_element.get_attribute("class")
+                    result["value"] = value_element.text.strip()
+                except NoSuchElementException:
+                    result["error"] = "No value element found within 'Based in' element."
+                return result
+
+        result["error"] = "'Based in' element not found."
+    except TimeoutException:
+        result["error"] = "Timeout waiting for listing details to load."
+    return result
+
+def create_pool(pool_size=2, profile=None):
+    """Start a driver pool for listing checks, blocking unneeded resources when given a LeanProfile."""
+    return DriverPool(size=pool_size, options_factory=lambda: default_chrome_options(profile),
+                      on_start=profile.apply if profile else None)
+
+def check_labels_batch(urls, pool_size=2, pool=None, profile=None):
+    """Check the 'Based in' field for many listing URLs on a pool of long-lived drivers.
 
+    Returns one result dict per URL, in input order. Pass an existing ``pool`` to
+    reuse its browsers across batches; otherwise a pool is started and closed here,
+    using ``profile`` (default: a headless LeanProfile) for its drivers.
+    """
+    urls = list(urls)
+    if pool is None:
+        with create_pool(pool_size, profile or LeanProfile()) as own_pool:
+            return check_labels_batch(urls, pool=own_pool)
+
+    results = []
+    for url, outcome in zip(urls, pool.map(extract_based_in, urls, return_exceptions=True)):
+        if isinstance(outcome, Exception):
+            outcome = {"url": url, "found": False, "element_tag": None, "element_class": None,
+                       "value_tag": None, "value_class": None, "value": None, "error": str(outcome)}
+        results.append(outcome)
+    return results
+
+def find_based_in_element_info(url):
+    try:
+        result = check_labels_batch([url], pool_size=1)[0]
     except Exception as e:
         print(f"An error occurred: {e}")
         return None
 
+    if not result["found"]:
+        print(result["error"])
+        return None
+
+    print("Found 'Based in' element!")
+    print("Element tag:", result["element_tag"])
+    print("Element class:", result["element_class"])
+    if result["value_tag"]:
+        print("Value element tag:", result["value_tag"])
+        print("Value element class:", result["value_class"])
+    else:
+        print(result["error"])
+    return result
+
 if __name__ == "__main__":
-    company_url = "https://www.eu-startups.com/directory/?wpbdp_view=search&kw=%23SRNT+Serenity"
-    find_based_in_element_info(company_url)
\ No newline at end of file
+    if len(sys.argv) > 1:
+        # Batch mode: python check_labels.py URL [URL ...]
+        for result in check_labels_batch(sys.argv[1:]):
+            print(result)
+    else:
+        company_url = "https://www.eu-startups.com/directory/?wpbdp_view=search&kw=%23SRNT+Serenity"
+        find_based_in_element_info(company_url)
@@ -1,7 +1,63 @@
+import os
+import sys
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from scrap_common.metrics import metrics, log, ERROR, DEBUG  # noqa: E402
+from scrap_common.fixtures import fetch  # noqa: E402
+
+def parse_listings(content, page_number=1):
+    """Parse the company listings of one directory page into dicts."""
+    all_companies_data = []
+    soup = BeautifulSoup(content, "html.parser")
+
+    listing_elements = soup.find_all("div", class_="wpbdp-listing")
+
+    for listing in listing_elements:
+        company_data = {"Name": None, "Category": None, "Based in": None, "Tags": None, "Founded": None}
+
+        company_title = listing.select_one(".listing-title h3 a")
+        if company_title:
+            company_data["Name"] = company_title.text.strip()
+            log(f"Name found on page {page_number}: {company_data['Name']}", DEBUG)
+
+        detail_elements = listing.find_all("div", class_="wpbdp-field-display")
+
+        for element in detail_elements:
+            label_element = element.find("span", class_="field-label")
+
+            if label_element:
+                label_text = label_element.text.strip().replace(":", "").replace(u'\xa0', u' ')
+                value_element = element.find("div", class_="value")
+
+                if value_element and value_element.text.strip():
+                    value = value_element.text.strip()
+                    if label_text == "Category":
+                        category_link = value_element.find("a")
+                        company_data["Category"] = category_link.text.strip() if category_link else value
+                        log(f"Category found on page {page_number}: {company_data['Category']}", DEBUG)
+                    elif label_text == "Based in":
+                        company_data["Based in"] = value
+                        log(f"Based in found on page {page_number}: {company_data['Based in']}", DEBUG)
+                    elif label_text == "Tags":
+                        company_data["Tags"] = value
+                        log(f"Tags found on page {page_number}: {company_data['Tags']}", DEBUG)
+                    elif label_text == "Founded":
+                        company_data["Founded"] = value
+                        log(f"Founded found on page {page_number}: {company_data['Founded']}", DEBUG)
+                else:
+                    log(f"Value for {label_text} on page {page_number} is empty", DEBUG)
+            else:
+                log(f"Label element not found on page {page_number}", DEBUG)
+
+        all_companies_data.append(company_data)
+
+    return all_companies_data
+
 def scrape_company_data(url, max_pages=10):  # Added max_pages parameter with default 10
     all_companies_data = []
 
@@ -11,56 +67,21 @@ def scrape_company_data(url, max_pages=10):  # Added max_pages parameter with de
         else:
             page_url = f"https://www.eu-startups.com/directory/page/{page_number}/?wpbdp_sort=field-1"  # Construct URL for subsequent pages
 
-        print(f"Scraping page {page_number}: {page_url}")
+        log(f"Scraping page {page_number}: {page_url}")
 
         try:
-            response = requests.get(page_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            listing_elements = soup.find_all("div", class_="wpbdp-listing")
-
-            for listing in listing_elements:
-                company_data = {"Name": None, "Category": None, "Based in": None, "Tags": None, "Founded": None}
-
-                company_title = listing.select_one(".listing-title h3 a")
-                if company_title:
-                    company_data["Name"] = company_title.text.strip()
-                    print(f"Name found on page {page_number}:", company_data["Name"])
-
-                detail_elements = listing.find_all("div", class_="wpbdp-field-display")
-
-                for element in detail_elements:
-                    label_element = element.find("span", class_="field-label")
-
-                    if label_element:
-                        label_text = label_element.text.strip().replace(":", "").replace(u'\xa0', u' ')
-                        value_element = element.find("div", class_="value")
-
-                        if value_element and value_element.text.strip():
-                            value = value_element.text.strip()
-                            if label_text == "Category":
-                                category_link = value_element.find("a")
-                                company_data["Category"] = category_link.text.strip() if category_link else value
-                                print(f"Category found on page {page_number}:", company_data["Category"])
-                            elif label_text == "Based in":
-                                company_data["Based in"] = value
-                                print(f"Based in found on page {page_number}:", company_data["Based in"])
-                            elif label_text == "Tags":
-                                company_data["Tags"] = value
-                                print(f"Tags found on page {page_number}:", company_data["Tags"])
-                            elif label_text == "Founded":
-                                company_data["Founded"] = value
-                                print(f"Founded found on page {page_number}:", company_data["Founded"])
-                        else:
-                            print(f"Value for {label_text} on page {page_number} is empty")
-                    else:
-                        print(f"Label element not found on page {page_number}")
-
-                all_companies_data.append(company_data)
+            with metrics.timer("fetch_seconds", scraper="eu_ai_script"):
+                response = fetch(page_url, "eu_startups", timeout=None)
+                response.raise_for_status()
+            with metrics.timer("parse_seconds", scraper="eu_ai_script"):
+                companies = parse_listings(response.content, page_number)
+            metrics.observe("rows_per_page", len(companies), scraper="eu_ai_script")
+            metrics.inc("rows_total", len(companies), scraper="eu_ai_script")
+            all_companies_data.extend(companies)
 
         except requests.exceptions.RequestException as e:
-            print(f"An error occurred fetching page {page_number}: {e}")
+            metrics.inc("fetch_errors_total", scraper="eu_ai_script")
+            log(f"An error occurred fetching page {page_number}: {e}", ERROR)
 
     return all_companies_data
 
@@ -70,9 +91,10 @@ if __name__ == "__main__":
     all_data = scrape_company_data(start_url, max_pages_to_scrape)
 
     if all_data:
-        print("\nAll Scraped Data:", all_data)
+        log(f"\nAll Scraped Data: {all_data}", DEBUG)
         df = pd.DataFrame(all_data)
         df.to_csv("company_data.csv", index=False, encoding="utf-8", mode='w', header=True)
         print("Data saved to company_data.csv")
     else:
-        print("Failed to scrape company data.")
\ No newline at end of file
+        print("Failed to scrape company data.")
+    metrics.flush()
\ No newline at end of file
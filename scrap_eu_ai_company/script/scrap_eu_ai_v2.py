@@ -1,13 +1,27 @@
 import os
+import sys
 import csv
 import json
 import requests
 from bs4 import BeautifulSoup
 
+# Make the repository root importable when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from scrap_common.metrics import metrics, log, ERROR, DEBUG  # noqa: E402
+from scrap_common.fixtures import fetch  # noqa: E402
+from scrap_common.profiling import profiled  # noqa: E402
+from scrap_common.seen_index import SeenIndex, new_records, default_stop_after  # noqa: E402
+from scrap_common.record_buffer import RecordBuffer  # noqa: E402
+
 # Define the URL base and maximum page number
 base_url = 'https://www.eu-startups.com/directory/?wpbdp_sort=field-1'
 max_page_number = 15  # Adjust this as needed
 
+# wpbdp_sort=field-1 lists companies by name, not newest first, so a run of
+# already-seen names says nothing about later pages: incremental runs read all pages
+listing_newest_first = False
+
 # Define paths
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 data_dir = os.path.join(base_dir, 'data')
@@ -17,6 +31,9 @@ datapackage_file = os.path.join(data_dir, 'datapackage.json')
 # Define the header for the CSV file
 header = ['Name', 'Category', 'Based in', 'Tags', 'Founded']
 
+# Columns with few distinct values, dictionary-encoded while the crawl is held in memory
+categorical_columns = ['Category', 'Based in', 'Founded']
+
 # Ensure the directory for the file exists
 def ensure_directory_exists(filepath):
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
@@ -39,68 +56,105 @@ def create_default_datapackage(filepath):
     with open(filepath, 'w', encoding='utf-8') as file:
         json.dump(default_structure, file, indent=2)
 
-# Scrape data and update the CSV file
-def update_dataset():
-    ensure_directory_exists(data_file)
-    all_companies_data = []
+# Parse the company listings of one directory page
+def parse_listings(html):
+    """Return one dict per listing on a directory page (empty list if there are none)."""
+    soup = BeautifulSoup(html, "html.parser")
+    companies = []
+
+    for listing in soup.find_all("div", class_="wpbdp-listing"):
+        company_data = {key: None for key in header}
+
+        company_title = listing.select_one(".listing-title h3 a")
+        if company_title:
+            company_data["Name"] = company_title.text.strip()
+
+        detail_elements = listing.find_all("div", class_="wpbdp-field-display")
+        for element in detail_elements:
+            label_element = element.find("span", class_="field-label")
+
+            if label_element:
+                label_text = label_element.text.strip().replace(":", "").replace(u'\xa0', u' ')
+                value_element = element.find("div", class_="value")
+
+                if value_element and value_element.text.strip():
+                    value = value_element.text.strip()
+                    if label_text in company_data:
+                        if label_text == "Category":
+                            category_link = value_element.find("a")
+                            company_data["Category"] = category_link.text.strip() if category_link else value
+                        else:
+                            company_data[label_text] = value
+
+        companies.append(company_data)
 
-    for page_number in range(1, max_page_number + 1):
+    return companies
+
+# Scrape the directory page by page
+def iter_companies(max_pages=max_page_number):
+    """Yield each company dict as soon as its directory page has been parsed."""
+    for page_number in range(1, max_pages + 1):
         if page_number == 1:
             page_url = base_url
         else:
             page_url = f"https://www.eu-startups.com/directory/page/{page_number}/?wpbdp_sort=field-1"
 
-        print(f"Scraping page {page_number}: {page_url}")
+        log(f"Scraping page {page_number}: {page_url}")
 
         try:
-            response = requests.get(page_url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            listing_elements = soup.find_all("div", class_="wpbdp-listing")
-
-            if not listing_elements:
-                print(f"No listings found on page {page_number}.")
-                continue
-
-            for listing in listing_elements:
-                company_data = {key: None for key in header}
+            with metrics.timer("fetch_seconds", scraper="eu_ai"):
+                response = fetch(page_url, "eu_startups", timeout=10)
+                response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            metrics.inc("fetch_errors_total", scraper="eu_ai")
+            log(f"Error fetching data from {page_url}: {e}", ERROR)
+            continue
 
-                company_title = listing.select_one(".listing-title h3 a")
-                if company_title:
-                    company_data["Name"] = company_title.text.strip()
+        with metrics.timer("parse_seconds", scraper="eu_ai"):
+            companies = parse_listings(response.content)
+        metrics.observe("rows_per_page", len(companies), scraper="eu_ai")
+        metrics.inc("rows_total", len(companies), scraper="eu_ai")
 
-                detail_elements = listing.find_all("div", class_="wpbdp-field-display")
-                for element in detail_elements:
-                    label_element = element.find("span", class_="field-label")
+        if not companies:
+            log(f"No listings found on page {page_number}.")
+            continue
 
-                    if label_element:
-                        label_text = label_element.text.strip().replace(":", "").replace(u'\xa0', u' ')
-                        value_element = element.find("div", class_="value")
+        log(f"Parsed {len(companies)} companies on page {page_number}", DEBUG)
+        yield from companies
 
-                        if value_element and value_element.text.strip():
-                            value = value_element.text.strip()
-                            if label_text in company_data:
-                                if label_text == "Category":
-                                    category_link = value_element.find("a")
-                                    company_data["Category"] = category_link.text.strip() if category_link else value
-                                else:
-                                    company_data[label_text] = value
+# Only the companies missing from the seen index; stops at a run of known ones if the listing is newest first
+def iter_new_companies(index, max_pages=max_page_number, stop_after=default_stop_after):
+    if not listing_newest_first:
+        stop_after = None
+    return new_records(iter_companies(max_pages), index, lambda company: company["Name"], "eu_ai", stop_after)
 
-                all_companies_data.append(company_data)
+# Rows already in the CSV file, kept by incremental runs
+def read_existing_companies():
+    if not os.path.exists(data_file):
+        return
+    with open(data_file, 'r', newline='', encoding='utf-8') as file:
+        yield from csv.DictReader(file)
 
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching data from {page_url}: {e}")
-            continue
+# Scrape data and update the CSV file
+@profiled
+def update_dataset(max_pages=max_page_number, incremental=False, stop_after=default_stop_after):
+    ensure_directory_exists(data_file)
+    all_companies_data = RecordBuffer(header, categorical_columns)
+    index = None
+    if incremental:
+        index = SeenIndex.for_csv(data_file, "Name")
+        all_companies_data.extend_csv_rows(read_existing_companies())
+        all_companies_data.extend(iter_new_companies(index, max_pages, stop_after))
+    else:
+        all_companies_data.extend(iter_companies(max_pages))
 
     try:
-        with open(data_file, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=header)
-            writer.writeheader()
-            writer.writerows(all_companies_data)
+        all_companies_data.to_csv(data_file)
         print(f"CSV file '{data_file}' updated successfully.")
+        if index:
+            index.save(data_file)  # Only now are the new companies stored
     except Exception as e:
-        print(f"Error writing to CSV file '{data_file}': {e}")
+        log(f"Error writing to CSV file '{data_file}': {e}", ERROR)
 
 # Update the datapackage with the file size
 def update_byte_datapackage():
@@ -123,9 +177,10 @@ def update_byte_datapackage():
 
         print(f"Datapackage '{datapackage_file}' updated successfully.")
     except Exception as e:
-        print(f"Error updating datapackage '{datapackage_file}': {e}")
+        log(f"Error updating datapackage '{datapackage_file}': {e}", ERROR)
 
 # Main entry point
 if __name__ == '__main__':
     update_dataset()
-    update_byte_datapackage()
\ No newline at end of file
+    update_byte_datapackage()
+    metrics.flush()
\ No newline at end of file
@@ -1,45 +1,662 @@
 from http.server import SimpleHTTPRequestHandler, HTTPServer
-import matplotlib.pyplot as plt # type: ignore
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.figure import Figure # type: ignore
+from matplotlib.backends.backend_agg import FigureCanvasAgg # type: ignore
+from urllib.parse import urlsplit, parse_qs
+from email.utils import formatdate
+import argparse
+import hashlib
+import os
+import json
+import gzip
+import threading
+import signal
+import socket
+import selectors
+import time
 import io
 
+from scrap_common.datasets import DerivedCache, group_counts, datasets, file_stat, compressed_suffixes, compressed_variant
+from scrap_common.company_index import CompanyIndex
+
 print("Starting server")
 
+# Data behind the /graph chart; the cached PNG is re-rendered when it changes
+simple_graph_data = {"x": [1, 2, 3, 4], "y": [1, 4, 9, 16], "title": "Simple Graph"}
+
+# How long browsers and proxies may reuse a rendered chart before revalidating
+graph_max_age = 60
+
+# Seconds an idle keep-alive connection may hold a worker in the pooled server
+keepalive_timeout = 5
+
+# Charts of the scraped datasets served at /chart/<name>; "year" charts are sorted by year,
+# "category" charts show the most common values first
+chart_definitions = {
+    "eu-founded": {"dataset": "eu_ai_companies", "column": "Founded", "kind": "year",
+                   "title": "EU AI companies by founding year"},
+    "startupnation-founded": {"dataset": "startupnation", "column": "Founded", "kind": "year",
+                              "title": "Startup Nation AI companies by founding year"},
+    "startupnation-funding-stage": {"dataset": "startupnation", "column": "Funding Stage", "kind": "category",
+                                    "title": "Startup Nation AI companies by funding stage"},
+    "tld-type": {"dataset": "tld", "column": "Type", "kind": "category",
+                 "title": "Top-level domains by type"},
+}
+
+# Longest category list drawn on one chart
+chart_max_categories = 20
+
+def build_aggregate_caches(definitions):
+    """One DerivedCache per dataset, counting every column any chart groups by in a single pass."""
+    columns = {}
+    for chart in definitions.values():
+        columns.setdefault(chart["dataset"], set()).add(chart["column"])
+    return {dataset: DerivedCache(dataset, lambda records, group_by=sorted(group_by): group_counts(records, group_by))
+            for dataset, group_by in columns.items()}
+
+# Group-by counts per dataset, computed once and refreshed only when the dataset changes
+aggregate_caches = build_aggregate_caches(chart_definitions)
+
+# Query indexes behind /api/<dataset>, rebuilt and swapped in when a CSV changes
+company_indexes = {name: DerivedCache(name, CompanyIndex) for name in ("eu_ai_companies", "startupnation")}
+
+# Page size limits for /api queries
+api_default_per_page = 50
+api_max_per_page = 500
+
+# Responses smaller than this are not worth gzipping
+gzip_min_size = 512
+
+# Dataset files served under /data/ as "<dataset>.csv" and "<dataset>.datapackage.json"
+data_content_types = {".csv": "text/csv; charset=utf-8", ".json": "application/json"}
+
+# How long clients may reuse a dataset file before revalidating with its ETag
+data_max_age = 60
+
+# Seconds a cached file's metadata is trusted before the file is stat'ed again
+data_stat_interval = 1.0
+
+index_page = b"""
+                <html>
+                <head><title>Simple HTTP Server</title></head>
+                <body>
+                    <h1>Hello, this is a simple HTTP server for Brian for 2025!</h1>
+                    <img src="/graph" alt="Simple Graph"/>
+""" + b"".join(f"""                    <img src="/chart/{name}" alt="{chart['title']}"/>
+""".encode('utf-8') for name, chart in chart_definitions.items()) + b"""                </body>
+                </html>
+            """
+
+def draw_simple_graph(figure, data):
+    """Draw the /graph line chart onto an explicit Figure."""
+    ax = figure.subplots()
+    ax.plot(data["x"], data["y"])
+    ax.set_title(data["title"])
+
+def chart_data(name):
+    """Labels and counts for a dataset chart, taken from its cached aggregate."""
+    chart = chart_definitions[name]
+    counts, _ = aggregate_caches[chart["dataset"]].get()
+    column_counts = counts.get(chart["column"], {})
+    if chart["kind"] == "year":
+        items = sorted(((label, count) for label, count in column_counts.items() if label.isdigit()), key=lambda item: int(item[0]))
+    else:
+        items = sorted(column_counts.items(), key=lambda item: (-item[1], item[0]))[:chart_max_categories]
+    return {"title": chart["title"], "kind": chart["kind"], "labels": [label for label, _ in items], "counts": [count for _, count in items]}
+
+def draw_count_chart(figure, data):
+    """Draw a bar chart of counts: vertical bars for years, horizontal bars for categories."""
+    ax = figure.subplots()
+    if data["kind"] == "year":
+        ax.bar(data["labels"], data["counts"])
+        ax.tick_params(axis='x', labelrotation=90)
+    else:
+        ax.barh(data["labels"][::-1], data["counts"][::-1])
+    ax.set_title(data["title"])
+    figure.tight_layout()
+
+def chart_entry(name):
+    """Cached PNG entry for a dataset chart, re-rendered only when its aggregate changed."""
+    _, version = aggregate_caches[chart_definitions[name]["dataset"]].get()
+    return graph_cache.get(f"chart:{name}", lambda: chart_data(name), draw_count_chart, fingerprint=version)
+
+class RenderCache:
+    """Rendered PNG bytes per chart, re-rendered only when the chart's input data changes.
+
+    Charts are drawn on a standalone Agg ``Figure`` (never through pyplot's global
+    state) and the figure is cleared right after rendering, so memory stays flat
+    however many requests are served.
+
+    Cache hits take no lock. A re-render holds only its own chart's lock, so
+    one chart being redrawn never delays requests for the others, and
+    concurrent requests for the same stale chart render it once.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._render_locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(data):
+        return hashlib.sha1(repr(data).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def render_png(draw, data):
+        figure = Figure()
+        FigureCanvasAgg(figure)
+        try:
+            draw(figure, data)
+            buf = io.BytesIO()
+            figure.savefig(buf, format='png')
+            return buf.getvalue()
+        finally:
+            figure.clear()
+
+    def get(self, name, data, draw, fingerprint=None):
+        """Return {'png', 'etag', 'fingerprint'} for a chart, rendering it if its data changed.
+
+        Callers that already know a version for their data pass it as ``fingerprint``
+        and may pass ``data`` as a callable, which is only invoked when rendering.
+        """
+        if fingerprint is None:
+            fingerprint = self.fingerprint(data)
+        entry = self._entries.get(name)
+        if entry is not None and entry["fingerprint"] == fingerprint:
+            return entry
+        with self._lock:
+            render_lock = self._render_locks.setdefault(name, threading.Lock())
+        with render_lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry["fingerprint"] == fingerprint:
+                return entry  # Rendered by another request while this one waited
+            png = self.render_png(draw, data() if callable(data) else data)
+            entry = {"png": png, "etag": f'"{hashlib.sha1(png).hexdigest()[:20]}"', "fingerprint": fingerprint}
+            self._entries[name] = entry
+            return entry
+
+    def invalidate(self, name=None):
+        """Drop one cached chart, or all of them."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+graph_cache = RenderCache()
+
+def data_file_path(filename):
+    """The dataset file behind /data/<filename>, or None."""
+    for name, dataset in datasets.items():
+        if filename == f"{name}.csv":
+            return dataset["csv"]
+        if filename == f"{name}.datapackage.json":
+            return dataset["datapackage"]
+    return None
+
+class FileMetadataCache:
+    """Size, ETag and precompressed copies of each served dataset file.
+
+    An entry is trusted for ``stat_interval`` seconds, then the file and its
+    copies are stat'ed again; the file itself is never read here. Each
+    representation (identity, gzip, zstd) gets its own strong ETag, built from
+    the source's mtime and size like nginx does, and a ``.gz``/``.zst`` copy is
+    only offered while its mtime still matches the source's.
+    """
+
+    def __init__(self, stat_interval=data_stat_interval):
+        self.stat_interval = stat_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def build(path, stats):
+        mtime_ns, size = stats[0]
+        base = f"{mtime_ns:x}-{size:x}"
+        representations = {"identity": {"path": path, "stat": stats[0], "size": size, "etag": f'"{base}"'}}
+        for (encoding, suffix), variant_stats in zip(compressed_suffixes.items(), stats[1:]):
+            if variant_stats and compressed_variant(path, encoding):
+                representations[encoding] = {"path": path + suffix, "stat": variant_stats, "size": variant_stats[1],
+                                             "etag": f'"{base}{suffix.replace(".", "-")}"'}
+        extension = path[path.rfind('.'):]
+        return {"stats": stats, "representations": representations, "mtime": mtime_ns / 1e9,
+                "content_type": data_content_types.get(extension, "application/octet-stream")}
+
+    def get(self, path, refresh=False):
+        """Metadata of a file, or None if it does not exist."""
+        now = time.monotonic()
+        entry = self._entries.get(path)
+        if entry is not None and not refresh and now - entry["checked"] < self.stat_interval:
+            return entry
+        stats = (file_stat(path),) + tuple(file_stat(path + suffix) for suffix in compressed_suffixes.values())
+        with self._lock:
+            entry = self._entries.get(path)
+            if stats[0] is None:
+                self._entries.pop(path, None)
+                return None
+            if entry is None or entry["stats"] != stats:
+                entry = self.build(path, stats)
+                self._entries[path] = entry
+            entry["checked"] = now
+            return entry
+
+data_files = FileMetadataCache()
+
+def accepted_encodings(accept_encoding):
+    """Content codings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for item in (accept_encoding or "").split(','):
+        coding, _, params = item.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding.strip() and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+def parse_range(range_header, size):
+    """(first, last) byte of a single "bytes=" range, None to send the whole file, False if unsatisfiable.
+
+    Multiple ranges and malformed headers are answered with the whole file, as
+    RFC 9110 allows.
+    """
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    first, _, last = range_header[len('bytes='):].strip().partition('-')
+    try:
+        if not first:
+            suffix_length = int(last)
+            if suffix_length <= 0:
+                return False
+            first, last = max(0, size - suffix_length), size - 1
+        else:
+            first, last = int(first), int(last) if last else size - 1
+            if last < first and first < size:
+                return None
+            last = min(last, size - 1)
+    except ValueError:
+        return None
+    if first >= size:
+        return False
+    return first, last
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value covers the given ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
 class MyHandler(SimpleHTTPRequestHandler):
     def do_GET(self):
         if self.path == '/graph':
-            self.send_response(200)
-            self.send_header('Content-type', 'image/png')
-            self.end_headers()
-            self.wfile.write(self.generate_graph())
+            self.send_chart(graph_cache.get('graph', simple_graph_data, draw_simple_graph))
+        elif self.path == '/api' or self.path.startswith('/api/'):
+            self.handle_api()
+        elif self.path == '/data' or self.path.startswith('/data/'):
+            self.handle_data()
+        elif self.path.startswith('/chart/'):
+            name = self.path[len('/chart/'):]
+            if name not in chart_definitions:
+                self.send_error(404, f"Unknown chart '{name}'")
+                return
+            self.send_chart(chart_entry(name))
         else:
             self.send_response(200)
             self.send_header('Content-type', 'text/html')
+            self.send_header('Content-Length', str(len(index_page)))
             self.end_headers()
-            self.wfile.write(b"""
-                <html>
-                <head><title>Simple HTTP Server</title></head>
-                <body>
-                    <h1>Hello, this is a simple HTTP server for Brian for 2025!</h1>
-                    <img src="/graph" alt="Simple Graph"/>
-                </body>
-                </html>
-            """)
+            self.wfile.write(index_page)
+
+    def do_HEAD(self):
+        if self.path == '/data' or self.path.startswith('/data/'):
+            self.handle_data(head=True)
+        else:
+            super().do_HEAD()
+
+    def handle_data(self, head=False):
+        """Answer /data (file list) and /data/<file> (a dataset CSV or datapackage.json)."""
+        filename = urlsplit(self.path).path[len('/data/'):].strip('/')
+        if not filename:
+            listing = {}
+            for name, dataset in datasets.items():
+                for path, url in ((dataset["csv"], f"/data/{name}.csv"),
+                                  (dataset["datapackage"], f"/data/{name}.datapackage.json")):
+                    entry = data_files.get(path) if path else None
+                    if entry:
+                        listing[url] = {encoding: representation["size"]
+                                        for encoding, representation in entry["representations"].items()}
+            self.send_json(json.dumps({"files": listing}).encode('utf-8'), head=head)
+            return
+        path = data_file_path(filename)
+        if not path or not self.send_file(path, head):
+            self.send_error(404, f"Unknown dataset file '{filename}'")
+
+    def send_file(self, path, head=False):
+        """Send a dataset file with os.sendfile, picking a precompressed copy the client accepts.
+
+        Honors If-None-Match (304), Range/If-Range (206, 416). Returns False if
+        the file does not exist.
+        """
+        for attempt in range(2):
+            entry = data_files.get(path, refresh=attempt > 0)
+            if entry is None:
+                return False
+            accepted = accepted_encodings(self.headers.get('Accept-Encoding'))
+            encoding = next((encoding for encoding in compressed_suffixes
+                             if encoding in accepted and encoding in entry["representations"]), "identity")
+            representation = entry["representations"][encoding]
+            try:
+                file = open(representation["path"], 'rb')
+            except FileNotFoundError:
+                continue
+            with file:
+                stats = os.fstat(file.fileno())
+                if (stats.st_mtime_ns, stats.st_size) != representation["stat"]:
+                    continue  # Replaced since it was cached; look again
+                self.send_representation(file, entry, encoding, representation, head)
+            return True
+        self.send_error(503, "Dataset file is being rewritten")
+        return True
+
+    def send_representation(self, file, entry, encoding, representation, head):
+        size, etag = representation["size"], representation["etag"]
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            self.send_data_headers(entry, encoding, etag)
+            self.end_headers()
+            return
+
+        byte_range = None
+        if_range = self.headers.get('If-Range')
+        if not if_range or if_range.strip() == etag:
+            byte_range = parse_range(self.headers.get('Range'), size)
+        if byte_range is False:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        first, last = byte_range or (0, size - 1)
+        self.send_response(206 if byte_range else 200)
+        self.send_data_headers(entry, encoding, etag)
+        if byte_range:
+            self.send_header('Content-Range', f'bytes {first}-{last}/{size}')
+        self.send_header('Content-Length', str(last - first + 1))
+        self.end_headers()
+        if not head and last >= first:
+            self.wfile.flush()
+            self.connection.sendfile(file, first, last - first + 1)
+
+    def send_data_headers(self, entry, encoding, etag):
+        self.send_header('Content-type', entry["content_type"])
+        if encoding != "identity":
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(entry["mtime"], usegmt=True))
+        self.send_header('Cache-Control', f'public, max-age={data_max_age}')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Vary', 'Accept-Encoding')
+
+    def send_chart(self, entry):
+        """Send a cached PNG, or 304 Not Modified when the client already has it."""
+        if etag_matches(self.headers.get('If-None-Match'), entry["etag"]):
+            self.send_response(304)
+            self.send_header('ETag', entry["etag"])
+            self.send_header('Cache-Control', f'public, max-age={graph_max_age}')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-type', 'image/png')
+        self.send_header('Content-Length', str(len(entry["png"])))
+        self.send_header('ETag', entry["etag"])
+        self.send_header('Cache-Control', f'public, max-age={graph_max_age}')
+        self.end_headers()
+        self.wfile.write(entry["png"])
+
+    def handle_api(self):
+        """Answer /api (dataset list) and /api/<dataset>?tag=&based_in=&founded_min=&founded_max=&page=&per_page=."""
+        parts = urlsplit(self.path)
+        name = parts.path[len('/api/'):].strip('/') if parts.path.startswith('/api/') else ''
+        if not name:
+            listing = {}
+            for dataset, cache in company_indexes.items():
+                index, version = cache.get()
+                listing[dataset] = {"version": version, "rows": len(index.rows)}
+            self.send_json(json.dumps({"datasets": listing}).encode('utf-8'))
+            return
+        if name not in company_indexes:
+            self.send_json(json.dumps({"error": f"Unknown dataset '{name}'"}).encode('utf-8'), 404)
+            return
+
+        params = parse_qs(parts.query)
+        try:
+            founded_min = int(params["founded_min"][0]) if "founded_min" in params else None
+            founded_max = int(params["founded_max"][0]) if "founded_max" in params else None
+            page = max(1, int(params.get("page", ["1"])[0]))
+            per_page = min(api_max_per_page, max(1, int(params.get("per_page", [str(api_default_per_page)])[0])))
+        except ValueError:
+            self.send_json(b'{"error": "founded_min, founded_max, page and per_page must be integers"}', 400)
+            return
+
+        index, version = company_indexes[name].get()
+        ids = index.query(tags=params.get("tag", []), based_in=params.get("based_in", [None])[0],
+                          founded_min=founded_min, founded_max=founded_max)
+        self.send_json(index.page_json(ids, page, per_page, {"dataset": name, "version": version}))
+
+    def send_json(self, body, status=200, head=False):
+        """Send a JSON body (only its headers for HEAD), gzip-compressed when the client accepts it and it is large enough."""
+        compress = len(body) >= gzip_min_size and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if compress:
+            body = gzip.compress(body, compresslevel=5)
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if compress:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
 
     def generate_graph(self):
-        plt.figure()
-        plt.plot([1, 2, 3, 4], [1, 4, 9, 16])
-        plt.title('Simple Graph')
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        return buf.getvalue()
-
-def run(server_class=HTTPServer, handler_class=MyHandler, port=8000):
+        return graph_cache.get('graph', simple_graph_data, draw_simple_graph)["png"]
+
+class PooledKeepAlive:
+    """Mixin for HTTP/1.1 handlers that lets a PooledHTTPServer take the connection back between requests.
+
+    On a pooled server ``handle`` answers a single request; the server then
+    waits for the next one on its selector instead of on a worker thread, so
+    idle keep-alive connections never hold a worker and new connections are
+    never stuck behind them. On any other server it keeps the usual loop.
+    """
+    protocol_version = "HTTP/1.1"
+    timeout = keepalive_timeout
+    disable_nagle_algorithm = True  # Headers and body are separate writes; don't stall on delayed ACKs
+
+    def handle(self):
+        if not isinstance(self.server, PooledHTTPServer):
+            super().handle()
+            return
+        self.close_connection = True
+        self.handle_one_request()
+
+    def finish(self):
+        # Streams stay open while the server keeps the connection; it closes them for good
+        if self.close_connection:
+            super().finish()
+
+    def close(self):
+        super().finish()
+
+class KeepAliveHandler(PooledKeepAlive, MyHandler):
+    """MyHandler speaking HTTP/1.1, so clients can reuse one connection for many requests."""
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that handles requests on a bounded pool of worker threads.
+
+    Unlike ThreadingHTTPServer, which starts one thread per connection, at most
+    ``workers`` requests are served at once and the rest wait in the pool's
+    queue. With a PooledKeepAlive handler a worker serves one request and hands
+    the open connection back: a selector thread watches the idle connections,
+    queues the next request of each when it arrives and closes those idle for
+    longer than the handler's ``timeout``. ``server_close`` lets in-flight
+    requests finish before returning.
+    """
+
+    def __init__(self, server_address, handler_class, workers=16):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http-worker")
+        self._selector = selectors.DefaultSelector()
+        self._wake_read, self._wake_write = socket.socketpair()
+        self._wake_read.setblocking(False)
+        self._selector.register(self._wake_read, selectors.EVENT_READ)
+        self._parked = []
+        self._parked_lock = threading.Lock()
+        self._closing = threading.Event()
+        self._watcher = threading.Thread(target=self._watch, name="http-keepalive", daemon=True)
+        self._watcher.start()
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        handler = None
+        try:
+            handler = self.RequestHandlerClass(request, client_address, self)
+        except Exception:
+            self.handle_error(request, client_address)
+        if handler is not None and isinstance(handler, PooledKeepAlive) and not handler.close_connection:
+            self.park(handler)
+        else:
+            self.shutdown_request(request)
+
+    def resume(self, handler):
+        """Answer the next request of a parked connection on a worker thread."""
+        try:
+            handler.handle_one_request()
+        except Exception:
+            handler.close_connection = True
+            self.handle_error(handler.request, handler.client_address)
+        if handler.close_connection:
+            self.close_handler(handler)
+        else:
+            self.park(handler)
+
+    def park(self, handler):
+        """Hand an open connection to the selector thread until its next request arrives."""
+        if self._closing.is_set():
+            self.close_handler(handler)
+            return
+        if self.has_buffered_request(handler):
+            try:
+                self.executor.submit(self.resume, handler)  # Pipelined request already read
+            except RuntimeError:  # Pool shut down
+                self.close_handler(handler)
+            return
+        with self._parked_lock:
+            self._parked.append(handler)
+        self._wake_write.send(b"\0")
+
+    @staticmethod
+    def has_buffered_request(handler):
+        """True if the next request is already in the handler's read buffer, without blocking."""
+        connection = handler.connection
+        try:
+            connection.setblocking(False)
+            return bool(handler.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            connection.settimeout(handler.timeout)
+
+    def close_handler(self, handler):
+        try:
+            handler.close()
+        except Exception:
+            pass
+        self.shutdown_request(handler.request)
+
+    def _watch(self):
+        idle = {}
+        while not self._closing.is_set():
+            with self._parked_lock:
+                parked, self._parked = self._parked, []
+            now = time.monotonic()
+            for handler in parked:
+                self._selector.register(handler.connection, selectors.EVENT_READ, handler)
+                idle[handler] = now
+            for key, _ in self._selector.select(timeout=0.5):
+                if key.fileobj is self._wake_read:
+                    try:
+                        self._wake_read.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+                self._selector.unregister(key.fileobj)
+                del idle[key.data]
+                self.executor.submit(self.resume, key.data)
+            now = time.monotonic()
+            for handler, since in list(idle.items()):
+                if now - since > (handler.timeout or keepalive_timeout):
+                    self._selector.unregister(handler.connection)
+                    del idle[handler]
+                    self.close_handler(handler)
+        for handler in idle:
+            self._selector.unregister(handler.connection)
+            self.close_handler(handler)
+
+    def server_close(self):
+        super().server_close()
+        self._closing.set()
+        self._wake_write.send(b"\0")
+        self._watcher.join()
+        self.executor.shutdown(wait=True)
+        with self._parked_lock:
+            parked, self._parked = self._parked, []
+        for handler in parked:
+            self.close_handler(handler)
+        self._selector.close()
+        self._wake_read.close()
+        self._wake_write.close()
+
+def run(server_class=HTTPServer, handler_class=MyHandler, port=8000, workers=None):
+    """Serve until interrupted; pass ``workers`` to use the pooled keep-alive server."""
     server_address = ('', port)
-    httpd = server_class(server_address, handler_class)
-    print(f'Starting httpd server on port {port}...')
-    httpd.serve_forever()
+    graph_cache.get('graph', simple_graph_data, draw_simple_graph)  # Render once before the first request
+    for name in chart_definitions:
+        chart_entry(name)
+    for cache in company_indexes.values():
+        cache.get()  # Build the query indexes up front
+    if workers:
+        httpd = PooledHTTPServer(server_address, KeepAliveHandler if handler_class is MyHandler else handler_class, workers)
+    else:
+        httpd = server_class(server_address, handler_class)
+
+    # Stop accepting on SIGINT/SIGTERM; shutdown() must run outside the serving thread
+    def stop(signum, frame):
+        print("Shutting down, waiting for in-flight requests...")
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+    print(f'Starting httpd server on port {port}' + (f' with {workers} workers...' if workers else '...'))
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+        print("Server stopped.")
 
 if __name__ == '__main__':
-    run()
-    
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Simple dashboard server.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--threaded", action="store_true", help="Serve concurrently on a bounded worker pool with keep-alive")
+    parser.add_argument("--workers", type=int, default=16, help="Worker threads for --threaded")
+    args = parser.parse_args()
+    run(port=args.port, workers=args.workers if args.threaded else None)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the repository root importable when pytest is run from anywhere
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,47 @@
+import json
+
+from scrap_common.company_index import CompanyIndex, split_tags
+
+records = [
+    {"Name": "Acme", "Tags": "AI, Robotics", "Based in": "Paris", "Founded": "2015"},
+    {"Name": "Globex", "Tags": "ai", "Based in": "Berlin", "Founded": "2020"},
+    {"Name": "Initech", "Tags": "Robotics, SaaS", "Based in": " paris ", "Founded": "N/A"},
+    {"Name": "Umbrella", "Tags": "AI, SaaS", "Based in": "Paris", "Founded": "2010"},
+    {"Name": "Hooli", "Tags": "N/A", "Based in": "N/A", "Founded": "2018"},
+]
+
+def test_query_filters_and_orders_by_row():
+    index = CompanyIndex(records)
+    assert list(index.query()) == [0, 1, 2, 3, 4]
+    assert list(index.query(tags=["ai"])) == [0, 1, 3]
+    assert list(index.query(tags=["AI", "saas"])) == [3]
+    assert list(index.query(based_in="PARIS")) == [0, 2, 3]
+    assert list(index.query(tags=["robotics"], based_in="paris")) == [0, 2]
+    assert list(index.query(founded_min=2012)) == [0, 1, 4]
+    assert list(index.query(tags=["ai"], founded_max=2016)) == [0, 3]
+    assert list(index.query(tags=["ai"], based_in="paris", founded_min=2011, founded_max=2015)) == [0]
+    assert list(index.query(tags=["unknown"])) == []
+    assert list(index.query(based_in="  ")) == []
+
+def test_repeated_queries_return_the_same_result():
+    index = CompanyIndex(records)
+    first = index.query(tags=["ai", "robotics"])
+    assert index.query(tags=["Robotics", "AI"]) is first
+    assert list(first) == [0]
+
+def test_page_json():
+    index = CompanyIndex(records)
+    ids = index.query(tags=["ai"])
+    page = json.loads(index.page_json(ids, 2, 2, {"dataset": "test"}))
+    assert page["dataset"] == "test"
+    assert (page["total"], page["page"], page["per_page"]) == (3, 2, 2)
+    assert [result["Name"] for result in page["results"]] == ["Umbrella"]
+
+def test_placeholders_are_not_indexed():
+    assert split_tags("N/A") == []
+    assert split_tags("None, AI,  n/a ,") == ["ai"]
+    index = CompanyIndex(records + [{"Name": "Vandelay", "Tags": "None", "Based in": "n/a", "Founded": "None"}])
+    assert "n/a" not in index.by_tag and "none" not in index.by_tag
+    assert "n/a" not in index.by_location and "none" not in index.by_location
+    assert list(index.query(tags=["N/A"])) == []
+    assert list(index.query(based_in="N/A")) == []
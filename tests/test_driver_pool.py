@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from selenium.common.exceptions import WebDriverException  # noqa: E402
+
+from scrap_common.driver_pool import DriverPool  # noqa: E402
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+class FakePool(DriverPool):
+    """A pool whose drivers are plain objects, so no browser is started."""
+
+    def __init__(self, size):
+        super().__init__(size=size, driver_path="")
+        self.started = []
+
+    def _start_driver(self):
+        driver = FakeDriver(len(self.started))
+        self.started.append(driver)
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+def test_drivers_are_reused_up_to_size():
+    pool = FakePool(size=2)
+    results = pool.map(lambda driver, item: (driver.number, item), range(20))
+    assert [item for _, item in results] == list(range(20))
+    assert len(pool.started) <= 2
+    pool.close()
+    assert all(driver.quit_called for driver in pool.started)
+
+def test_waiting_caller_replaces_a_discarded_driver():
+    pool = FakePool(size=1)
+    waiter_got = []
+
+    def waiter():
+        with pool.driver() as driver:
+            waiter_got.append(driver)
+
+    with pytest.raises(WebDriverException):
+        with pool.driver() as broken:
+            thread = threading.Thread(target=waiter, daemon=True)
+            thread.start()
+            raise WebDriverException("browser crashed")
+    thread.join(5)
+    assert not thread.is_alive()
+    assert broken.quit_called
+    assert waiter_got and waiter_got[0] is not broken
+    assert len(pool.started) == 2
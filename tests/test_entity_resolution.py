@@ -0,0 +1,39 @@
+import csv
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+from scrap_common.entity_resolution import normalize_name, soundex, match_names, match_csv  # noqa: E402
+
+def test_normalize_name():
+    assert normalize_name("Acme GmbH") == "acme"
+    assert normalize_name("Ünïted  Robotics, Inc.") == "united robotics"
+    assert normalize_name("Corp") == "corp"
+    assert normalize_name(None) == ""
+
+def test_soundex():
+    assert soundex("robert") == soundex("rupert") == "r163"
+    assert soundex("") == ""
+
+def test_match_names_finds_the_best_match():
+    matches, stats = match_names(["Acme Robotics GmbH", "Globex", "Initech"],
+                                 ["Initech Ltd", "Acme Robotic", "Umbrella", "Acme Foods"])
+    assert [(row.left_row, row.right_row) for row in matches.itertuples()] == [(0, 1), (2, 0)]
+    assert stats["matches"] == 2
+
+def test_placeholder_names_are_not_matched():
+    matches, stats = match_names(["", "N/A", "none", "  ", "Acme"], ["", "N/A", "None", "Acme"])
+    assert [(row.left_row, row.right_row) for row in matches.itertuples()] == [(4, 3)]
+
+def test_match_csv(tmp_path):
+    left, right = str(tmp_path / "left.csv"), str(tmp_path / "right.csv")
+    for path, names in ((left, ["Acme GmbH", "N/A"]), (right, ["N/A", "ACME"])):
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerows([["Name"]] + [[name] for name in names])
+    mapping = match_csv(left, right)
+    assert mapping.to_dict("records") == [{
+        "left_source": "left.csv", "left_row": 0, "left_name": "Acme GmbH",
+        "right_source": "right.csv", "right_row": 1, "right_name": "ACME", "score": 1.0,
+    }]
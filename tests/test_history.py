@@ -0,0 +1,81 @@
+import pytest
+
+from scrap_common.history import SnapshotStore, write_csv
+
+header = ["Name", "Country"]
+
+def snapshots(*versions):
+    """Each version of the rows, as the CSV would be rewritten between scrapes."""
+    return [[list(row) for row in version] for version in versions]
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(root=str(tmp_path / "history"), keyframe_interval=12)
+
+def record_all(store, tmp_path, versions):
+    data_file = str(tmp_path / "companies.csv")
+    entries = []
+    for day, rows in enumerate(versions, 1):
+        write_csv(data_file, header, rows)
+        entries.append(store.record("eu_ai_companies", data_file, f"2025-01-{day:02d}T12:00:00"))
+    return entries
+
+def test_as_of_rebuilds_each_snapshot_in_file_order(store, tmp_path):
+    base = [[f"Company {i:02d}", "France"] for i in range(20)]
+    inserted = base[:5] + [["Acme", "Ireland"]] + base[5:]
+    changed = [row if row[0] != "Company 07" else ["Company 07", "Spain"] for row in inserted if row[0] != "Company 12"]
+    appended = changed + [["Zeta", "Italy"]]
+    resorted = sorted(appended, reverse=True)
+    versions = snapshots(base, inserted, changed, appended, resorted)
+
+    entries = record_all(store, tmp_path, versions)
+    assert [entry["kind"] for entry in entries] == ["keyframe"] + ["delta"] * 4
+    assert (entries[2]["added"], entries[2]["changed"], entries[2]["removed"]) == (0, 1, 1)
+    for day, rows in enumerate(versions, 1):
+        assert store.as_of("eu_ai_companies", f"2025-01-{day:02d}") == (header, rows)
+
+def test_duplicate_keys_keep_every_row(store, tmp_path):
+    versions = snapshots([["Acme", "France"], ["Acme", "Spain"]],
+                         [["Acme", "Italy"], ["Acme", "France"], ["Acme", "Spain"]])
+    record_all(store, tmp_path, versions)
+    assert store.as_of("eu_ai_companies", "2025-01-02")[1] == versions[1]
+
+def test_unchanged_csv_is_not_recorded(store, tmp_path):
+    entries = record_all(store, tmp_path, snapshots([["Acme", "France"]], [["Acme", "France"]]))
+    assert entries[1] is None
+    assert len(store.manifest("eu_ai_companies")) == 1
+
+def test_keyframe_every_interval(tmp_path):
+    store = SnapshotStore(root=str(tmp_path / "history"), keyframe_interval=3)
+    rows = [[f"Company {i:02d}", "France"] for i in range(10)]
+    versions = [rows + [[f"New {day}", "Spain"]] for day in range(5)]
+    entries = record_all(store, tmp_path, versions)
+    assert [entry["kind"] for entry in entries] == ["keyframe", "delta", "delta", "keyframe", "delta"]
+    assert store.as_of("eu_ai_companies", "2025-01-05")[1] == versions[4]
+
+def test_as_of_before_the_first_snapshot(store, tmp_path):
+    record_all(store, tmp_path, snapshots([["Acme", "France"]]))
+    assert store.as_of("eu_ai_companies", "2024-12-31") == (None, None)
+
+def test_diff_between_snapshots(store, tmp_path):
+    record_all(store, tmp_path, snapshots([["Acme", "France"], ["Globex", "Spain"]],
+                                          [["Acme", "Italy"], ["Initech", "Spain"]]))
+    changes = store.diff("eu_ai_companies", "2025-01-01", "2025-01-02")
+    assert changes == {
+        "added": {"Initech": ["Initech", "Spain"]},
+        "removed": {"Globex": ["Globex", "Spain"]},
+        "changed": {"Acme": (["Acme", "France"], ["Acme", "Italy"])},
+    }
+
+def test_missing_csv_is_an_error(store, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        store.record("eu_ai_companies", str(tmp_path / "missing.csv"))
+    assert store.manifest("eu_ai_companies") == []
+
+def test_backdated_snapshot_is_rejected(store, tmp_path):
+    record_all(store, tmp_path, snapshots([["Acme", "France"]], [["Acme", "Spain"]]))
+    write_csv(str(tmp_path / "companies.csv"), header, [["Acme", "Italy"]])
+    with pytest.raises(ValueError):
+        store.record("eu_ai_companies", str(tmp_path / "companies.csv"), "2025-01-01T18:00:00")
+    assert len(store.manifest("eu_ai_companies")) == 2
+    assert store.as_of("eu_ai_companies", "2025-01-02")[1] == [["Acme", "Spain"]]
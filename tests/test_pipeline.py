@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from scrap_common.pipeline import Pipeline, CsvSideOutput
+
+header = ["Name", "Founded"]
+
+def write_existing(path):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        file.write("Name,Founded\nOld,2001\n")
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+def companies(count, fail_at=None):
+    for i in range(count):
+        if i == fail_at:
+            raise ConnectionError("page fetch failed")
+        yield {"Name": f"Company {i}", "Founded": str(2000 + i)}
+
+def run(path, records, load=None, append=False):
+    closed = []
+    side_output = CsvSideOutput(path, header, on_close=lambda: closed.append(True), append=append)
+    pipeline = Pipeline("test", records, load=load, side_output=side_output, queue_size=4, batch_size=3)
+    return pipeline, closed
+
+def test_successful_run_replaces_the_csv(tmp_path):
+    path = str(tmp_path / "companies.csv")
+    write_existing(path)
+    pipeline, closed = run(path, companies(10))
+    stats = pipeline.run()
+    assert stats["load"]["records"] == 10
+    assert read(path).splitlines() == ["Name,Founded"] + [f"Company {i},{2000 + i}" for i in range(10)]
+    assert closed == [True]
+    assert not os.path.exists(path + ".tmp")
+
+def test_append_keeps_existing_rows(tmp_path):
+    path = str(tmp_path / "companies.csv")
+    write_existing(path)
+    pipeline, _ = run(path, companies(2), append=True)
+    pipeline.run()
+    assert read(path).splitlines() == ["Name,Founded", "Old,2001", "Company 0,2000", "Company 1,2001"]
+
+@pytest.mark.parametrize("records, load", [
+    (lambda: companies(10, fail_at=6), None),
+    (lambda: companies(10), lambda batch: 1 / 0),
+])
+def test_failed_run_leaves_the_csv_unchanged(tmp_path, records, load):
+    path = str(tmp_path / "companies.csv")
+    write_existing(path)
+    pipeline, closed = run(path, records(), load=load)
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+    assert read(path) == "Name,Founded\nOld,2001\n"
+    assert closed == []
+    assert not os.path.exists(path + ".tmp")
+
+def test_empty_run_leaves_the_csv_unchanged(tmp_path):
+    path = str(tmp_path / "companies.csv")
+    write_existing(path)
+    pipeline, closed = run(path, companies(0))
+    pipeline.run()
+    assert read(path) == "Name,Founded\nOld,2001\n"
+    assert closed == []
@@ -0,0 +1,34 @@
+import csv
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("psycopg2")
+pytest.importorskip("dotenv")
+
+from db_push.push_to_postgre_general import clean_row, clean_and_validate_data  # noqa: E402
+
+header = ["Name", "Founded", "Employees", "Total Raised", "Tags"]
+rows = [
+    ["Acme", "2019", "11-50", "$5M", "AI, Robotics"],
+    ["Globex", "N/A", "N/A", "$250K", "N/A"],
+    ["Initech", "2021", "", "", ""],
+]
+numeric, string_number, array = ["Founded"], ["Employees", "Total Raised"], ["Tags"]
+
+def test_string_records_clean_like_the_csv(tmp_path):
+    data_file = str(tmp_path / "companies.csv")
+    with open(data_file, 'w', newline='', encoding='utf-8') as file:
+        csv.writer(file).writerows([header] + rows)
+    from_csv = clean_and_validate_data(pd.read_csv(data_file, encoding='utf-8'), numeric, string_number, array)
+    with open(data_file, 'r', newline='', encoding='utf-8') as file:
+        from_records = [clean_row(record, index, numeric, string_number, array)
+                        for index, record in enumerate(csv.DictReader(file))]
+
+    assert from_records == from_csv
+    for csv_row, record_row in zip(from_csv, from_records):
+        assert [type(value) for value in csv_row.values()] == [type(value) for value in record_row.values()]
+    assert from_records[0] == {"Name": "Acme", "Founded": 2019, "Employees": None,
+                               "Total Raised": 5000000, "Tags": ["ai", "robotics"]}
+    assert from_records[1]["Founded"] is None
+    assert from_records[1]["Total Raised"] == 250000
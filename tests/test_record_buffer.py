@@ -0,0 +1,79 @@
+import io
+import csv
+
+import pytest
+
+from scrap_common.record_buffer import RecordBuffer, CsvStream
+
+header = ["Name", "Description", "Stage"]
+rows = [
+    ["Acme", "Rockets, anvils and \"portable holes\"", "Seed"],
+    ["Globex", "Multi-line\ndescription", "Round A"],
+    ["Initech", "", "Seed"],
+    ["Umbrella Ωμέγα", "Ünïcode text", ""],
+]
+
+def csv_text(rows, **fmtparams):
+    buffer = io.StringIO()
+    csv.writer(buffer, **fmtparams).writerows(rows)
+    return buffer.getvalue()
+
+def test_rows_round_trip():
+    buffer = RecordBuffer(header, ["Stage"], rows)
+    buffer.append({"Name": "Hooli", "Stage": "Seed"})
+    assert len(buffer) == 5
+    assert list(buffer)[:4] == rows
+    assert buffer[-1] == ["Hooli", "", "Seed"]
+    assert next(buffer.records()) == dict(zip(header, rows[0]))
+    assert buffer.column("Stage") == ["Seed", "Round A", "Seed", "", "Seed"]
+
+def test_categorical_codes_widen_past_one_byte():
+    buffer = RecordBuffer(["Name", "Stage"], ["Stage"], ([str(i), f"stage {i}"] for i in range(70000)))
+    stage = buffer.columns[1]
+    assert stage.codes.typecode == "I"
+    assert buffer[0] == ["0", "stage 0"]
+    assert buffer[69999] == ["69999", "stage 69999"]
+
+def test_to_csv_matches_the_csv_module(tmp_path):
+    path = str(tmp_path / "out.csv")
+    RecordBuffer(header, ["Stage"], rows).to_csv(path, lineterminator="\n")
+    with open(path, 'r', newline='', encoding='utf-8') as file:
+        assert file.read() == csv_text([header] + rows, lineterminator="\n")
+
+def test_csv_stream_reads_in_any_chunk_size():
+    expected = csv_text(rows * 50, lineterminator="\n")
+    for size in (1, 7, 64, 4096, -1):
+        stream = CsvStream(iter(rows * 50), chunk_rows=3)
+        chunks = []
+        while True:
+            chunk = stream.read(size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        assert "".join(chunks) == expected
+
+def test_to_dataframe_keeps_categoricals():
+    pytest.importorskip("pandas")
+    frame = RecordBuffer(header, ["Stage"], rows).to_dataframe()
+    assert list(frame.columns) == header
+    assert str(frame["Stage"].dtype) == "category"
+    assert frame["Stage"].tolist() == [row[2] for row in rows]
+    assert frame["Name"].tolist() == [row[0] for row in rows]
+
+def test_extend_csv_rows_tolerates_hand_edited_files(tmp_path):
+    path = str(tmp_path / "existing.csv")
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        file.write("Name,Description,Stage\nAcme,Rockets,Seed\n\nGlobex\n,,\nInitech,Staplers,Seed,extra\n")
+    expected = [["Acme", "Rockets", "Seed"], ["Globex", "", ""], ["Initech", "Staplers", "Seed"]]
+
+    buffer = RecordBuffer(header, ["Stage"])
+    with open(path, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        next(reader)
+        assert buffer.extend_csv_rows(reader) == 3
+    assert list(buffer) == expected
+
+    buffer = RecordBuffer(header, ["Stage"])
+    with open(path, 'r', newline='', encoding='utf-8') as file:
+        buffer.extend_csv_rows(csv.DictReader(file))
+    assert list(buffer) == expected
@@ -0,0 +1,74 @@
+import csv
+
+from scrap_common.seen_index import SeenIndex, index_path, new_records
+
+def write_names(path, names):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(["Name", "Founded"])
+        writer.writerows([name, "2020"] for name in names)
+
+def scraped(names, fetched):
+    """Records the way a scraper yields them, noting how many were actually fetched."""
+    for name in names:
+        fetched.append(name)
+        yield {"Name": name}
+
+def test_for_csv_seeds_from_the_csv(tmp_path):
+    data_file = str(tmp_path / "companies.csv")
+    write_names(data_file, ["Acme", "Globex  Corp"])
+    index = SeenIndex.for_csv(data_file, "Name")
+    assert "acme" in index
+    assert " globex corp " in index
+    assert "Initech" not in index
+    assert len(SeenIndex(index_path(data_file))) == 2
+
+def test_new_records_skips_known_and_adds_new(tmp_path):
+    data_file = str(tmp_path / "companies.csv")
+    write_names(data_file, ["Acme", "Globex"])
+    index = SeenIndex.for_csv(data_file, "Name")
+    fetched = []
+    records = new_records(scraped(["Initech", "Acme", "Umbrella", "Globex", "N/A"], fetched),
+                          index, lambda record: record["Name"], "test", stop_after=None)
+    assert [record["Name"] for record in records] == ["Initech", "Umbrella", "N/A"]
+    assert "Initech" in index and "Umbrella" in index
+    assert len(fetched) == 5
+
+def test_new_records_stops_after_a_run_of_known_records(tmp_path):
+    data_file = str(tmp_path / "companies.csv")
+    known = [f"Company {i}" for i in range(10)]
+    write_names(data_file, known)
+    index = SeenIndex.for_csv(data_file, "Name")
+    fetched = []
+    records = new_records(scraped(["New 1", "New 2"] + known + ["New 3"], fetched),
+                          index, lambda record: record["Name"], "test", stop_after=3)
+    assert [record["Name"] for record in records] == ["New 1", "New 2"]
+    assert len(fetched) == 5  # Two new, then three known in a row
+
+def test_added_keys_are_only_kept_once_saved(tmp_path):
+    data_file = str(tmp_path / "companies.csv")
+    write_names(data_file, ["Acme"])
+    index = SeenIndex.for_csv(data_file, "Name")
+    index.add("Initech")
+    assert "Initech" not in SeenIndex.for_csv(data_file, "Name")
+
+    write_names(data_file, ["Acme", "Initech"])
+    index.save(data_file)
+    reloaded = SeenIndex.for_csv(data_file, "Name")
+    assert "Initech" in reloaded
+    assert reloaded.source_hash == index.source_hash
+
+def test_index_is_rebuilt_when_the_csv_changed_behind_it(tmp_path):
+    data_file = str(tmp_path / "companies.csv")
+    write_names(data_file, ["Acme", "Globex"])
+    SeenIndex.for_csv(data_file, "Name")
+    write_names(data_file, ["Acme", "Initech"])  # A full scrape or a hand edit
+    index = SeenIndex.for_csv(data_file, "Name")
+    assert "Initech" in index
+    assert "Globex" not in index
+    assert len(index) == 2
+
+def test_missing_csv_gives_an_empty_index(tmp_path):
+    index = SeenIndex.for_csv(str(tmp_path / "missing.csv"), "Name")
+    assert len(index) == 0
+    assert "Acme" not in index
@@ -0,0 +1,63 @@
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from simple_page import RenderCache, accepted_encodings, parse_range  # noqa: E402
+
+@pytest.mark.parametrize("header, expected", [
+    (None, set()),
+    ("", set()),
+    ("gzip", {"gzip"}),
+    ("GZip, br;q=0.5, zstd", {"gzip", "br", "zstd"}),
+    ("gzip;q=0, zstd;q=0.1", {"zstd"}),
+    ("gzip;q=abc, identity", {"identity"}),
+])
+def test_accepted_encodings(header, expected):
+    assert accepted_encodings(header) == expected
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=999-999", (999, 999)),
+    ("bytes=1000-", False),
+    ("bytes=5000-6000", False),
+    ("bytes=-0", False),
+    ("bytes=10-5", None),
+    ("bytes=0-1,5-9", None),
+    ("bytes=a-b", None),
+    ("items=0-9", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+def test_render_cache_serves_other_charts_while_one_renders(monkeypatch):
+    monkeypatch.setattr(RenderCache, "render_png", staticmethod(lambda draw, data: draw(None, data)))
+    cache = RenderCache()
+    cached = cache.get("b", "data", lambda figure, data: b"png b")
+    rendering, release = threading.Event(), threading.Event()
+
+    def slow_draw(figure, data):
+        rendering.set()
+        release.wait(5)
+        return b"png a"
+
+    renders = []
+    threads = [threading.Thread(target=lambda: renders.append(cache.get("a", "data", slow_draw))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    assert rendering.wait(5)
+    start = time.perf_counter()
+    assert cache.get("b", "data", lambda figure, data: b"other") is cached
+    assert time.perf_counter() - start < 1
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert renders[0] is renders[1]
+    assert renders[0]["png"] == b"png a"
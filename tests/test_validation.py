@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from scrap_common.validation import validate_csv, validate_resource, split_point, format_error
+
+schema = {
+    "fields": [
+        {"name": "Domain", "type": "string", "constraints": {"unique": True, "maxLength": 12}},
+        {"name": "Type", "type": "string", "constraints": {"enum": ["generic", "country-code"]}},
+        {"name": "Founded", "type": "year"},
+        {"name": "Sponsors", "type": "integer", "constraints": {"required": True}},
+    ],
+    "missingValues": ["", "N/A"],
+}
+header = "Domain,Type,Founded,Sponsors\n"
+
+def write(tmp_path, body, name="domains.csv"):
+    path = tmp_path / name
+    path.write_text(header + body, encoding="utf-8")
+    return str(path)
+
+def test_valid_file(tmp_path):
+    path = write(tmp_path, ".com,generic,1985,1\n\"multi\nline\",country-code,N/A,2\n")
+    assert validate_resource(path, schema) == (2, [])
+
+def test_header_mismatch_stops_before_rows(tmp_path):
+    path = tmp_path / "domains.csv"
+    path.write_text("Domain,Kind,Founded\n.com,x,y\n", encoding="utf-8")
+    rows, errors = validate_resource(str(path), schema)
+    assert rows == 0
+    assert [row for row, _ in errors] == [1, 1]
+    assert "'Kind'" in errors[0][1] and "'Sponsors'" in errors[1][1]
+
+def test_cell_errors_are_reported_with_row_numbers(tmp_path):
+    path = write(tmp_path, "".join([
+        ".com,generic,1985,1\n",
+        ".averyverylongname,generic,1985,1\n",
+        ".net,brand,85,N/A\n",
+        ".org,generic,1985,x\n",
+        "\n",
+        ".io,generic\n",
+    ]))
+    _, errors = validate_resource(path, schema)
+    assert sorted(errors) == [
+        (3, "'Domain' is 18 characters, longer than 12"),
+        (4, "'Founded' value '85' is not a valid year"),
+        (4, "'Sponsors' is required but missing"),
+        (4, "'Type' value 'brand' is not one of the allowed values"),
+        (5, "'Sponsors' value 'x' is not a valid integer"),
+        (6, "blank row"),
+        (7, "has 2 cells, the schema has 4 fields"),
+    ]
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_duplicates_are_found_across_chunks(tmp_path, workers):
+    body = "".join(f".d{i},generic,2000,1\n" for i in range(200)) + ".d7,generic,2000,1\n"
+    path = write(tmp_path, body)
+    rows, errors = validate_resource(path, schema, workers=workers, chunk_size=256)
+    assert rows == 201
+    assert errors == [(202, "duplicate value of unique 'Domain' (first in row 9)")]
+
+def test_max_errors(tmp_path):
+    path = write(tmp_path, "".join(f".d{i},generic,bad,1\n" for i in range(100)))
+    assert len(validate_resource(path, schema, max_errors=5)[1]) == 5
+
+def test_split_point_ignores_quoted_newlines():
+    assert split_point(b'a,"b\nc"\nd,"e\n') == len(b'a,"b\nc"\n')
+    assert split_point(b'a,"b\nc') is None
+
+def test_validate_csv_uses_the_datapackage_beside_it(tmp_path):
+    path = write(tmp_path, ".com,brand,1985,1\n")
+    assert validate_csv(path) == []  # No datapackage.json, nothing to check
+    (tmp_path / "datapackage.json").write_text(json.dumps({"resources": [{"path": "data/domains.csv", "schema": schema}]}))
+    assert [format_error(error) for error in validate_csv(path)] == [
+        "row 2: 'Type' value 'brand' is not one of the allowed values"]
+
+def test_load_csv_rejects_a_mismatching_file(tmp_path):
+    pytest.importorskip("pandas")
+    pytest.importorskip("psycopg2")
+    pytest.importorskip("dotenv")
+    from db_push.push_to_postgre_general import load_csv
+    path = write(tmp_path, ".com,brand,1985,1\n")
+    (tmp_path / "datapackage.json").write_text(json.dumps({"resources": [{"path": "domains.csv", "schema": schema}]}))
+    assert load_csv(path, "domains", db_config={}) is False